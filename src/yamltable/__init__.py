@@ -1,94 +1,212 @@
-"""Command line interface for sorting YAML files."""
+"""Read, query, sort, validate, and write YAML files organized as tables."""
 
 
 import pathlib
-from typing import Any, IO, Iterable, List, Optional, Sequence, Tuple, Union
-
-import jsonschema
-from jsonschema import exceptions
-import yaml
-
-from yamltable.typing import Row, Schema
+from typing import (
+    Any,
+    Dict,
+    IO,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from yamltable import metrics, sorting, validation
+from yamltable.index import Index
+from yamltable.query import Query
+from yamltable.stream import iter_rows, write_rows
+from yamltable.table import Table
+from yamltable.typing import Backend, FileFormat, Nulls, Phase, Row, Schema
 
 
 __author__ = "Macklan Weinstein"
 __version__ = "0.1.5"
 
+__all__ = [
+    "Index",
+    "Query",
+    "Table",
+    "dependencies",
+    "iter_rows",
+    "read",
+    "search",
+    "sort",
+    "validate",
+    "validate_all",
+    "write",
+]
+
 
 def dependencies(unsorted: Sequence[Row], depends: str, name: str) -> List[Row]:
     """Sort rows based on the dependencies found in key.
 
+    Rows are resolved with Kahn's algorithm in O(V + E) time. The output order
+    is stable: rows are grouped by dependency depth and each group keeps the
+    original row order.
+
     Args:
         unsorted: Rows to sort.
         depends: Dictionary key whose values are other dictionary dependencies.
         name: Foreign key for dependencies.
 
     Raises:
-        ValueError: If rows contain circular requirements.
+        ValueError: If rows contain circular or unknown requirements.
 
     Returns:
         Rows sorted by requirements.
+
+    Examples:
+        >>> rows = [
+        ...     {"name": "a", "depends": ["b"]},
+        ...     {"name": "b", "depends": []},
+        ... ]
+        >>> [row["name"] for row in dependencies(rows, "depends", "name")]
+        ['b', 'a']
     """
 
-    sorted_: List[Row] = []
-    while unsorted:
-        # Find rows containing only dependencies in sorted_.
-        names = [pkg[name] for pkg in sorted_]
-        rows = [
-            (idx, pkg)
-            for idx, pkg in enumerate(unsorted)
-            if set(pkg[depends]).issubset(names)
-        ]
+    providers, dependents, degrees = _dependency_graph(unsorted, depends, name)
+
+    # Resolve rows one depth level at a time. A name is available once the
+    # first row providing it is placed, which matches the original pass based
+    # algorithm.
+    depths = [-1] * len(unsorted)
+    level = [idx for idx, degree in enumerate(degrees) if degree == 0]
+    available: Set[Any] = set()
+    depth = 0
+    while level:
+        next_level = []
+        for idx in level:
+            depths[idx] = depth
+            key = unsorted[idx][name]
+            if key in available:
+                continue
+
+            available.add(key)
+            for child in dependents.get(key, []):
+                degrees[child] -= 1
+                if degrees[child] == 0:
+                    next_level.append(child)
+
+        level = next_level
+        depth += 1
+
+    if -1 in depths:
+        raise ValueError(
+            "encountered circular dependencies: "
+            + _find_cycle(unsorted, depends, name, depths, providers)
+        )
+
+    # Bucket rows by depth to keep the original order within each level.
+    buckets: List[List[Row]] = [[] for _ in range(depth)]
+    for idx, row in enumerate(unsorted):
+        buckets[depths[idx]].append(row)
+
+    return [row for bucket in buckets for row in bucket]
+
+
+def _dependency_graph(
+    rows: Sequence[Row], depends: str, name: str
+) -> Tuple[Dict[Any, List[int]], Dict[Any, List[int]], List[int]]:
+    """Build adjacency indices for rows based on the dependencies in key.
+
+    Args:
+        rows: Rows to index.
+        depends: Dictionary key whose values are other dictionary dependencies.
+        name: Foreign key for dependencies.
+
+    Raises:
+        ValueError: If a row depends on a name that no row provides.
+
+    Returns:
+        Mapping from names to providing row indices, mapping from names to
+            dependent row indices, number of distinct dependencies per row.
+    """
 
-        if rows:
-            idxs, pkgs = zip(*rows)
-            # Append found rows to sorted_ and remove them from unsorted.
-            sorted_ += pkgs
-            unsorted = [
-                elem for idx, elem in enumerate(unsorted) if idx not in idxs
-            ]
-        else:
-            # If no rows are found then there exist circular dependencies.
-            raise ValueError("encountered circular dependencies.")
+    providers: Dict[Any, List[int]] = {}
+    for idx, row in enumerate(rows):
+        providers.setdefault(row[name], []).append(idx)
 
-    return sorted_
+    dependents: Dict[Any, List[int]] = {}
+    degrees = []
+    for idx, row in enumerate(rows):
+        requires = set(row[depends])
+        for dep in requires:
+            if dep not in providers:
+                raise ValueError(
+                    f"row {idx} ({row[name]!r}) depends on unknown name "
+                    f"{dep!r}."
+                )
+            dependents.setdefault(dep, []).append(idx)
+        degrees.append(len(requires))
+
+    return providers, dependents, degrees
+
+
+def _find_cycle(
+    rows: Sequence[Row],
+    depends: str,
+    name: str,
+    depths: List[int],
+    providers: Dict[Any, List[int]],
+) -> str:
+    """Describe a dependency cycle among unresolved rows.
+
+    Args:
+        rows: Rows being sorted.
+        depends: Dictionary key whose values are other dictionary dependencies.
+        name: Foreign key for dependencies.
+        depths: Resolved row depths, with -1 marking unresolved rows.
+        providers: Mapping from names to the indices of rows providing them.
+
+    Returns:
+        Cycle description such as "row 0 ('a') -> row 1 ('b') -> row 0 ('a')".
+    """
+
+    # Every unresolved row has at least one unresolved dependency, so walking
+    # unresolved dependencies must eventually revisit a row.
+    idx = depths.index(-1)
+    path: List[int] = []
+    seen: Dict[int, int] = {}
+    while idx not in seen:
+        seen[idx] = len(path)
+        path.append(idx)
+        idx = next(
+            providers[dep][0]
+            for dep in rows[idx][depends]
+            if all(depths[provider] == -1 for provider in providers[dep])
+        )
+
+    cycle = path[seen[idx] :] + [idx]
+    return " -> ".join(f"row {idx} ({rows[idx][name]!r})" for idx in cycle)
 
 
 def read(
-    stream: Union[IO[str], pathlib.Path, str]
+    stream: Union[IO[str], pathlib.Path, str],
+    backend: Backend = Backend.AUTO,
+    format_: Optional[FileFormat] = None,
 ) -> Tuple[List[Row], Optional[Schema]]:
-    """Read data from YAML file.
+    """Read data from YAML, JSON, JSON Lines, or MessagePack file.
 
     Args:
         stream: YAML text, text I/O stream, or file path.
+        backend: YAML parser implementation.
+        format_: File format, detected from the file extension by default.
 
     Raises:
         FileNotFoundError: If unable to find file path.
         TypeError: If file is not organized as a list.
+        ValueError: If the requested backend or format is unavailable.
 
     Returns:
         YAML data.
     """
 
-    if isinstance(stream, pathlib.Path):
-        stream = stream.read_text()
-
-    try:
-        data = yaml.safe_load(stream)
-    except (yaml.scanner.ScannerError, yaml.parser.ParserError) as xcpt:
-        raise TypeError(f"invalid YAML file: {xcpt}")
-
-    if isinstance(data, list):
-        return data, None
-    elif isinstance(data, dict):
-        try:
-            return data["rows"], data["schema"]
-        except KeyError:
-            raise TypeError(
-                "YAML file does not have a schema and rows organization"
-            )
-    else:
-        raise TypeError("YAML file is not organized in a tabular format")
+    rows, schema = iter_rows(stream, backend, format_=format_)
+    return list(rows), schema
 
 
 def search(key: str, val: Any, rows: Iterable[Row]) -> List[Row]:
@@ -108,15 +226,33 @@ def search(key: str, val: Any, rows: Iterable[Row]) -> List[Row]:
         [{'foo': 5, 'bar': 6}]
     """
 
-    return [row for row in rows if key in row and row[key] == val]
+    with metrics.phase(Phase.TRANSFORM) as counter:
+        return [
+            row
+            for row in counter.count(rows)
+            if key in row and row[key] == val
+        ]
+
 
+def sort(
+    key: Union[str, Sequence[str]],
+    rows: Iterable[Row],
+    nulls: Nulls = Nulls.LAST,
+) -> List[Row]:
+    """Sort dictionaries based on values for supplied key names.
 
-def sort(key: str, rows: Iterable[Row]) -> List[Row]:
-    """Sort dictionaries based on value for supplied key name.
+    Keys are applied in order of precedence and key names with a leading
+    hyphen sort in descending order. Sorting is stable and rows with missing
+    or null values for a key are placed according to the null policy.
 
     Args:
-        key: Search key.
+        key: Sort key name or names.
         rows: Dictionaries to sort.
+        nulls: Placement of missing and null values.
+
+    Raises:
+        TypeError: If values of a key are not comparable.
+        ValueError: If no key names are given.
 
     Returns:
         List of sorted dictionaries.
@@ -127,61 +263,120 @@ def sort(key: str, rows: Iterable[Row]) -> List[Row]:
         [{'foo': 3, 'bar': 6}, {'foo': 5, 'bar': 2}]
         >>> sort("bar", rows)
         [{'foo': 5, 'bar': 2}, {'foo': 3, 'bar': 6}]
+        >>> sort(["-bar", "foo"], rows + [{"foo": 4}])
+        [{'foo': 3, 'bar': 6}, {'foo': 5, 'bar': 2}, {'foo': 4}]
     """
 
-    return sorted(rows, key=lambda row: row[key])
+    unsorted = list(rows)
+    with metrics.phase(Phase.TRANSFORM) as counter:
+        counter.rows = len(unsorted)
+        return sorting.sort_rows(unsorted, sorting.parse_keys(key), nulls)
 
 
 def validate(
-    rows: Iterable[Row], schema: Optional[Schema]
+    rows: Iterable[Row], schema: Optional[Schema], workers: int = 1
 ) -> Tuple[bool, int, str]:
     """Check that each row satisfies the schema.
 
     Args:
         rows: Dictionaries to validate.
         schema: JSON schema for validation.
+        workers: Number of processes to validate rows in parallel.
 
     Returns:
         Whether all rows are valid, invalid row index or -1,
             invalid error message.
     """
 
+    from jsonschema import exceptions
+
     try:
-        jsonschema.Draft7Validator.check_schema(schema)
+        with metrics.phase(Phase.VALIDATE) as counter:
+            error = validation.first_error(
+                counter.count(rows), schema, workers
+            )
     except (exceptions.SchemaError, exceptions.UnknownType) as xcpt:
         error_msg = str(xcpt)
         return False, -1, error_msg
 
-    validator = jsonschema.Draft7Validator(schema)
-    for idx, row in enumerate(rows):
-        try:
-            validator.validate(row)
-        except exceptions.ValidationError as xcpt:
-            error_msg = str(xcpt)
-            return False, idx, error_msg
+    if error is None:
+        return True, -1, ""
 
-    return True, -1, ""
+    idx, error_msg = error
+    return False, idx, error_msg
+
+
+def validate_all(
+    rows: Iterable[Row],
+    schema: Optional[Schema],
+    max_errors: Optional[int] = None,
+) -> List[Tuple[int, str]]:
+    """Find every row that does not satisfy the schema in one pass.
+
+    Args:
+        rows: Dictionaries to validate.
+        schema: JSON schema for validation.
+        max_errors: Maximum number of invalid rows to report.
+
+    Returns:
+        Invalid row indices and error messages. An invalid schema is reported
+            with row index -1.
+
+    Examples:
+        >>> schema = {"properties": {"foo": {"type": "number"}}}
+        >>> rows = [{"foo": "a"}, {"foo": 1}, {"foo": None}]
+        >>> [idx for idx, _ in validate_all(rows, schema)]
+        [0, 2]
+        >>> validate_all(rows, schema, max_errors=1)
+        [(0, "'a' is not of type 'number'")]
+    """
+
+    from jsonschema import exceptions
+
+    try:
+        validator_ = validation.validator(schema)
+    except (exceptions.SchemaError, exceptions.UnknownType) as xcpt:
+        return [(-1, str(xcpt))]
+
+    errors: List[Tuple[int, str]] = []
+    with metrics.phase(Phase.VALIDATE) as counter:
+        for idx, row in enumerate(counter.count(rows)):
+            if max_errors is not None and len(errors) >= max_errors:
+                break
+
+            error = exceptions.best_match(validator_.iter_errors(row))
+            if error is not None:
+                errors.append((idx, error.message))
+
+    return errors
 
 
 def write(
     file_path: pathlib.Path,
-    rows: List[Row],
+    rows: Iterable[Row],
     schema: Optional[Schema] = None,
     sort_keys: bool = False,
+    backend: Backend = Backend.AUTO,
+    format_: Optional[FileFormat] = None,
 ) -> None:
-    """Write data to YAML file.
+    """Atomically write data to YAML, JSON, JSON Lines, or MessagePack file.
+
+    Rows are emitted one at a time into a temporary file that replaces the
+    file only once it is completely written, so rows can be streamed from a
+    generator and a failure leaves the original file intact. Output is
+    identical for every backend. The C emitter is skipped for rows that it
+    would format differently from the Python emitter.
 
     Args:
-        file_path: YAML file path.
-        rows: List of dictionaries to write.
+        file_path: Table file path.
+        rows: Iterable of dictionaries to write.
         schema: JSON schema dictionary.
         sort_keys: Whether to sort row keys.
+        backend: YAML emitter implementation.
+        format_: File format, detected from the file extension by default.
+
+    Raises:
+        ValueError: If the requested backend or format is unavailable.
     """
 
-    if schema is None:
-        with open(file_path, "w") as handle:
-            yaml.dump(rows, handle, sort_keys=sort_keys)
-    else:
-        data = {"schema": schema, "rows": rows}
-        with open(file_path, "w") as handle:
-            yaml.dump(data, handle, sort_keys=sort_keys)
+    write_rows(file_path, rows, schema, sort_keys, backend, format_)
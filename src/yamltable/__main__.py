@@ -5,61 +5,543 @@ named __main__.py.
 """
 
 
+import collections
+import contextlib
+import functools
+import io
+import itertools
+import json
+import mmap
 import pathlib
-import pprint
-from typing import List, Optional, Tuple
+import shlex
+import signal
+import sys
+from typing import (
+    Any,
+    Collection,
+    Coroutine,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
-from rich.console import Console, Theme
 import typer
+import yaml
 
 import yamltable
-from yamltable.typing import ExitCode, FileArg, Row, Schema, StatusColor
+import yamltable.bulk
+import yamltable.cache
+import yamltable.edit
+import yamltable.external
+import yamltable.graph
+import yamltable.incremental
+import yamltable.offsets
+import yamltable.output
+import yamltable.query
+from yamltable.stream import read_span
+from yamltable.typing import (
+    Backend,
+    ExitCode,
+    FileArg,
+    FileFormat,
+    Format,
+    FormatOption,
+    Nulls,
+    Profile,
+    Row,
+    Schema,
+    StatusColor,
+)
+
+try:
+    from typer.core import TyperGroup as Group
+except ImportError:  # pragma: no cover
+    from click import Group  # type: ignore
+
+
+class ClientGroup(Group):
+    """Command group that remembers the arguments of the invoked command."""
+
+    def parse_args(self, ctx: Any, args: List[str]) -> List[str]:
+        """Parse shared options and store remaining command arguments."""
+
+        arguments: List[str] = super().parse_args(ctx, args)
+        ctx.meta["arguments"] = list(arguments)
+        return arguments
 
 
 app = typer.Typer(
+    cls=ClientGroup,
     help=(
         "Utility for working with YAML files organized similar to a relational"
         " database table."
-    )
+    ),
 )
 
-theme = Theme({"empty": "yellow", "error": "red", "success": "green"})
-console = Console(theme=theme)
+# Rich console, which is created on first use to keep startup fast.
+console: Any = None
+STYLES = {"empty": "yellow", "error": "red", "success": "green"}
+cache_app = typer.Typer(help="Manage the cache of parsed YAML files.")
+app.add_typer(cache_app, name="cache")
+state: Dict[str, Any] = {"backend": Backend.AUTO, "cache": False, "loaded": {}}
+
+# Commands that only read their file and can share one parsed copy.
+BATCH_COMMANDS = {"index", "list", "search", "validate"}
+# Commands that servers answer, where sort reloads the file it rewrites.
+SERVE_COMMANDS = BATCH_COMMANDS | {"sort"}
+# Commands that accept many files and glob patterns.
+BULK_COMMANDS = {"search", "sort", "validate"}
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    backend: Backend = typer.Option(
+        Backend.AUTO.value, help="YAML parser and emitter implementation."
+    ),
+    cache: bool = typer.Option(
+        False,
+        envvar="YAMLTABLE_CACHE",
+        help="Reuse parsed data of unchanged files from the cache.",
+    ),
+    socket: Optional[str] = typer.Option(
+        None,
+        envvar="YAMLTABLE_SOCKET",
+        help=(
+            "Unix socket of a yamltable server to run commands on if one is"
+            " listening."
+        ),
+    ),
+    profile: Optional[Profile] = typer.Option(
+        None,
+        help=(
+            "Print phase timings or write a cProfile or speedscope profile of"
+            " the command, which then runs in process."
+        ),
+    ),
+    profile_output: Optional[pathlib.Path] = typer.Option(
+        None,
+        dir_okay=False,
+        help="Output path of cprofile and speedscope profiles.",
+    ),
+) -> None:
+    """Configure options shared by every command."""
+
+    if backend == Backend.C and not yamltable.backend.LIBYAML:
+        typer.secho(
+            "Error: PyYAML was not built with libyaml support.",
+            fg=StatusColor.ERROR.value,
+            err=True,
+        )
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+    state["backend"] = backend
+    state["cache"] = cache
+
+    if profile is not None:
+        from yamltable import profiling
+
+        stop = profiling.start(profile, profile_output)
+        ctx.call_on_close(lambda: typer.echo(stop(), err=True))
+
+    if socket and profile is None and ctx.invoked_subcommand in SERVE_COMMANDS:
+        from yamltable import server
+
+        arguments = [ctx.invoked_subcommand, *ctx.meta.get("arguments", [])]
+        try:
+            response = server.request(
+                pathlib.Path(socket), shared_options(), arguments
+            )
+        except ConnectionError as xcpt:
+            typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+            raise typer.Exit(code=ExitCode.ERROR.value)
+        if response is not None:
+            code, stdout, stderr = response
+            typer.echo(stdout, nl=False)
+            typer.echo(stderr, nl=False, err=True)
+            raise typer.Exit(code=code)
+
+
+@app.command()
+def batch(
+    file_path: pathlib.Path = FileArg,
+    script: Optional[pathlib.Path] = typer.Option(
+        None,
+        dir_okay=False,
+        exists=True,
+        help="File of commands to read instead of standard input.",
+    ),
+    json_lines: bool = typer.Option(
+        False,
+        "--json-lines",
+        help="Print the result of each command as a JSON object.",
+    ),
+    separator: str = typer.Option(
+        "---", help="Line printed after the output of each command."
+    ),
+) -> None:
+    """Run commands against one parsed copy of FILE_PATH.
+
+    Commands are read one per line, such as "search --where 'port > 80'", and
+    take FILE_PATH as their last argument. Only the index, list, search, and
+    validate commands are supported. Lines starting with # are ignored. The
+    exit code is the worst exit code of all commands.
+    """
+
+    text = sys.stdin.read() if script is None else script.read_text()
+    key = file_path.resolve()
+    state["loaded"][key] = load_data(file_path)
+
+    worst = ExitCode.SUCCESS.value
+    try:
+        for line in text.splitlines():
+            try:
+                arguments = shlex.split(line, comments=True)
+            except ValueError as xcpt:
+                code, stdout = ExitCode.ERROR.value, ""
+                stderr = f"Error: {xcpt}\n"
+            else:
+                if not arguments:
+                    continue
+                code, stdout, stderr = dispatch(arguments + [str(file_path)])
+
+            worst = max(worst, code)
+            if json_lines:
+                result = {
+                    "command": line.strip(),
+                    "exit_code": code,
+                    "stdout": stdout,
+                    "stderr": stderr,
+                }
+                typer.echo(json.dumps(result))
+            else:
+                typer.echo(stdout, nl=False)
+                typer.echo(stderr, nl=False, err=True)
+                typer.echo(separator)
+    finally:
+        del state["loaded"][key]
+
+    if worst != ExitCode.SUCCESS.value:
+        raise typer.Exit(code=worst)
+
+
+@cache_app.command(name="clear")
+def cache_clear() -> None:
+    """Remove all cached files."""
+
+    count = yamltable.cache.Cache().clear()
+    typer.secho(f"Removed {count} cache entries.")
+
+
+@cache_app.command(name="stats")
+def cache_stats() -> None:
+    """Display cache usage statistics."""
+
+    stats = yamltable.cache.Cache().stats()
+    for key, value in stats.items():
+        typer.secho(f"{key}: {value}")
+
+
+@app.command()
+def convert(
+    source: pathlib.Path = FileArg,
+    dest: pathlib.Path = typer.Argument(
+        ..., dir_okay=False, resolve_path=True
+    ),
+    from_: Optional[FileFormat] = typer.Option(
+        None,
+        "--from",
+        help="Format of SOURCE, detected from its extension by default.",
+    ),
+    to: Optional[FileFormat] = typer.Option(
+        None,
+        help="Format of DEST, detected from its extension by default.",
+    ),
+    sort_keys: bool = typer.Option(False, help="Sort the keys of rows."),
+) -> None:
+    """Convert table in SOURCE to DEST in another file format.
+
+    Tables are read and written in the YAML, JSON, JSON Lines, and MessagePack
+    formats, which are detected from the .yaml, .yml, .json, .jsonl, .ndjson,
+    and .msgpack extensions. Other extensions are read as YAML. Rows are
+    streamed between formats that support it.
+    """
+
+    backend = state["backend"]
+    try:
+        rows, schema = yamltable.iter_rows(source, backend, format_=from_)
+        yamltable.write(dest, rows, schema, sort_keys, backend, to)
+    except (FileNotFoundError, TypeError, ValueError) as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+
+@app.command()
+def delete(
+    file_path: pathlib.Path = FileArg,
+    where: str = typer.Option(
+        ..., help="Query expression that rows to delete match."
+    ),
+) -> None:
+    """Delete dictionaries in FILE_PATH that match a query.
+
+    Only the deleted rows are removed from the file, so comments and
+    formatting elsewhere are preserved.
+    """
+
+    try:
+        query = yamltable.Query(where)
+        count = yamltable.edit.delete(file_path, query, state["backend"])
+    except (FileNotFoundError, TypeError, ValueError) as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+    if count:
+        get_console().print(f"Deleted {count} rows.", style="success")
+    else:
+        typer.secho(
+            f"No rows found with query {where!r}.",
+            fg=StatusColor.EMPTY.value,
+        )
+
+
+@app.command()
+def deps(
+    file_path: pathlib.Path = FileArg,
+    depends: str = typer.Option(
+        "depends", help="Key of the names that each row depends on."
+    ),
+    name: str = typer.Option("name", help="Key of the row names."),
+    dependents: Optional[str] = typer.Option(
+        None, help="Only list names that transitively depend on a name."
+    ),
+    requires: Optional[str] = typer.Option(
+        None, help="Only list names that a name transitively depends on."
+    ),
+    format_: Format = FormatOption,
+) -> None:
+    """List row names in FILE_PATH in dependency order.
+
+    The dependency graph is kept in the cache directory. Unchanged files are
+    answered without reading them, and only changed rows of modified files
+    are applied to the graph.
+    """
+
+    if dependents is not None and requires is not None:
+        typer.secho(
+            "Error: --dependents and --requires options are exclusive",
+            fg=StatusColor.ERROR.value,
+            err=True,
+        )
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+    try:
+        graph, changed = yamltable.graph.resolve(
+            file_path, depends, name, state["backend"]
+        )
+    except (FileNotFoundError, TypeError, ValueError) as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.ERROR.value)
+    if changed > 0:
+        typer.secho(f"Applied {changed} changed rows to the graph.", err=True)
+
+    target = dependents if requires is None else requires
+    if target is None:
+        names = graph.order()
+    else:
+        # Names match their YAML scalar type or the raw string.
+        typed = yamltable.query.literal(target)
+        node = typed if typed in graph.position else target
+        if node not in graph.position:
+            typer.secho(
+                f"Error: No row has name {target}.",
+                fg=StatusColor.ERROR.value,
+                err=True,
+            )
+            raise typer.Exit(code=ExitCode.ERROR.value)
+        elif dependents is None:
+            names = graph.dependencies(node)
+        else:
+            names = graph.dependents(node)
+
+    if format_ == Format.PRETTY and yamltable.output.is_terminal(sys.stdout):
+        for value in names:
+            get_console().print(value, markup=False, emoji=False)
+    else:
+        lines = yamltable.output.format_values(names, format_, name)
+        yamltable.output.write(lines, sys.stdout)
 
 
 @app.command(name="index")
-def index_(index: int, file_path: pathlib.Path = FileArg) -> None:
+def index_(
+    index: int,
+    file_path: pathlib.Path = FileArg,
+    offsets: bool = typer.Option(
+        False,
+        "--offsets",
+        help=(
+            "Create a row offset table for random access if missing. Existing"
+            " tables are always used and rebuilt once the file changes."
+        ),
+    ),
+) -> None:
     """Get row at INDEX in FILE_PATH."""
 
-    rows, _ = load_data(file_path)
-
     try:
-        row = rows[index]
+        row = offset_row(file_path, index, offsets)
+        if row is None:
+            rows, _ = stream_data(file_path)
+            row = row_at(rows, index)
     except IndexError:
-        console.print(
+        get_console().print(
             f"Error: Index {index} is out of bounds.",
             style="error",
         )
         raise typer.Exit(code=ExitCode.ERROR.value)
     else:
-        console.print(pprint.pformat(row, indent=2))
+        import pprint
+
+        get_console().print(pprint.pformat(row, indent=2))
+
+
+@app.command(name="index-build")
+def index_build(key: str, file_path: pathlib.Path = FileArg) -> None:
+    """Build search index of KEY values for FILE_PATH."""
+
+    try:
+        index = yamltable.Index.build(file_path, key, state["backend"])
+    except TypeError as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+    try:
+        sidecar = index.save(file_path)
+    except OSError as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.ERROR.value)
+    typer.secho(f"Wrote index of {len(index.spans)} values to {sidecar}.")
 
 
 @app.command(name="list")
-def list_(key: str, file_path: pathlib.Path = FileArg) -> None:
+def list_(
+    key: str, file_path: pathlib.Path = FileArg, format_: Format = FormatOption
+) -> None:
     """List all dictionary KEY values in FILE_PATH."""
 
-    rows, _ = load_data(file_path)
+    rows, _ = stream_data(file_path)
+    missing: List[int] = []
+
+    def values() -> Iterator[Any]:
+        for idx, row in enumerate(rows):
+            if key not in row:
+                missing.append(idx)
+                return
+            yield row[key]
+
+    if format_ == Format.PRETTY and yamltable.output.is_terminal(sys.stdout):
+        for value in values():
+            get_console().print(value, markup=False, emoji=False)
+    else:
+        lines = yamltable.output.format_values(values(), format_, key)
+        yamltable.output.write(lines, sys.stdout)
+
+    if missing:
+        get_console().print(
+            f"Error: Row {missing[0]} does not have key {key}.",
+            style="error",
+        )
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+
+def dispatch(
+    arguments: List[str],
+    commands: Collection[str] = BATCH_COMMANDS,
+    options: Optional[List[str]] = None,
+) -> Tuple[int, str, str]:
+    """Run command in process and capture its output.
+
+    Args:
+        arguments: Command name and arguments.
+        commands: Names of allowed commands.
+        options: Shared options, defaulting to the current ones.
+
+    Returns:
+        Exit code, standard output, and standard error.
+    """
+
+    name = arguments[0] if arguments else ""
+    if name not in commands:
+        names = ", ".join(sorted(commands))
+        error = f"Error: unsupported command {name!r}, use {names}\n"
+        return ExitCode.ERROR.value, "", error
+
+    # Pass shared options along since the application callback resets them,
+    # and disable the socket client to always run the command in process.
+    options = shared_options() if options is None else options
+    command = typer.main.get_command(app)
 
-    for idx, row in enumerate(rows):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+        stderr
+    ):
         try:
-            console.print(row[key])
-        except KeyError:
-            console.print(
-                f"Error: Row {idx} does not have key {key}.",
-                style="error",
+            command.main(
+                [*options, "--socket", "", *arguments], prog_name="yamltable"
             )
-            raise typer.Exit(code=ExitCode.ERROR.value)
+        except SystemExit as xcpt:
+            code = xcpt.code if isinstance(xcpt.code, int) else 1
+
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
+def expand_paths(patterns: List[str]) -> List[pathlib.Path]:
+    """Expand file arguments or exit with an error message.
+
+    Args:
+        patterns: File paths or glob patterns.
+
+    Returns:
+        YAML file paths.
+    """
+
+    try:
+        return yamltable.bulk.expand(patterns)
+    except FileNotFoundError as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+
+def get_console() -> Any:
+    """Get Rich console for command output.
+
+    Rich takes longer to import than most commands take to run, so the console
+    is created on first use.
+
+    Returns:
+        Rich console with the CLI's styles.
+    """
+
+    global console
+    if console is None:
+        from rich.console import Console, Theme
+
+        console = Console(theme=Theme(STYLES))
+    return console
+
+
+def is_loaded(file_path: pathlib.Path) -> bool:
+    """Check whether a batch command already parsed the file.
+
+    Args:
+        file_path: YAML file path.
+
+    Returns:
+        Whether rows of file are in memory.
+    """
+
+    return file_path.resolve() in state["loaded"]
 
 
 def load_data(file_path: pathlib.Path) -> Tuple[List[Row], Optional[Schema]]:
@@ -72,54 +554,572 @@ def load_data(file_path: pathlib.Path) -> Tuple[List[Row], Optional[Schema]]:
         YAML row data, YAML schema
     """
 
+    loaded: Optional[Tuple[List[Row], Optional[Schema]]] = state[
+        "loaded"
+    ].get(file_path.resolve())
+    if loaded is not None:
+        return loaded
+
     try:
-        return yamltable.read(file_path)
-    except (FileNotFoundError, TypeError) as xcpt:
+        if state["cache"]:
+            return yamltable.cache.Cache().read(file_path, state["backend"])
+        return yamltable.read(file_path, state["backend"])
+    except (FileNotFoundError, TypeError, ValueError) as xcpt:
         typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
         raise typer.Exit(code=ExitCode.ERROR.value)
 
 
+def offset_row(file_path: pathlib.Path, index: int, create: bool) -> Any:
+    """Read row at index with the file's offset table.
+
+    Args:
+        file_path: YAML file path.
+        index: Row position, where negative values count from the end.
+        create: Whether to build the offset table if it does not exist.
+
+    Raises:
+        IndexError: If index is out of bounds.
+
+    Returns:
+        Row at index or None if the offset table is not used.
+    """
+
+    if is_loaded(file_path):
+        return None
+    elif not (create or yamltable.offsets.path(file_path).exists()):
+        return None
+
+    try:
+        span = yamltable.offsets.span(file_path, index)
+        if span is None:
+            table = yamltable.offsets.Offsets.build(file_path, state["backend"])
+            try:
+                table.save(file_path)
+            except OSError as xcpt:
+                # Use the table in memory if its directory is not writable.
+                typer.secho(
+                    f"Warning: unable to write offset table: {xcpt}",
+                    fg=StatusColor.EMPTY.value,
+                    err=True,
+                )
+            span = table[index]
+
+        with file_path.open("rb") as handle:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                return read_span(view, span, state["backend"])
+    except TypeError:
+        # Fall back to streaming, which also reports invalid files.
+        return None
+
+
 @app.command()
-def search(key: str, value: str, file_path: pathlib.Path = FileArg) -> None:
-    """Search dictionaries in FILE_PATH with matching KEY and VALUE pairs."""
+def search(
+    arguments: List[str] = typer.Argument(
+        ..., metavar="[KEY VALUE] FILE_PATH..."
+    ),
+    where: Optional[str] = typer.Option(
+        None,
+        help=(
+            "Query expression that rows must match, such as"
+            " 'port >= 80 and name ~ ^aws'."
+        ),
+    ),
+    jobs: int = typer.Option(
+        1, min=1, help="Number of processes to search files in parallel."
+    ),
+    format_: Format = FormatOption,
+) -> None:
+    """Search dictionaries in FILE_PATHS with matching KEY and VALUE pairs.
 
-    rows, _ = load_data(file_path)
-    matches = yamltable.search(key, value, rows)
+    VALUE matches both its YAML scalar type and the raw string, so 80 matches
+    the integer and the string 80. FILE_PATHS may be glob patterns, where **
+    matches nested directories.
+    """
 
-    if matches:
-        for match in yamltable.search(key, value, rows):
-            typer.secho(pprint.pformat(match, indent=2))
+    if where is None and len(arguments) >= 3:
+        key, value = arguments[:2]
+        patterns, options = arguments[2:], ["--", key, value]
+        typed = yamltable.query.literal(value)
+        values = [value] if typed == value else [typed, value]
+        query = yamltable.Query.match(key, values)
+        description = f"(key={key}, value={value}) pair"
+    elif where is not None:
+        patterns, options = arguments, [f"--where={where}"]
+        try:
+            query = yamltable.Query(where)
+        except ValueError as xcpt:
+            typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+            raise typer.Exit(code=ExitCode.ERROR.value)
+        description = f"query {where!r}"
     else:
         typer.secho(
-            f"No rows found with (key={key}, value={value}) pair.",
+            "Error: expected KEY VALUE FILE_PATH... or --where option and"
+            " FILE_PATH...",
+            fg=StatusColor.ERROR.value,
+            err=True,
+        )
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+    file_paths = expand_paths(patterns)
+    if len(file_paths) > 1:
+        options.insert(0, f"--format={format_.value}")
+        run_files("search", options, file_paths, jobs)
+        return
+
+    matches = search_data(file_paths[0], query)
+    lines = yamltable.output.format_rows(matches, format_)
+
+    if format_ not in (Format.PLAIN, Format.PRETTY):
+        yamltable.output.write(lines, sys.stdout)
+    elif not matches:
+        typer.secho(
+            f"No rows found with {description}.",
             fg=StatusColor.EMPTY.value,
         )
+    elif format_ == Format.PRETTY and yamltable.output.is_terminal(
+        sys.stdout
+    ):
+        # Row text is printed as is, since values may look like Rich markup.
+        for line in lines:
+            get_console().print(line, end="", markup=False, emoji=False)
+    else:
+        yamltable.output.write(lines, sys.stdout)
 
 
 @app.command()
-def sort(key: str, file_path: pathlib.Path = FileArg) -> None:
-    """Sort dictionaries in FILE_PATH by KEY values."""
+def serve(
+    file_paths: List[pathlib.Path] = typer.Argument(
+        ...,
+        dir_okay=False,
+        exists=True,
+        resolve_path=True,
+        metavar="FILE_PATH...",
+    ),
+    socket_path: pathlib.Path = typer.Option(
+        ...,
+        "--socket",
+        envvar="YAMLTABLE_SOCKET",
+        help="Unix socket path to listen on.",
+    ),
+    interval: float = typer.Option(
+        1.0, min=0.01, help="Seconds between checks for changed files."
+    ),
+) -> None:
+    """Keep FILE_PATHS parsed and answer commands on a Unix socket.
+
+    Clients run index, list, search, sort, and validate commands on the server
+    with the --socket option or YAMLTABLE_SOCKET environment variable. Files
+    are reloaded once their modification time or size changes.
+    """
 
-    rows, schema = load_data(file_path)
+    import asyncio
 
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(server_task(file_paths, socket_path, interval))
+    typer.secho(
+        f"Serving {len(file_paths)} files on {socket_path}.", err=True
+    )
+
+    loop.add_signal_handler(signal.SIGTERM, task.cancel)
     try:
-        sorted_rows = yamltable.sort(key, rows)
-    except TypeError as xcpt:
+        loop.run_until_complete(task)
+    except KeyboardInterrupt:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            loop.run_until_complete(task)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        loop.close()
+
+
+def server_task(
+    file_paths: List[pathlib.Path], socket_path: pathlib.Path, interval: float
+) -> Coroutine[Any, Any, None]:
+    """Create server coroutine that keeps files parsed in memory.
+
+    Args:
+        file_paths: YAML file paths.
+        socket_path: Unix socket path to listen on.
+        interval: Seconds between checks for changed files.
+
+    Returns:
+        Coroutine that answers requests until cancelled.
+    """
+
+    from yamltable import server
+
+    backend = state["backend"]
+
+    def load(file_path: pathlib.Path) -> None:
+        try:
+            state["loaded"][file_path] = yamltable.read(file_path, backend)
+        except (OSError, TypeError, yaml.YAMLError):
+            state["loaded"].pop(file_path, None)
+
+    def handle(
+        options: List[str], arguments: List[str]
+    ) -> Tuple[int, str, str]:
+        return dispatch(arguments, SERVE_COMMANDS, options)
+
+    watcher = server.Watcher(file_paths, load)
+    return server.serve(socket_path, handle, watcher.poll, interval)
+
+
+@app.command(name="set")
+def set_(
+    assignments: List[str] = typer.Argument(..., metavar="KEY=VALUE..."),
+    file_path: pathlib.Path = FileArg,
+    where: str = typer.Option(
+        ..., help="Query expression that rows to update match."
+    ),
+    upsert: bool = typer.Option(
+        False,
+        help="Append a row if none match a query of the form 'KEY = VALUE'.",
+    ),
+) -> None:
+    """Set KEY to VALUE in dictionaries in FILE_PATH that match a query.
+
+    VALUE is parsed as a YAML scalar, so 8080 sets an integer. Only the
+    updated rows are rewritten and checked against the schema, so comments
+    and formatting elsewhere in the file are preserved.
+    """
+
+    from jsonschema import exceptions
+
+    try:
+        values = dict(map(yamltable.edit.assignment, assignments))
+        query = yamltable.Query(where)
+    except ValueError as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+    try:
+        count, inserted = yamltable.edit.update(
+            file_path, values, query, state["backend"], upsert
+        )
+    except (exceptions.SchemaError, exceptions.UnknownType) as xcpt:
+        typer.secho(
+            f"Invalid schema: {xcpt}", fg=StatusColor.ERROR.value, err=True
+        )
+        raise typer.Exit(code=ExitCode.ERROR.value)
+    except ValueError as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.INVALID.value)
+    except (FileNotFoundError, TypeError) as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+    if inserted:
+        get_console().print("Inserted 1 row.", style="success")
+    elif count:
+        get_console().print(f"Updated {count} rows.", style="success")
+    else:
+        typer.secho(
+            f"No rows found with query {where!r}.",
+            fg=StatusColor.EMPTY.value,
+        )
+
+
+def shared_options() -> List[str]:
+    """Get command line options of the current shared settings.
+
+    Returns:
+        Backend and cache options.
+    """
+
+    cache = "--cache" if state["cache"] else "--no-cache"
+    return ["--backend", state["backend"].value, cache]
+
+
+@app.command()
+def sort(
+    arguments: List[str] = typer.Argument(
+        ..., metavar="[KEY] FILE_PATH..."
+    ),
+    keys: List[str] = typer.Option(
+        [],
+        "--key",
+        "-k",
+        help=(
+            "Key to sort by, repeatable in order of precedence. Prefix with a"
+            " hyphen for descending order."
+        ),
+    ),
+    nulls: Nulls = typer.Option(
+        Nulls.LAST.value, help="Placement of missing and null values."
+    ),
+    memory_limit: Optional[str] = typer.Option(
+        None,
+        help=(
+            "Sort with temporary files to keep memory usage under a size,"
+            " such as 512M."
+        ),
+    ),
+    jobs: int = typer.Option(
+        1, min=1, help="Number of processes to sort files in parallel."
+    ),
+) -> None:
+    """Sort dictionaries in FILE_PATHS by KEY values.
+
+    FILE_PATHS may be glob patterns, where ** matches nested directories.
+    """
+
+    if keys:
+        patterns = arguments
+    elif len(arguments) >= 2:
+        keys, patterns = arguments[:1], arguments[1:]
+    else:
+        typer.secho(
+            "Error: expected KEY FILE_PATH... or --key options and"
+            " FILE_PATH...",
+            fg=StatusColor.ERROR.value,
+            err=True,
+        )
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+    file_paths = expand_paths(patterns)
+    if len(file_paths) > 1:
+        options = [f"--key={key}" for key in keys]
+        options.append(f"--nulls={nulls.value}")
+        if memory_limit is not None:
+            options.append(f"--memory-limit={memory_limit}")
+        run_files("sort", options, file_paths, jobs)
+        return
+    file_path = file_paths[0]
+
+    if memory_limit is not None:
+        sort_external(file_path, keys, nulls, memory_limit)
+        return
+
+    # Rows are held as columns while sorting and only converted back into
+    # dictionaries as they are written.
+    rows, schema = stream_data(file_path)
+
+    try:
+        table = yamltable.Table.from_rows(rows, schema).sort(keys, nulls)
+    except (TypeError, ValueError) as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.ERROR.value)
+    else:
+        yamltable.write(file_path, table, schema, backend=state["backend"])
+
+
+def sort_external(
+    file_path: pathlib.Path, keys: List[str], nulls: Nulls, memory_limit: str
+) -> None:
+    """Sort YAML file with an external merge sort.
+
+    Args:
+        file_path: YAML file path.
+        keys: Sort key names.
+        nulls: Placement of missing and null values.
+        memory_limit: Human readable maximum size of buffered rows.
+    """
+
+    try:
+        limit = yamltable.external.parse_size(memory_limit)
+        yamltable.external.sort_file(
+            file_path, keys, limit, state["backend"], nulls
+        )
+    except (FileNotFoundError, TypeError, ValueError) as xcpt:
         typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
         raise typer.Exit(code=ExitCode.ERROR.value)
+
+
+def row_at(rows: Iterator[Row], index: int) -> Row:
+    """Get row at index while only keeping necessary rows in memory.
+
+    Args:
+        rows: Row iterator.
+        index: Row position, where negative values count from the end.
+
+    Raises:
+        IndexError: If index is out of bounds.
+
+    Returns:
+        Row at index.
+    """
+
+    # Negative indices only require remembering the trailing rows.
+    if index < 0:
+        tail = collections.deque(rows, maxlen=-index)
+        if len(tail) == -index:
+            return tail[0]
     else:
-        yamltable.write(file_path, sorted_rows, schema)
+        for row in itertools.islice(rows, index, None):
+            return row
+
+    raise IndexError(f"row index {index} out of range")
+
+
+def run_files(
+    command: str,
+    arguments: List[str],
+    file_paths: List[pathlib.Path],
+    jobs: int,
+) -> None:
+    """Run command on every file and print results in file order.
+
+    Standard output of each file follows a header line with its path, and
+    lines of standard error are prefixed with the path. The exit code is the
+    worst exit code of all files.
+
+    Args:
+        command: Command name.
+        arguments: Command options and arguments that precede the file path.
+        file_paths: YAML file paths.
+        jobs: Number of processes to run the command in parallel.
+    """
+
+    function = functools.partial(
+        dispatch, commands=BULK_COMMANDS, options=shared_options()
+    )
+    lines = [[command, *arguments, str(path)] for path in file_paths]
+    results = yamltable.bulk.run(function, lines, jobs)
+
+    counts: "collections.Counter[int]" = collections.Counter()
+    for file_path, (code, stdout, stderr) in zip(file_paths, results):
+        typer.echo(f"==> {file_path} <==")
+        typer.echo(stdout, nl=False)
+        for line in stderr.splitlines():
+            typer.echo(f"{file_path}: {line}", err=True)
+        counts[code] += 1
+
+    succeeded = counts[ExitCode.SUCCESS.value]
+    invalid = counts[ExitCode.INVALID.value]
+    failed = len(file_paths) - succeeded - invalid
+    typer.secho(
+        f"Processed {len(file_paths)} files: {succeeded} succeeded,"
+        f" {invalid} invalid, {failed} failed.",
+        err=True,
+    )
+    worst = max(counts)
+    if worst != ExitCode.SUCCESS.value:
+        raise typer.Exit(code=worst)
+
+
+def search_data(file_path: pathlib.Path, query: yamltable.Query) -> List[Row]:
+    """Search YAML file with an index if one is up to date for the query.
+
+    Args:
+        file_path: YAML file path.
+        query: Query that rows must match.
+
+    Returns:
+        Matching rows.
+    """
+
+    if query.equality is not None and not is_loaded(file_path):
+        key, values = query.equality
+        index = yamltable.Index.load(file_path, key)
+        if index is not None:
+            try:
+                return index.select(file_path, values, state["backend"])
+            except TypeError:
+                pass
+
+    rows, _ = stream_data(file_path, query)
+    return list(rows)
+
+
+def stream_data(
+    file_path: pathlib.Path, where: Optional[yamltable.Query] = None
+) -> Tuple[Iterator[Row], Optional[Schema]]:
+    """Attempt to lazily load data from YAML file.
+
+    Args:
+        file_path: YAML file path
+        where: Query that rows must match.
+
+    Returns:
+        YAML row iterator, YAML schema
+    """
+
+    if state["cache"] or is_loaded(file_path):
+        rows, schema = load_data(file_path)
+        if where is None:
+            return iter(rows), schema
+        return (row for row in rows if where(row)), schema
+
+    try:
+        iterator, schema = yamltable.iter_rows(
+            file_path, state["backend"], where
+        )
+    except (FileNotFoundError, TypeError, ValueError) as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+    return _guard_rows(iterator), schema
+
+
+def _guard_rows(rows: Iterator[Row]) -> Iterator[Row]:
+    """Exit with an error message if YAML becomes invalid during iteration."""
+
+    try:
+        yield from rows
+    except TypeError as xcpt:
+        typer.secho(f"Error: {xcpt}", fg=StatusColor.ERROR.value, err=True)
+        raise typer.Exit(code=ExitCode.ERROR.value)
 
 
 @app.command()
-def validate(file_path: pathlib.Path = FileArg) -> None:
-    """Check that every dictionary in FILE_PATH has conforms to its schema."""
+def validate(
+    file_paths: List[str] = typer.Argument(..., metavar="FILE_PATH..."),
+    all_errors: bool = typer.Option(
+        False, help="Report every invalid row as a JSON document."
+    ),
+    max_errors: Optional[int] = typer.Option(
+        None, min=1, help="Maximum number of invalid rows to report."
+    ),
+    jobs: int = typer.Option(
+        1,
+        min=1,
+        help=(
+            "Number of processes to validate files, or the rows of a single"
+            " file, in parallel."
+        ),
+    ),
+    incremental: bool = typer.Option(
+        False,
+        help="Only validate rows that changed since the last valid run.",
+    ),
+) -> None:
+    """Check that every dictionary in FILE_PATHS conforms to its schema.
 
-    rows, schema = load_data(file_path)
-    valid, row, msg = yamltable.validate(rows, schema)
+    FILE_PATHS may be glob patterns, where ** matches nested directories.
+    """
+
+    if all_errors and incremental:
+        typer.secho(
+            "Error: --all-errors and --incremental options are exclusive",
+            fg=StatusColor.ERROR.value,
+            err=True,
+        )
+        raise typer.Exit(code=ExitCode.ERROR.value)
+
+    paths = expand_paths(file_paths)
+    if len(paths) > 1:
+        options = ["--all-errors"] if all_errors else []
+        if max_errors is not None:
+            options.append(f"--max-errors={max_errors}")
+        if incremental:
+            options.append("--incremental")
+        run_files("validate", options, paths, jobs)
+        return
+
+    file_path = paths[0]
+    rows, schema = stream_data(file_path)
+    if all_errors:
+        validate_report(rows, schema, max_errors)
+        return
+    elif incremental:
+        valid, row, msg = validate_incremental(file_path, rows, schema, jobs)
+    else:
+        valid, row, msg = yamltable.validate(rows, schema, jobs)
 
     if valid:
-        console.print(
+        get_console().print(
             ":thumbs_up: YAML file rows conform to its schema.",
             style="success",
         )
@@ -135,6 +1135,80 @@ def validate(file_path: pathlib.Path = FileArg) -> None:
         raise typer.Exit(code=ExitCode.INVALID.value)
 
 
+def validate_incremental(
+    file_path: pathlib.Path,
+    rows: Iterator[Row],
+    schema: Optional[Schema],
+    jobs: int,
+) -> Tuple[bool, int, str]:
+    """Validate rows that changed since the last run and report skipped rows.
+
+    Args:
+        file_path: YAML file path.
+        rows: Row iterator.
+        schema: JSON schema for validation.
+        jobs: Number of processes to validate rows in parallel.
+
+    Returns:
+        Whether all rows are valid, invalid row index or -1,
+            invalid error message.
+    """
+
+    from jsonschema import exceptions
+
+    store = yamltable.incremental.Store.load(file_path, schema)
+    try:
+        result = store.validate(rows, schema, jobs)
+    except (exceptions.SchemaError, exceptions.UnknownType) as xcpt:
+        return False, -1, str(xcpt)
+
+    store.save()
+    typer.secho(
+        f"Validated {result.checked} rows and skipped {result.skipped}"
+        " unchanged rows.",
+        err=True,
+    )
+    if result.error is None:
+        return True, -1, ""
+    return (False, *result.error)
+
+
+def validate_report(
+    rows: Iterator[Row], schema: Optional[Schema], max_errors: Optional[int]
+) -> None:
+    """Print JSON report of every invalid row.
+
+    Args:
+        rows: Row iterator.
+        schema: JSON schema for validation.
+        max_errors: Maximum number of invalid rows to report.
+    """
+
+    # Look for one extra error to tell whether the report is truncated.
+    limit = None if max_errors is None else max_errors + 1
+    errors = yamltable.validate_all(rows, schema, limit)
+    truncated = max_errors is not None and len(errors) > max_errors
+    errors = errors[:max_errors]
+
+    schema_error = errors[0][1] if errors and errors[0][0] == -1 else None
+    report = {
+        "valid": not errors,
+        "schema_error": schema_error,
+        "errors": [
+            {"row": row, "message": msg}
+            for row, msg in errors
+            if schema_error is None
+        ],
+        "truncated": truncated,
+    }
+    typer.echo(json.dumps(report, indent=2))
+
+    if schema_error is not None:
+        raise typer.Exit(code=ExitCode.ERROR.value)
+    elif errors:
+        raise typer.Exit(code=ExitCode.INVALID.value)
+
+
 @app.command()
 def version() -> None:
     """Display application version."""
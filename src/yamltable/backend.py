@@ -0,0 +1,109 @@
+"""YAML parser and emitter backend selection.
+
+PyYAML ships pure Python scanner, parser, and emitter implementations, and
+optionally C implementations when it is built against libyaml. The C loader
+and dumper are much faster and are chosen automatically when available.
+"""
+
+
+import re
+from typing import Any, Dict, IO, Union
+
+import yaml
+from yaml import composer
+
+from yamltable.typing import Backend
+
+
+LIBYAML = bool(getattr(yaml, "__with_libyaml__", False))
+
+# Printable ASCII strings are emitted as plain or single quoted scalars, which
+# both emitters fold identically. Other strings may need double quotes, whose
+# line folding differs between the emitters.
+_UNSAFE_CHARS = re.compile(r"[^\x20-\x7e]")
+
+
+if LIBYAML:
+
+    class CLoader(yaml.CSafeLoader, composer.Composer):
+        """C based safe loader with node by node composition support.
+
+        The C parser only exposes whole document composition, so the Python
+        composer is mixed in to compose one sequence item at a time.
+        """
+
+        def __init__(self, stream: Union[IO[Any], str]) -> None:
+            """Create loader for YAML stream."""
+
+            yaml.CSafeLoader.__init__(self, stream)
+            self.anchors: Dict[str, Any] = {}
+
+
+def dumper(data: Any, backend: Backend = Backend.AUTO) -> Any:
+    """Get YAML dumper class for data.
+
+    The C dumper is only used when its output is guaranteed to match the
+    Python dumper byte for byte. Otherwise the Python dumper is returned.
+
+    Args:
+        data: Data to emit.
+        backend: Requested YAML backend.
+
+    Raises:
+        ValueError: If the C backend is requested but libyaml is unavailable.
+
+    Returns:
+        Safe dumper class.
+    """
+
+    if _use_c(backend) and _emittable(data):
+        return yaml.CSafeDumper
+    return yaml.SafeDumper
+
+
+def loader(
+    stream: Union[IO[Any], str], backend: Backend = Backend.AUTO
+) -> Any:
+    """Create YAML loader for stream.
+
+    Args:
+        stream: YAML text or I/O stream.
+        backend: Requested YAML backend.
+
+    Raises:
+        ValueError: If the C backend is requested but libyaml is unavailable.
+
+    Returns:
+        Safe loader instance.
+    """
+
+    if _use_c(backend):
+        return CLoader(stream)
+    return yaml.SafeLoader(stream)
+
+
+def _emittable(data: Any) -> bool:
+    """Check if data is emitted identically by the C and Python dumpers."""
+
+    if isinstance(data, str):
+        return _UNSAFE_CHARS.search(data) is None
+    elif isinstance(data, dict):
+        return all(
+            _emittable(key) and _emittable(val) for key, val in data.items()
+        )
+    elif isinstance(data, (list, tuple)):
+        return all(_emittable(elem) for elem in data)
+    else:
+        return not isinstance(data, (bytes, bytearray))
+
+
+def _use_c(backend: Backend) -> bool:
+    """Check whether the C implementation should be used.
+
+    Raises:
+        ValueError: If the C backend is requested but libyaml is unavailable.
+    """
+
+    if backend == Backend.C and not LIBYAML:
+        raise ValueError("PyYAML was not built with libyaml support")
+    return backend != Backend.PYTHON and LIBYAML
@@ -0,0 +1,93 @@
+"""Commands over many files with a process pool.
+
+File arguments are expanded as glob patterns, where ** matches any number of
+nested directories, and every file is processed by one call in a worker
+process. Results are collected in the order of the expanded paths, so output
+does not depend on which worker finishes first.
+"""
+
+
+import glob
+import pathlib
+from typing import Callable, Iterable, List, Sequence, Set, Tuple, TypeVar
+
+
+Result = Tuple[int, str, str]
+Item = TypeVar("Item")
+
+
+def expand(patterns: Iterable[str]) -> List[pathlib.Path]:
+    """Expand file paths and glob patterns into file paths.
+
+    Existing files are taken literally even if their names contain glob
+    characters. Files matched by several arguments are only returned once.
+
+    Args:
+        patterns: File paths or glob patterns.
+
+    Raises:
+        FileNotFoundError: If a file does not exist or a pattern matches no
+            files.
+
+    Returns:
+        File paths in argument order, with the matches of each pattern sorted.
+
+    Examples:
+        >>> expand(["tests/data/*_row.yaml", "tests/data/invalid_row.yaml"])
+        [PosixPath('tests/data/invalid_row.yaml')]
+    """
+
+    paths: List[pathlib.Path] = []
+    seen: Set[pathlib.Path] = set()
+
+    for pattern in patterns:
+        path = pathlib.Path(pattern)
+        if path.is_file():
+            matches = [path]
+        elif glob.escape(pattern) == pattern:
+            raise FileNotFoundError(f"file {pattern!r} does not exist")
+        else:
+            matches = [
+                pathlib.Path(match)
+                for match in sorted(glob.glob(pattern, recursive=True))
+                if pathlib.Path(match).is_file()
+            ]
+            if not matches:
+                raise FileNotFoundError(f"no files match pattern {pattern!r}")
+
+        for match in matches:
+            key = match.resolve()
+            if key not in seen:
+                seen.add(key)
+                paths.append(match)
+
+    return paths
+
+
+def run(
+    function: Callable[[Item], Result], items: Sequence[Item], workers: int = 1
+) -> List[Result]:
+    """Call function on every item across worker processes.
+
+    Items are handed to workers one at a time, so large files do not hold up
+    a batch of small ones.
+
+    Args:
+        function: Picklable function that returns an exit code, standard
+            output, and standard error.
+        items: Function arguments, such as command lines.
+        workers: Number of worker processes.
+
+    Returns:
+        Function results in the order of items.
+    """
+
+    if workers <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+
+    from concurrent import futures
+
+    with futures.ProcessPoolExecutor(
+        max_workers=min(workers, len(items))
+    ) as executor:
+        return list(executor.map(function, items))
@@ -0,0 +1,277 @@
+"""Binary cache of parsed YAML files.
+
+Parsed rows and schemas are pickled under the user cache directory, keyed by
+the resolved file path. Entries are invalidated when the modification time,
+size, or content hash of the source file changes, and the least recently used
+entries are evicted once the cache exceeds its size limit.
+"""
+
+
+import contextlib
+import hashlib
+import os
+import pathlib
+import pickle  # nosec
+import tempfile
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from yamltable.stream import iter_rows
+from yamltable.typing import Backend, Row, Schema
+
+
+# Increment when the entry layout changes to ignore stale entries.
+FORMAT_VERSION = 1
+MAX_SIZE = 256 * 2 ** 20
+SUFFIX = ".pickle"
+
+
+class Fingerprint(NamedTuple):
+    """Identity of a file's contents."""
+
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+def directory() -> pathlib.Path:
+    """Get default cache directory.
+
+    Returns:
+        Directory under $XDG_CACHE_HOME, defaulting to ~/.cache.
+    """
+
+    base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / "yamltable"
+
+
+def fingerprint(file_path: pathlib.Path, digest: bool = True) -> Fingerprint:
+    """Compute file fingerprint.
+
+    Args:
+        file_path: File path.
+        digest: Whether to hash the file contents.
+
+    Returns:
+        File modification time, size, and content hash.
+    """
+
+    stat = file_path.stat()
+    if not digest:
+        return Fingerprint(stat.st_mtime_ns, stat.st_size, "")
+
+    hasher = hashlib.blake2b()
+    with file_path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(2 ** 20), b""):
+            hasher.update(chunk)
+
+    return Fingerprint(stat.st_mtime_ns, stat.st_size, hasher.hexdigest())
+
+
+class Cache:
+    """Least recently used cache of parsed YAML files.
+
+    Attributes:
+        path: Cache directory.
+        max_size: Maximum total size of cache entries in bytes.
+    """
+
+    def __init__(
+        self, path: Optional[pathlib.Path] = None, max_size: int = MAX_SIZE
+    ) -> None:
+        """Create cache in directory.
+
+        Args:
+            path: Cache directory, defaulting to the user cache directory.
+            max_size: Maximum total size of cache entries in bytes.
+        """
+
+        self.path = directory() / "rows" if path is None else path
+        self.max_size = max_size
+
+    def clear(self) -> int:
+        """Remove all cache entries.
+
+        Returns:
+            Number of removed entries.
+        """
+
+        count = 0
+        for entry in self._entries():
+            # Other processes may evict entries concurrently.
+            with contextlib.suppress(FileNotFoundError):
+                entry.unlink()
+                count += 1
+        return count
+
+    def get(
+        self, file_path: pathlib.Path
+    ) -> Optional[Tuple[List[Row], Optional[Schema]]]:
+        """Get cached data for file if it is still valid.
+
+        Args:
+            file_path: YAML file path.
+
+        Returns:
+            YAML row data, YAML schema or None if not cached.
+        """
+
+        return self._load(file_path, self._header(file_path))
+
+    def put(
+        self,
+        file_path: pathlib.Path,
+        rows: List[Row],
+        schema: Optional[Schema],
+    ) -> None:
+        """Store data for file and evict old entries if necessary.
+
+        Cache write failures are ignored since the cache is an optimization.
+
+        Args:
+            file_path: YAML file path.
+            rows: YAML row data.
+            schema: YAML schema.
+        """
+
+        self._store(file_path, self._header(file_path), (rows, schema))
+
+    def read(
+        self, file_path: pathlib.Path, backend: Backend = Backend.AUTO
+    ) -> Tuple[List[Row], Optional[Schema]]:
+        """Read data from cache or parse and cache YAML file.
+
+        Args:
+            file_path: YAML file path.
+            backend: YAML parser implementation.
+
+        Raises:
+            FileNotFoundError: If unable to find file path.
+            TypeError: If file is not organized as a list.
+
+        Returns:
+            YAML row data, YAML schema.
+        """
+
+        # Fingerprint before parsing so that concurrent edits invalidate the
+        # stored entry.
+        header = self._header(file_path)
+        data = self._load(file_path, header)
+        if data is None:
+            rows, schema = iter_rows(file_path, backend)
+            data = list(rows), schema
+            self._store(file_path, header, data)
+
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache usage statistics.
+
+        Returns:
+            Cache directory, entry count, total size, and maximum size.
+        """
+
+        entries = self._entries()
+        return {
+            "directory": str(self.path),
+            "entries": len(entries),
+            "size": sum(entry.stat().st_size for entry in entries),
+            "max_size": self.max_size,
+        }
+
+    def _entries(self) -> List[pathlib.Path]:
+        """Get cache entry paths."""
+
+        if not self.path.exists():
+            return []
+        return [path for path in self.path.iterdir() if path.suffix == SUFFIX]
+
+    def _entry(self, file_path: pathlib.Path) -> pathlib.Path:
+        """Get cache entry path for file."""
+
+        key = str(file_path.resolve()).encode("utf-8")
+        return self.path / (hashlib.sha256(key).hexdigest() + SUFFIX)
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until under the size limit."""
+
+        # Entries that other processes evict concurrently are skipped.
+        entries = []
+        for entry in self._entries():
+            with contextlib.suppress(FileNotFoundError):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda elem: elem[0]):
+            if total <= self.max_size:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                entry.unlink()
+            total -= size
+
+    def _header(self, file_path: pathlib.Path) -> Tuple[Any, ...]:
+        """Create entry header for validating cached data."""
+
+        path = str(file_path.resolve())
+        return (FORMAT_VERSION, path, fingerprint(file_path))
+
+    def _load(
+        self, file_path: pathlib.Path, header: Tuple[Any, ...]
+    ) -> Optional[Tuple[List[Row], Optional[Schema]]]:
+        """Load entry for file if its header matches."""
+
+        entry = self._entry(file_path)
+        try:
+            with entry.open("rb") as handle:
+                if pickle.load(handle) != header:  # nosec
+                    return None
+                rows, schema = pickle.load(handle)  # nosec
+            # Mark entry as recently used for eviction.
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        except (EOFError, OSError, pickle.UnpicklingError, ValueError):
+            with contextlib.suppress(FileNotFoundError):
+                entry.unlink()
+            return None
+
+        return rows, schema
+
+    def _store(
+        self,
+        file_path: pathlib.Path,
+        header: Tuple[Any, ...],
+        data: Tuple[List[Row], Optional[Schema]],
+    ) -> None:
+        """Atomically write entry for file and evict old entries."""
+
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            handle = tempfile.NamedTemporaryFile(
+                dir=self.path, suffix=".tmp", delete=False
+            )
+        except OSError:
+            return
+
+        # Temporary files do not count as entries, so remove them on failure
+        # to keep them from accumulating.
+        try:
+            with handle:
+                pickle.dump(header, handle, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(data, handle, pickle.HIGHEST_PROTOCOL)
+            os.replace(handle.name, self._entry(file_path))
+        except OSError:
+            _discard(handle.name)
+            return
+        except BaseException:
+            _discard(handle.name)
+            raise
+
+        self._evict()
+
+
+def _discard(path: str) -> None:
+    """Remove file if it exists."""
+
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
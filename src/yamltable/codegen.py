@@ -0,0 +1,240 @@
+"""Generated validators for simple JSON schemas.
+
+Generic validators dispatch every keyword of every subschema through several
+layers of function calls for each row. Schemas that only use the type,
+properties, required, pattern, enum, and additionalProperties keywords are
+instead translated into the source of a single Python function, with regular
+expressions compiled and key sets frozen ahead of time. The function only
+decides whether a row is valid, so error messages still come from jsonschema.
+"""
+
+
+import numbers
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from yamltable.typing import Row, Schema
+
+
+Check = Callable[[Any], bool]
+
+# Keywords without effect on validation.
+ANNOTATIONS = {
+    "$comment",
+    "$schema",
+    "default",
+    "description",
+    "examples",
+    "title",
+}
+KEYWORDS = ANNOTATIONS | {
+    "additionalProperties",
+    "enum",
+    "pattern",
+    "properties",
+    "required",
+    "type",
+}
+# Draft 7 type checks, where the value is substituted for {0}.
+TYPES = {
+    "array": "isinstance({0}, list)",
+    "boolean": "isinstance({0}, bool)",
+    "integer": (
+        "(isinstance({0}, int) and not isinstance({0}, bool)"
+        " or isinstance({0}, float) and {0}.is_integer())"
+    ),
+    "null": "{0} is None",
+    "number": "isinstance({0}, Number) and not isinstance({0}, bool)",
+    "object": "isinstance({0}, dict)",
+    "string": "isinstance({0}, str)",
+}
+
+
+class FastValidator:
+    """Validator that checks rows with generated code before jsonschema.
+
+    Attributes:
+        check: Generated function deciding whether a row is valid.
+        fallback: jsonschema validator that reports errors of invalid rows.
+    """
+
+    def __init__(self, check: Check, fallback: Any) -> None:
+        """Create validator from generated check and jsonschema validator.
+
+        Args:
+            check: Generated function deciding whether a row is valid.
+            fallback: jsonschema validator for the same schema.
+        """
+
+        self.check = check
+        self.fallback = fallback
+
+    def is_valid(self, row: Row) -> bool:
+        """Check whether row satisfies the schema."""
+
+        return self.check(row)
+
+    def iter_errors(self, row: Row) -> Iterator[Any]:
+        """Iterate over validation errors of row."""
+
+        if self.check(row):
+            return iter(())
+        return iter(self.fallback.iter_errors(row))
+
+    def validate(self, row: Row) -> None:
+        """Raise first validation error of row.
+
+        Raises:
+            ValidationError: If row does not satisfy the schema.
+        """
+
+        if not self.check(row):
+            self.fallback.validate(row)
+
+
+def compile_schema(schema: Optional[Schema]) -> Optional[Check]:
+    """Generate validity check for schema if it only uses simple keywords.
+
+    The schema must already be checked against the metaschema.
+
+    Args:
+        schema: JSON schema.
+
+    Returns:
+        Function deciding whether a value satisfies the schema or None if the
+            schema uses unsupported keywords.
+
+    Examples:
+        >>> check = compile_schema(
+        ...     {"properties": {"id": {"type": "integer"}}, "required": ["id"]}
+        ... )
+        >>> check({"id": 1}), check({"id": "1"}), check({})
+        (True, False, False)
+        >>> compile_schema({"minLength": 1}) is None
+        True
+    """
+
+    generator = _Generator()
+    try:
+        generator.schema(schema, "value", 1)
+    except (re.error, TypeError, ValueError):
+        return None
+
+    source = "\n".join(
+        ["def check(value):", *generator.lines, "    return True", ""]
+    )
+    namespace = dict(generator.constants, Number=numbers.Number)
+    # Schema values are bound to generated constant names and never written
+    # into the source, which only holds fixed templates and identifiers.
+    exec(compile(source, "<yamltable schema>", "exec"), namespace)  # nosec
+    check: Check = namespace["check"]
+    return check
+
+
+class _Generator:
+    """Translator of schemas into statements that return False if invalid."""
+
+    def __init__(self) -> None:
+        """Create generator without statements."""
+
+        self.constants: Dict[str, Any] = {}
+        self.lines: List[str] = []
+        self.variables = 0
+
+    def constant(self, value: Any) -> str:
+        """Bind value to a new global name of the generated function."""
+
+        name = f"CONSTANT_{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def emit(self, depth: int, line: str) -> None:
+        """Append indented statement."""
+
+        self.lines.append("    " * depth + line)
+
+    def schema(self, schema: Any, var: str, depth: int) -> None:
+        """Emit checks of value in variable against schema."""
+
+        if schema is True or schema == {}:
+            return
+        elif schema is False:
+            self.emit(depth, "return False")
+            return
+        elif not isinstance(schema, dict) or not KEYWORDS.issuperset(schema):
+            raise ValueError("schema uses unsupported keywords")
+
+        if "type" in schema:
+            self.type(schema["type"], var, depth)
+        if "enum" in schema:
+            self.enum(schema["enum"], var, depth)
+        if "pattern" in schema:
+            self.pattern(schema["pattern"], var, depth)
+        if not {"additionalProperties", "properties", "required"}.isdisjoint(
+            schema
+        ):
+            self.emit(depth, f"if isinstance({var}, dict):")
+            self.object(schema, var, depth + 1)
+
+    def enum(self, values: Any, var: str, depth: int) -> None:
+        """Emit membership check of strings and nulls."""
+
+        if not all(value is None or isinstance(value, str) for value in values):
+            raise ValueError("enum values must be strings or null")
+
+        strings = self.constant(
+            frozenset(value for value in values if value is not None)
+        )
+        condition = f"isinstance({var}, str) and {var} in {strings}"
+        if None in values:
+            condition = f"{var} is None or {condition}"
+        self.emit(depth, f"if not ({condition}):")
+        self.emit(depth + 1, "return False")
+
+    def object(self, schema: Dict[str, Any], var: str, depth: int) -> None:
+        """Emit checks of object keywords for a dictionary value."""
+
+        if schema.get("required"):
+            required = self.constant(frozenset(schema["required"]))
+            self.emit(depth, f"if not {var}.keys() >= {required}:")
+            self.emit(depth + 1, "return False")
+        if schema.get("additionalProperties") is False:
+            allowed = self.constant(frozenset(schema.get("properties", {})))
+            self.emit(depth, f"if not {var}.keys() <= {allowed}:")
+            self.emit(depth + 1, "return False")
+        elif schema.get("additionalProperties", True) is not True:
+            raise ValueError("additionalProperties must be a boolean")
+
+        for key, subschema in schema.get("properties", {}).items():
+            if subschema is True or subschema == {}:
+                continue
+            self.variables += 1
+            item = f"item_{self.variables}"
+            name = self.constant(key)
+            self.emit(depth, f"if {name} in {var}:")
+            self.emit(depth + 1, f"{item} = {var}[{name}]")
+            self.schema(subschema, item, depth + 1)
+
+        self.emit(depth, "pass")
+
+    def pattern(self, pattern: Any, var: str, depth: int) -> None:
+        """Emit regular expression search of string value."""
+
+        search = self.constant(re.compile(pattern).search)
+        condition = f"isinstance({var}, str) and {search}({var}) is None"
+        self.emit(depth, f"if {condition}:")
+        self.emit(depth + 1, "return False")
+
+    def type(self, types: Any, var: str, depth: int) -> None:
+        """Emit check that value has one of the types."""
+
+        if isinstance(types, str):
+            types = [types]
+        if not all(type_ in TYPES for type_ in types):
+            raise ValueError("unknown schema type")
+
+        condition = " or ".join(
+            f"({TYPES[type_].format(var)})" for type_ in types
+        )
+        self.emit(depth, f"if not ({condition or 'False'}):")
+        self.emit(depth + 1, "return False")
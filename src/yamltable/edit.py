@@ -0,0 +1,404 @@
+"""In-place updates and deletions of YAML table rows.
+
+Matching rows are located by the byte spans of their nodes while streaming the
+file. Only those rows are re-emitted, and the bytes between them are copied in
+blocks into a temporary file that atomically replaces the table. Formatting
+and comments outside the edited rows are left as they are, and updated rows
+are validated on their own against the table schema.
+
+Rows must be items of a block sequence, since their indicators are reused for
+the re-emitted rows. Rows that define anchors are not edited, since other rows
+may refer to them.
+"""
+
+
+import mmap
+import pathlib
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import yaml
+
+from yamltable import metrics, validation
+from yamltable.backend import dumper, loader as load
+from yamltable.query import literal, Query
+from yamltable.stream import atomic_open, iter_spans, Span, write_rows
+from yamltable.typing import Backend, Phase, Row, Schema
+
+
+# Bytes copied at a time between edited rows.
+BLOCK_SIZE = 2 ** 20
+# Line prefix of block sequence items before their node.
+_INDICATOR = re.compile(rb"[ \t]*-[ \t]+")
+
+Edit = Tuple[Span, bytes]
+Match = Tuple[int, Row, Span]
+
+
+def assignment(text: str) -> Tuple[str, Any]:
+    """Parse KEY=VALUE assignment.
+
+    Args:
+        text: Assignment, where the value is parsed as a YAML scalar.
+
+    Raises:
+        ValueError: If text has no equals sign or key.
+
+    Returns:
+        Row key and value.
+
+    Examples:
+        >>> assignment("port=8080"), assignment("name=a=b")
+        (('port', 8080), ('name', 'a=b'))
+    """
+
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise ValueError(f"invalid assignment {text!r}, expected KEY=VALUE")
+    return key, literal(value)
+
+
+def delete(
+    file_path: pathlib.Path, where: Query, backend: Backend = Backend.AUTO
+) -> int:
+    """Delete matching rows from a YAML table file.
+
+    Comments and blank lines after deleted rows are kept. If every row is
+    deleted, the file is rewritten as an empty table with its schema.
+
+    Args:
+        file_path: YAML file path.
+        where: Query that rows to delete match.
+        backend: YAML parser and emitter implementation.
+
+    Raises:
+        FileNotFoundError: If unable to find file path.
+        TypeError: If file is not organized as a list or a matching row cannot
+            be edited in place.
+
+    Returns:
+        Number of deleted rows.
+    """
+
+    matches, schema, count, _ = _locate(file_path, where, backend)
+    if not matches:
+        return 0
+    elif len(matches) == count:
+        write_rows(file_path, [], schema, backend=backend)
+        return count
+
+    with file_path.open("rb") as handle, _map(handle) as data:
+        edits = [_deletion(data, idx, span) for idx, _, span in matches]
+    splice(file_path, edits)
+    return len(matches)
+
+
+def splice(file_path: pathlib.Path, edits: Sequence[Edit]) -> None:
+    """Atomically replace byte spans of a file.
+
+    Bytes outside of the spans are copied in blocks without being parsed.
+
+    Args:
+        file_path: File path.
+        edits: Non-overlapping spans in file order and their replacements.
+
+    Examples:
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as directory:
+        ...     file_path = pathlib.Path(directory) / "file.txt"
+        ...     _ = file_path.write_bytes(b"abcdef")
+        ...     splice(file_path, [((1, 2), b"B"), ((4, 6), b"")])
+        ...     file_path.read_bytes()
+        b'aBcd'
+    """
+
+    with file_path.open("rb") as source, atomic_open(file_path, "wb") as dest:
+        position = 0
+        for (start, end), data in edits:
+            _copy(source, dest, start - position)
+            dest.write(data)
+            source.seek(end)
+            position = end
+        _copy(source, dest, None)
+
+
+def update(
+    file_path: pathlib.Path,
+    values: Dict[str, Any],
+    where: Query,
+    backend: Backend = Backend.AUTO,
+    upsert: bool = False,
+) -> Tuple[int, bool]:
+    """Set keys of matching rows in a YAML table file.
+
+    Args:
+        file_path: YAML file path.
+        values: Row keys and their new values.
+        where: Query that rows to update match.
+        backend: YAML parser and emitter implementation.
+        upsert: Whether to append a row if none match a query that checks a
+            single key for equality with one value.
+
+    Raises:
+        FileNotFoundError: If unable to find file path.
+        TypeError: If file is not organized as a list, a matching row cannot
+            be edited in place, or a row cannot be inserted for the query.
+        SchemaError: If the table schema is not a valid JSON schema.
+        ValueError: If an updated row does not satisfy the schema.
+
+    Returns:
+        Number of updated or inserted rows, whether a row was inserted.
+    """
+
+    matches, schema, count, last = _locate(file_path, where, backend)
+    updated = [(idx, {**row, **values}, span) for idx, row, span in matches]
+
+    if not updated and upsert:
+        if where.equality is None or len(where.equality[1]) != 1:
+            raise TypeError(
+                f"unable to insert a row for query {where.text!r}, which does"
+                " not check a single key for one value"
+            )
+        key, (value,) = where.equality
+        updated = [(count, {key: value, **values}, (-1, -1))]
+
+    if not updated:
+        return 0, False
+    _validate(updated, schema)
+
+    if last is None:
+        write_rows(file_path, [updated[0][1]], schema, backend=backend)
+        return 1, True
+
+    with file_path.open("rb") as handle, _map(handle) as data:
+        if matches:
+            edits = [
+                _replacement(data, idx, span, row, backend)
+                for idx, row, span in updated
+            ]
+        else:
+            edits = [_insertion(data, last, updated[0][1], backend)]
+    splice(file_path, edits)
+    return len(edits), not matches
+
+
+class _Empty(bytes):
+    """Contents of an empty file, which cannot be memory mapped."""
+
+    def __enter__(self) -> "_Empty":
+        """Enter context."""
+
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Exit context."""
+
+
+def _anchored(text: str) -> bool:
+    """Check whether YAML text defines anchors."""
+
+    try:
+        tokens = yaml.scan(text)
+        return any(isinstance(token, yaml.AnchorToken) for token in tokens)
+    except yaml.YAMLError:
+        return True
+
+
+def _copy(source: Any, dest: Any, size: Optional[int]) -> None:
+    """Copy a number of bytes, or all remaining bytes, in blocks."""
+
+    while size is None or size > 0:
+        limit = BLOCK_SIZE if size is None else min(size, BLOCK_SIZE)
+        block = source.read(limit)
+        if not block:
+            break
+        dest.write(block)
+        if size is not None:
+            size -= len(block)
+
+
+def _deletion(data: Any, idx: int, span: Span) -> Edit:
+    """Get edit that removes a row with its sequence indicator."""
+
+    start, end = span
+    line_start = _prefix(data, idx, start)[0]
+    trailer = _trailer(data[start:end])
+    if trailer:
+        return (line_start, end - len(trailer)), b""
+
+    return (line_start, _line_end(data, idx, end)), b""
+
+
+def _emit(row: Row, column: int, backend: Backend) -> str:
+    """Emit row as a block node that starts at a column."""
+
+    text: str = yaml.dump(row, Dumper=dumper(row, backend), sort_keys=False)
+    lines = text.splitlines(keepends=True)
+    indent = " " * column
+    return lines[0] + "".join(
+        indent + line if line.strip() else line for line in lines[1:]
+    )
+
+
+def _insertion(
+    data: Any, last: Tuple[int, Span], row: Row, backend: Backend
+) -> Edit:
+    """Get edit that appends a row after the last row."""
+
+    idx, (start, end) = last
+    _, indicator = _prefix(data, idx, start)
+    column = len(indicator.decode("utf-8"))
+    text = indicator.decode("utf-8") + _emit(row, column, backend)
+
+    # Insert before comments after the last row, which may describe the rest
+    # of the file.
+    trailer = _trailer(data[start:end])
+    position = end - len(trailer) if trailer else _line_end(data, idx, end)
+    if data[position - 1 : position] != b"\n":
+        text = "\n" + text
+    return (position, position), text.encode("utf-8")
+
+
+def _line_end(data: Any, idx: int, end: int) -> int:
+    """Get end of the line where a row ends, including its newline.
+
+    Raises:
+        TypeError: If other content follows the row on its line.
+    """
+
+    if data[end - 1 : end] == b"\n":
+        return end
+
+    line_end = data.find(b"\n", end)
+    line_end = len(data) if line_end == -1 else line_end + 1
+    rest = data[end:line_end].strip()
+    if rest and not rest.startswith(b"#"):
+        raise TypeError(f"row {idx} shares its line with other content")
+    return line_end
+
+
+def _locate(
+    file_path: pathlib.Path, where: Query, backend: Backend
+) -> Tuple[List[Match], Optional[Schema], int, Optional[Tuple[int, Span]]]:
+    """Find matching rows and their spans.
+
+    Returns:
+        Indices, rows, and spans of matching rows, YAML schema, number of rows,
+            and index and span of the last row.
+    """
+
+    rows, schema = iter_spans(file_path, backend)
+    matches = []
+    last = None
+    count = 0
+    for idx, (row, span) in enumerate(rows):
+        if where(row):
+            matches.append((idx, row, span))
+        last = idx, span
+        count += 1
+    return matches, schema, count, last
+
+
+def _map(handle: Any) -> Any:
+    """Memory map file handle, or return its bytes if it is empty."""
+
+    try:
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        return _Empty()
+
+
+def _prefix(data: Any, idx: int, start: int) -> Tuple[int, bytes]:
+    """Get line start and sequence indicator prefix of a row.
+
+    Raises:
+        TypeError: If the row is not an item of a block sequence.
+    """
+
+    line_start = data.rfind(b"\n", 0, start) + 1
+    prefix = data[line_start:start]
+    if not _INDICATOR.fullmatch(prefix):
+        raise TypeError(
+            f"row {idx} is not a block sequence item and cannot be edited in"
+            " place"
+        )
+    return line_start, prefix
+
+
+def _replacement(
+    data: Any, idx: int, span: Span, row: Row, backend: Backend
+) -> Edit:
+    """Get edit that replaces a row with its re-emitted text.
+
+    Raises:
+        TypeError: If the row defines anchors or its replacement does not
+            parse back to the row.
+    """
+
+    start, end = span
+    _, indicator = _prefix(data, idx, start)
+    padding = " " * len(indicator.decode("utf-8"))
+    original = data[start:end].decode("utf-8")
+    if _anchored(padding + original):
+        raise TypeError(
+            f"row {idx} defines anchors and cannot be edited in place"
+        )
+
+    trailer = _trailer(original.encode("utf-8")).decode("utf-8")
+    text = _emit(row, len(padding), backend)
+    if not original[: len(original) - len(trailer)].endswith("\n"):
+        text = text.rstrip("\n")
+
+    # Trailing blank lines belong to some block scalars, so the comments and
+    # blank lines after the row are only kept if the row parses the same.
+    for candidate in (text + trailer, text):
+        if _parse(padding + candidate, backend) == row:
+            return span, candidate.encode("utf-8")
+    raise TypeError(f"row {idx} cannot be re-emitted in place")
+
+
+def _parse(text: str, backend: Backend) -> Any:
+    """Parse standalone YAML node."""
+
+    loader = load(text, backend)
+    try:
+        return loader.get_single_data()
+    except yaml.YAMLError:
+        return None
+    finally:
+        loader.dispose()
+
+
+def _trailer(text: bytes) -> bytes:
+    """Get trailing comment and blank lines of a row's text.
+
+    The trailer includes the indentation before the next token, such as the
+    next sequence indicator.
+    """
+
+    lines = text.splitlines(keepends=True)
+    idx = len(lines)
+    while idx > 1:
+        line = lines[idx - 1].strip()
+        if line and not line.startswith(b"#"):
+            break
+        idx -= 1
+    return b"".join(lines[idx:])
+
+
+def _validate(matches: List[Match], schema: Optional[Schema]) -> None:
+    """Check updated rows against the schema, if the table has one.
+
+    Raises:
+        ValueError: If a row is invalid.
+    """
+
+    if schema is None:
+        return
+
+    with metrics.phase(Phase.VALIDATE) as counter:
+        counter.rows = len(matches)
+        error = validation.first_error((row for _, row, _ in matches), schema)
+    if error is not None:
+        idx, message = error
+        raise ValueError(f"invalid row {matches[idx][0]}: {message}")
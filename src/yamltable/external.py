@@ -0,0 +1,241 @@
+"""External merge sort for YAML files larger than memory.
+
+Rows are pickled into sorted runs whose serialized size stays under a memory
+limit. Runs that do not fit are spilled to temporary files and k-way merged
+with heapq straight into the YAML emitter, so neither the whole table nor its
+YAML event tree is ever held in memory.
+"""
+
+
+import heapq
+import pathlib
+import pickle  # nosec
+import re
+import tempfile
+from typing import (
+    Any,
+    Callable,
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from yamltable import metrics, sorting
+from yamltable.stream import iter_rows, write_rows
+from yamltable.typing import Backend, Nulls, Phase, Row
+
+
+UNITS = {"": 1, "K": 2 ** 10, "M": 2 ** 20, "G": 2 ** 30, "T": 2 ** 40}
+
+
+def parse_size(text: str) -> int:
+    """Parse human readable byte size with binary unit suffixes.
+
+    Args:
+        text: Byte count with an optional K, M, G, or T suffix.
+
+    Raises:
+        ValueError: If text is not a positive size.
+
+    Returns:
+        Number of bytes.
+
+    Examples:
+        >>> parse_size("512M")
+        536870912
+        >>> parse_size("64kb")
+        65536
+    """
+
+    match = re.fullmatch(r"\s*(\d+)\s*([KMGT]?)I?B?\s*", text.upper())
+    if match is None or int(match.group(1)) == 0:
+        raise ValueError(f"invalid memory size {text!r}")
+
+    return int(match.group(1)) * UNITS[match.group(2)]
+
+
+def sort(
+    key: Union[str, Sequence[str]],
+    rows: Iterable[Row],
+    memory_limit: int,
+    directory: Optional[pathlib.Path] = None,
+    nulls: Nulls = Nulls.LAST,
+) -> Iterator[Row]:
+    """Sort rows by key values within a memory limit.
+
+    Every row is consumed before this function returns, so the source of the
+    rows can be overwritten while iterating over the result. Sorting is stable
+    and equivalent to yamltable.sort.
+
+    Args:
+        key: Sort key name or names.
+        rows: Iterable of dictionaries.
+        memory_limit: Maximum serialized size of rows buffered in memory.
+        directory: Directory for temporary run files.
+        nulls: Placement of missing and null values.
+
+    Raises:
+        TypeError: If key values of a run are not comparable. Incomparable
+            values across runs raise during iteration.
+        ValueError: If no key names are given.
+
+    Returns:
+        Iterator of sorted rows.
+
+    Examples:
+        >>> list(sort("foo", [{"foo": 2}, {"foo": 1}], 2 ** 20))
+        [{'foo': 1}, {'foo': 2}]
+    """
+
+    keys = sorting.parse_keys(key)
+    runs: List[IO[bytes]] = []
+    try:
+        with metrics.phase(Phase.TRANSFORM) as counter:
+            rows = counter.count(rows)
+            run = _spill(keys, nulls, rows, memory_limit, directory, runs)
+    except BaseException:
+        _close(runs)
+        raise
+
+    if not runs:
+        return (pickle.loads(blob) for _, blob in run)  # nosec
+    return _merge(runs, sorting.comparator(keys, nulls))
+
+
+def sort_file(
+    file_path: pathlib.Path,
+    key: Union[str, Sequence[str]],
+    memory_limit: int,
+    backend: Backend = Backend.AUTO,
+    nulls: Nulls = Nulls.LAST,
+) -> None:
+    """Sort rows of table file by key values within a memory limit.
+
+    Output is byte identical to sorting and writing the file in memory. The
+    original file is only replaced once the merge succeeds.
+
+    Args:
+        file_path: Table file path.
+        key: Sort key name or names.
+        memory_limit: Maximum serialized size of rows buffered in memory.
+        backend: YAML parser and emitter implementation.
+        nulls: Placement of missing and null values.
+
+    Raises:
+        FileNotFoundError: If unable to find file path.
+        TypeError: If file is not organized as a list or key values are not
+            comparable.
+        ValueError: If no key names are given or the requested backend is
+            unavailable.
+    """
+
+    rows, schema = iter_rows(file_path, backend)
+    sorted_rows = sort(key, rows, memory_limit, file_path.parent, nulls)
+    write_rows(file_path, sorted_rows, schema, backend=backend)
+
+
+def _close(runs: List[IO[bytes]]) -> None:
+    """Close and thereby delete temporary run files."""
+
+    for run in runs:
+        run.close()
+
+
+def _merge(
+    runs: List[IO[bytes]], compare: Callable[[Sequence[Any]], Any]
+) -> Iterator[Row]:
+    """Merge sorted runs while preserving the order of equal keys."""
+
+    try:
+        # Ties resolve to earlier runs, which hold earlier rows.
+        merged = heapq.merge(
+            *[_read_run(run) for run in runs],
+            key=lambda entry: compare(entry[0]),
+        )
+        for _, row in merged:
+            yield row
+    finally:
+        _close(runs)
+
+
+def _read_run(run: IO[bytes]) -> Iterator[Tuple[Tuple[Any, ...], Row]]:
+    """Read key values and rows from run file."""
+
+    run.seek(0)
+    while True:
+        try:
+            value = pickle.load(run)  # nosec
+        except EOFError:
+            return
+        yield value, pickle.load(run)  # nosec
+
+
+def _spill(
+    keys: List[sorting.SortKey],
+    nulls: Nulls,
+    rows: Iterable[Row],
+    memory_limit: int,
+    directory: Optional[pathlib.Path],
+    runs: List[IO[bytes]],
+) -> List[Tuple[Tuple[Any, ...], bytes]]:
+    """Sort rows in chunks and write chunks over the memory limit to runs.
+
+    Args:
+        keys: Sort keys.
+        nulls: Placement of missing and null values.
+        rows: Iterable of dictionaries.
+        memory_limit: Maximum serialized size of rows buffered in memory.
+        directory: Directory for temporary run files.
+        runs: List to append run files to.
+
+    Returns:
+        Last sorted chunk if no runs were written, otherwise an empty list.
+    """
+
+    run: List[Tuple[Tuple[Any, ...], bytes]] = []
+    size = 0
+
+    for row in rows:
+        # Key values are computed once and stored beside each row.
+        blob = pickle.dumps(row, pickle.HIGHEST_PROTOCOL)
+        run.append((tuple(row.get(key.name) for key in keys), blob))
+        size += len(blob)
+
+        if size >= memory_limit:
+            runs.append(_write_run(_sorted(run, keys, nulls), directory))
+            run = []
+            size = 0
+
+    if runs and run:
+        runs.append(_write_run(_sorted(run, keys, nulls), directory))
+        return []
+    return _sorted(run, keys, nulls)
+
+
+def _sorted(
+    run: List[Tuple[Tuple[Any, ...], bytes]],
+    keys: List[sorting.SortKey],
+    nulls: Nulls,
+) -> List[Tuple[Tuple[Any, ...], bytes]]:
+    """Sort chunk of key values and pickled rows."""
+
+    values = list(zip(*(value for value, _ in run)))
+    return [run[idx] for idx in sorting.order(values, keys, nulls)]
+
+
+def _write_run(
+    run: List[Tuple[Tuple[Any, ...], bytes]], directory: Optional[pathlib.Path]
+) -> IO[bytes]:
+    """Write sorted chunk to an anonymous temporary file."""
+
+    handle = tempfile.TemporaryFile(dir=directory, suffix=".run")
+    for value, blob in run:
+        pickle.dump(value, handle, pickle.HIGHEST_PROTOCOL)
+        handle.write(blob)
+
+    return handle
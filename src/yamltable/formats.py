@@ -0,0 +1,342 @@
+"""JSON, JSON Lines, and MessagePack table files.
+
+Tables in these formats keep the organization of YAML tables, either a list of
+rows or a mapping with schema and rows keys. JSON Lines files hold one row per
+line, preceded by a line with a single schema key if the table has a schema.
+They are read one row at a time, as are MessagePack files whose schema comes
+before their rows. MessagePack support requires the optional msgpack package,
+which the msgpack extra installs.
+
+Values without a JSON or MessagePack type, such as YAML timestamps, are
+written as strings.
+"""
+
+
+import itertools
+import json
+import pathlib
+from typing import (
+    Any,
+    Dict,
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from yamltable.typing import FileFormat, Row, Schema
+
+
+EXTENSIONS = {
+    ".json": FileFormat.JSON,
+    ".jsonl": FileFormat.JSONL,
+    ".msgpack": FileFormat.MSGPACK,
+    ".ndjson": FileFormat.JSONL,
+    ".yaml": FileFormat.YAML,
+    ".yml": FileFormat.YAML,
+}
+NAMES = {
+    FileFormat.JSON: "JSON",
+    FileFormat.JSONL: "JSON Lines",
+    FileFormat.MSGPACK: "MessagePack",
+    FileFormat.YAML: "YAML",
+}
+
+# First bytes of MessagePack arrays and maps.
+_ARRAY_BYTES = {*range(0x90, 0xA0), 0xDC, 0xDD}
+_MAP_BYTES = {*range(0x80, 0x90), 0xDE, 0xDF}
+
+
+def detect(file_path: pathlib.Path) -> FileFormat:
+    """Detect table file format from file extension.
+
+    Args:
+        file_path: Table file path.
+
+    Returns:
+        File format, which is YAML for unknown extensions.
+
+    Examples:
+        >>> detect(pathlib.Path("table.JSONL"))
+        <FileFormat.JSONL: 'jsonl'>
+        >>> detect(pathlib.Path("table.txt"))
+        <FileFormat.YAML: 'yaml'>
+    """
+
+    return EXTENSIONS.get(file_path.suffix.lower(), FileFormat.YAML)
+
+
+def dump_rows(
+    handle: IO[bytes],
+    rows: Iterable[Row],
+    schema: Optional[Schema],
+    format_: FileFormat,
+    sort_keys: bool = False,
+) -> None:
+    r"""Write rows to binary stream in a JSON or MessagePack format.
+
+    JSON and JSON Lines rows are written one at a time. MessagePack arrays
+    start with their length, so rows are collected before they are written.
+
+    Args:
+        handle: Binary I/O stream.
+        rows: Iterable of rows to write.
+        schema: JSON schema dictionary.
+        format_: JSON, JSON Lines, or MessagePack file format.
+        sort_keys: Whether to sort row keys.
+
+    Raises:
+        ValueError: If MessagePack is requested but msgpack is unavailable.
+
+    Examples:
+        >>> import io
+        >>> handle = io.BytesIO()
+        >>> schema = {"type": "object"}
+        >>> dump_rows(handle, [{"foo": 1}], schema, FileFormat.JSONL)
+        >>> handle.getvalue()
+        b'{"schema": {"type": "object"}}\n{"foo": 1}\n'
+    """
+
+    if format_ == FileFormat.MSGPACK:
+        _dump_msgpack(handle, rows, schema, sort_keys)
+        return
+
+    def encode(data: Any) -> bytes:
+        text = json.dumps(
+            data, ensure_ascii=False, default=str, sort_keys=sort_keys
+        )
+        return text.encode("utf-8")
+
+    if format_ == FileFormat.JSONL:
+        items = iter(rows)
+        head = list(itertools.islice(items, 1))
+        # A first row with a single schema key would be read as a schema line,
+        # so an empty schema line is written before it.
+        if schema is not None or (head and _is_header(head[0])):
+            handle.write(encode({"schema": schema}) + b"\n")
+        for row in itertools.chain(head, items):
+            handle.write(encode(row) + b"\n")
+        return
+
+    if schema is not None:
+        handle.write(b'{"schema": ' + encode(schema) + b', "rows": ')
+    separator = b"[\n"
+    for row in rows:
+        handle.write(separator + encode(row))
+        separator = b",\n"
+    handle.write(b"[]" if separator == b"[\n" else b"\n]")
+    handle.write(b"}\n" if schema is not None else b"\n")
+
+
+def iter_rows(
+    file_path: pathlib.Path, format_: FileFormat
+) -> Tuple[Iterator[Row], Optional[Schema]]:
+    """Lazily read rows from a JSON or MessagePack table file.
+
+    Args:
+        file_path: Table file path.
+        format_: JSON, JSON Lines, or MessagePack file format.
+
+    Raises:
+        FileNotFoundError: If unable to find file path.
+        TypeError: If file is invalid or not organized as a table. Invalid
+            rows of streamed files raise during iteration.
+        ValueError: If MessagePack is requested but msgpack is unavailable.
+
+    Returns:
+        Row iterator, JSON schema.
+    """
+
+    name = NAMES[format_]
+    if format_ == FileFormat.JSON:
+        with file_path.open("rb") as handle:
+            try:
+                data = json.loads(handle.read())
+            except ValueError as xcpt:
+                raise TypeError(f"invalid {name} file: {xcpt}")
+        rows, schema = _organize(data, name)
+        return iter(rows), schema
+
+    handle = file_path.open("rb")
+    try:
+        if format_ == FileFormat.JSONL:
+            return _iter_lines(handle)
+        return _iter_msgpack(handle)
+    except BaseException:
+        handle.close()
+        raise
+
+
+def _chain(first: Any, items: Iterator[Any]) -> Iterator[Any]:
+    """Yield first item before the remaining items."""
+
+    yield first
+    yield from items
+
+
+def _close_after(items: Iterator[Any], handle: IO[bytes]) -> Iterator[Any]:
+    """Close file handle once items are exhausted or discarded."""
+
+    try:
+        yield from items
+    finally:
+        handle.close()
+
+
+def _dump_msgpack(
+    handle: IO[bytes],
+    rows: Iterable[Row],
+    schema: Optional[Schema],
+    sort_keys: bool,
+) -> None:
+    """Write rows to binary stream as MessagePack."""
+
+    msgpack = _import_msgpack()
+    packer = msgpack.Packer(default=str)
+    items = list(rows)
+
+    def pack(data: Any) -> bytes:
+        packed: bytes = packer.pack(_sort(data) if sort_keys else data)
+        return packed
+
+    if schema is not None:
+        handle.write(packer.pack_map_header(2))
+        handle.write(pack("schema") + pack(schema) + pack("rows"))
+    handle.write(packer.pack_array_header(len(items)))
+    for row in items:
+        handle.write(pack(row))
+
+
+def _import_msgpack() -> Any:
+    """Import optional msgpack package.
+
+    Raises:
+        ValueError: If msgpack is not installed.
+    """
+
+    try:
+        import msgpack
+    except ImportError:
+        raise ValueError(
+            "MessagePack files require the msgpack package, install"
+            " yamltable[msgpack]"
+        )
+    return msgpack
+
+
+def _is_header(data: Any) -> bool:
+    """Check whether JSON Lines item is a schema line."""
+
+    return isinstance(data, dict) and len(data) == 1 and "schema" in data
+
+
+def _iter_lines(handle: IO[bytes]) -> Tuple[Iterator[Row], Optional[Schema]]:
+    """Read schema line of JSON Lines file and stream the remaining rows."""
+
+    items = _parse_lines(handle)
+    for first in items:
+        if _is_header(first):
+            return _close_after(items, handle), first["schema"]
+        return _close_after(_chain(first, items), handle), None
+
+    handle.close()
+    return iter([]), None
+
+
+def _iter_msgpack(
+    handle: IO[bytes],
+) -> Tuple[Iterator[Row], Optional[Schema]]:
+    """Read MessagePack table up to its rows."""
+
+    msgpack = _import_msgpack()
+    name = NAMES[FileFormat.MSGPACK]
+    unpacker = msgpack.Unpacker(handle, raw=False, strict_map_key=False)
+    first = handle.read(1)
+    handle.seek(0)
+
+    try:
+        if first and first[0] in _ARRAY_BYTES:
+            count = unpacker.read_array_header()
+            return _close_after(_unpack(unpacker, count), handle), None
+        elif not first or first[0] not in _MAP_BYTES:
+            raise TypeError(f"{name} file is not organized in a tabular format")
+
+        data: Dict[Any, Any] = {}
+        for _ in range(unpacker.read_map_header()):
+            key = unpacker.unpack()
+            if key == "rows" and "schema" in data and "rows" not in data:
+                count = unpacker.read_array_header()
+                rows = _close_after(_unpack(unpacker, count), handle)
+                return rows, data["schema"]
+            data[key] = unpacker.unpack()
+    except (ValueError, msgpack.UnpackException) as xcpt:
+        raise TypeError(f"invalid {name} file: {xcpt}")
+
+    handle.close()
+    rows_, schema = _organize(data, name)
+    return iter(rows_), schema
+
+
+def _organize(data: Any, name: str) -> Tuple[List[Row], Optional[Schema]]:
+    """Split parsed table into rows and schema.
+
+    Raises:
+        TypeError: If data is not organized as a table.
+    """
+
+    if isinstance(data, list):
+        return data, None
+    elif not isinstance(data, dict):
+        raise TypeError(f"{name} file is not organized in a tabular format")
+    elif "schema" not in data or "rows" not in data:
+        raise TypeError(
+            f"{name} file does not have a schema and rows organization"
+        )
+    elif not isinstance(data["rows"], list):
+        raise TypeError(f"{name} file rows are not organized as a list")
+
+    return data["rows"], data["schema"]
+
+
+def _parse_lines(handle: IO[bytes]) -> Iterator[Any]:
+    """Parse non-blank lines of JSON Lines file.
+
+    Raises:
+        TypeError: If a line is not valid JSON.
+    """
+
+    for number, line in enumerate(handle, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as xcpt:
+                raise TypeError(
+                    f"invalid JSON Lines file: line {number}: {xcpt}"
+                )
+
+
+def _sort(data: Any) -> Any:
+    """Recursively sort dictionary keys."""
+
+    if isinstance(data, dict):
+        return {key: _sort(data[key]) for key in sorted(data)}
+    elif isinstance(data, list):
+        return [_sort(item) for item in data]
+    return data
+
+
+def _unpack(unpacker: Any, count: int) -> Iterator[Any]:
+    """Unpack a number of MessagePack objects.
+
+    Raises:
+        TypeError: If the MessagePack data is invalid.
+    """
+
+    msgpack = _import_msgpack()
+    try:
+        for _ in range(count):
+            yield unpacker.unpack()
+    except (ValueError, msgpack.UnpackException) as xcpt:
+        raise TypeError(f"invalid MessagePack file: {xcpt}")
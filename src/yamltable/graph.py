@@ -0,0 +1,558 @@
+"""Persisted dependency graphs with incremental topological ordering.
+
+A graph keeps the dependencies of every row name, the reverse adjacency, and
+a topological order of the names. Graphs are pickled under the user cache
+directory with the fingerprint of their source file, so unchanged files are
+answered without parsing them. Changed files are diffed against the stored
+dependencies and only added, removed, and changed rows are applied.
+
+New dependencies are inserted with the dynamic topological ordering algorithm
+of Pearce and Kelly. An edge that already agrees with the order costs O(1).
+Otherwise only the names between its endpoints in the order that reach or are
+reached from them are visited and shuffled among their own positions, which
+is typically far less than the whole graph. Removed dependencies never
+invalidate an order. Incremental orders are valid topological orders, but may
+differ from the depth grouped order of a full `dependencies` run.
+
+Transitive dependents and dependencies are answered by searches pruned with
+the order, since a dependent of a name always follows it. The results are in
+topological order.
+"""
+
+
+import hashlib
+import pathlib
+import pickle  # nosec
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from yamltable.cache import directory, Fingerprint, fingerprint
+from yamltable.stream import atomic_open, iter_rows
+from yamltable.typing import Backend, Row
+
+
+# Increment when the store layout changes to ignore old graphs.
+FORMAT_VERSION = 1
+
+_REMOVED = object()
+
+Edge = Tuple[Any, Any]
+
+
+def path(file_path: pathlib.Path, depends: str, name: str) -> pathlib.Path:
+    """Get store path of a file's dependency graph.
+
+    Args:
+        file_path: Table file path.
+        depends: Dictionary key whose values are other dictionary dependencies.
+        name: Foreign key for dependencies.
+
+    Returns:
+        Path under the user cache directory.
+    """
+
+    key = "\0".join([str(file_path.resolve()), depends, name])
+    digest = hashlib.sha256(key.encode("utf-8", "surrogatepass")).hexdigest()
+    return directory() / "graphs" / f"{digest}.pickle"
+
+
+class Graph:
+    """Dependency graph of row names with a maintained topological order.
+
+    Attributes:
+        depends: Dictionary key whose values are other dictionary dependencies.
+        name: Foreign key for dependencies.
+        requires: Mapping from names to the names they depend on.
+        required_by: Mapping from names to the names that depend on them.
+        position: Mapping from names to their slot in the order.
+        slots: Topological order with placeholders for removed names.
+        fingerprint: Table file fingerprint when the graph was last updated.
+    """
+
+    def __init__(
+        self,
+        depends: str,
+        name: str,
+        requires: Dict[Any, Set[Any]],
+        order: List[Any],
+        fingerprint: Optional[Fingerprint] = None,
+    ) -> None:
+        """Create graph from dependencies and a topological order.
+
+        Args:
+            depends: Dictionary key whose values are other dictionary
+                dependencies.
+            name: Foreign key for dependencies.
+            requires: Mapping from names to the names they depend on.
+            order: Topological order of every name.
+            fingerprint: Table file fingerprint when the graph was built.
+        """
+
+        self.depends = depends
+        self.name = name
+        self.requires = requires
+        self.fingerprint = fingerprint
+        self.slots: List[Any] = list(order)
+        self.position = {node: idx for idx, node in enumerate(order)}
+        self.required_by: Dict[Any, Set[Any]] = {
+            node: set() for node in order
+        }
+        for node, deps in requires.items():
+            for dep in deps:
+                self.required_by[dep].add(node)
+
+    @classmethod
+    def build(cls, rows: Iterable[Row], depends: str, name: str) -> "Graph":
+        """Build graph and its order from every row.
+
+        Args:
+            rows: Rows with unique names.
+            depends: Dictionary key whose values are other dictionary
+                dependencies.
+            name: Foreign key for dependencies.
+
+        Raises:
+            ValueError: If rows repeat names, lack keys, or contain circular
+                or unknown requirements.
+
+        Returns:
+            Graph ordered like the dependencies function.
+
+        Examples:
+            >>> rows = [
+            ...     {"name": "a", "depends": ["b"]},
+            ...     {"name": "b", "depends": []},
+            ... ]
+            >>> Graph.build(rows, "depends", "name").order()
+            ['b', 'a']
+        """
+
+        from yamltable import dependencies
+
+        requires = _requirements(rows, depends, name)
+        unsorted = [
+            {name: node, depends: list(deps)}
+            for node, deps in requires.items()
+        ]
+        order = [row[name] for row in dependencies(unsorted, depends, name)]
+        return cls(depends, name, requires, order)
+
+    @classmethod
+    def load(
+        cls, file_path: pathlib.Path, depends: str, name: str
+    ) -> Optional["Graph"]:
+        """Load stored graph of a table file, even if the file changed.
+
+        Args:
+            file_path: Table file path.
+            depends: Dictionary key whose values are other dictionary
+                dependencies.
+            name: Foreign key for dependencies.
+
+        Returns:
+            Graph or None if missing or stored in an old layout.
+        """
+
+        try:
+            with path(file_path, depends, name).open("rb") as handle:
+                data = pickle.load(handle)  # nosec
+            version, fingerprint_, requires, order = data
+        except (EOFError, OSError, pickle.UnpicklingError, ValueError):
+            return None
+
+        if version != FORMAT_VERSION:
+            return None
+        return cls(depends, name, requires, order, fingerprint_)
+
+    def dependencies(self, node: Any) -> List[Any]:
+        """Find names that a name transitively depends on.
+
+        Args:
+            node: Row name.
+
+        Raises:
+            KeyError: If no row has the name.
+
+        Returns:
+            Dependencies in topological order.
+        """
+
+        limit = self.position[node]
+        return self._reach(node, self.requires, lambda idx: idx < limit)
+
+    def dependents(self, node: Any) -> List[Any]:
+        """Find names that transitively depend on a name.
+
+        Args:
+            node: Row name.
+
+        Raises:
+            KeyError: If no row has the name.
+
+        Returns:
+            Dependents in topological order.
+        """
+
+        limit = self.position[node]
+        return self._reach(node, self.required_by, lambda idx: idx > limit)
+
+    def order(self) -> List[Any]:
+        """Get topological order of names.
+
+        Returns:
+            Names, each after every name it depends on.
+        """
+
+        return [node for node in self.slots if node is not _REMOVED]
+
+    def save(self, file_path: pathlib.Path) -> None:
+        """Atomically write graph and the fingerprint it is current for.
+
+        Store write failures are ignored since the store is an optimization.
+
+        Args:
+            file_path: Table file path.
+        """
+
+        data = (FORMAT_VERSION, self.fingerprint, self.requires, self.order())
+        store_path = path(file_path, self.depends, self.name)
+        try:
+            store_path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_open(store_path, "wb") as handle:
+                pickle.dump(data, handle, pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            return
+
+    def sync(self, rows: Iterable[Row]) -> int:
+        """Update graph to match every current row.
+
+        Args:
+            rows: Rows with unique names.
+
+        Raises:
+            ValueError: If rows repeat names, lack keys, or contain circular
+                or unknown requirements. The graph is left unchanged.
+
+        Returns:
+            Number of added, removed, and changed rows.
+        """
+
+        requires = _requirements(rows, self.depends, self.name)
+        changed = {
+            node: deps
+            for node, deps in requires.items()
+            if self.requires.get(node) != deps
+        }
+        removed = [node for node in self.requires if node not in requires]
+        self._apply(changed, removed)
+        return len(changed) + len(removed)
+
+    def update(self, rows: Iterable[Row], removed: Iterable[Any] = ()) -> None:
+        """Apply added, changed, and removed rows.
+
+        Args:
+            rows: Added rows and new versions of changed rows.
+            removed: Names of removed rows.
+
+        Raises:
+            ValueError: If rows repeat names, lack keys, or contain circular
+                or unknown requirements, or removed names are unknown. The
+                graph is left unchanged.
+
+        Examples:
+            >>> graph = Graph.build(
+            ...     [{"name": "b", "depends": []}], "depends", "name"
+            ... )
+            >>> graph.update([{"name": "a", "depends": ["b"]}])
+            >>> graph.update([{"name": "b", "depends": ["c"]},
+            ...               {"name": "c", "depends": []}])
+            >>> graph.order()
+            ['c', 'b', 'a']
+        """
+
+        changed = _requirements(rows, self.depends, self.name)
+        removals = list(dict.fromkeys(removed))
+        for node in removals:
+            if node not in self.requires or node in changed:
+                raise ValueError(f"unable to remove name {node!r}.")
+        self._apply(changed, removals)
+
+    def _apply(self, changed: Dict[Any, Set[Any]], removed: List[Any]) -> None:
+        """Apply new dependencies of names and remove names atomically.
+
+        Raises:
+            ValueError: If a name would depend on an unknown name or the
+                dependencies would be circular.
+        """
+
+        gone = set(removed)
+        for node, deps in changed.items():
+            for dep in deps:
+                known = dep in self.requires or dep in changed
+                if dep in gone or not known:
+                    raise ValueError(
+                        f"name {node!r} depends on unknown name {dep!r}."
+                    )
+        for node in removed:
+            for dependent in self.required_by[node]:
+                if dependent not in gone and dependent not in changed:
+                    raise ValueError(
+                        f"name {dependent!r} depends on removed name"
+                        f" {node!r}."
+                    )
+
+        journal = _Journal(len(self.slots))
+        try:
+            self._change(changed, removed, journal)
+        except BaseException:
+            self._undo(journal)
+            raise
+
+        if len(self.slots) > 2 * len(self.position) + 64:
+            self._compact()
+
+    def _change(
+        self,
+        changed: Dict[Any, Set[Any]],
+        removed: List[Any],
+        journal: "_Journal",
+    ) -> None:
+        """Apply validated changes while recording them in a journal.
+
+        Raises:
+            ValueError: If the dependencies would be circular.
+        """
+
+        for node, deps in changed.items():
+            for dep in self.requires.get(node, set()) - deps:
+                self._remove_edge(dep, node)
+                journal.removed_edges.append((dep, node))
+        # Detach every removed name first, since removed names may depend on
+        # each other.
+        for node in removed:
+            for dep in list(self.requires[node]):
+                self._remove_edge(dep, node)
+                journal.removed_edges.append((dep, node))
+        for node in removed:
+            position = self.position.pop(node)
+            self.slots[position] = _REMOVED
+            del self.requires[node], self.required_by[node]
+            journal.removed_nodes.append((node, position))
+
+        for node in changed:
+            if node not in self.requires:
+                self.requires[node] = set()
+                self.required_by[node] = set()
+                self.position[node] = len(self.slots)
+                self.slots.append(node)
+                journal.added_nodes.append(node)
+        for node, deps in changed.items():
+            for dep in deps - self.requires[node]:
+                self.requires[node].add(dep)
+                self.required_by[dep].add(node)
+                journal.added_edges.append((dep, node))
+                self._order_edge(dep, node, journal)
+
+    def _compact(self) -> None:
+        """Remove slots of removed names from the order."""
+
+        self.slots = self.order()
+        self.position = {node: idx for idx, node in enumerate(self.slots)}
+
+    def _order_edge(self, dep: Any, node: Any, journal: "_Journal") -> None:
+        """Restore the order after inserting a dependency of a name.
+
+        Raises:
+            ValueError: If the dependency closes a cycle.
+        """
+
+        lower, upper = self.position[node], self.position[dep]
+        if upper < lower:
+            return
+
+        # Names that depend on the name and precede the dependency must move
+        # after everything the dependency needs in the same range.
+        parents: Dict[Any, Any] = {node: None}
+        forward = [node]
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current == dep:
+                raise ValueError(
+                    "encountered circular dependencies: "
+                    + _cycle(parents, dep, node)
+                )
+            for child in self.required_by[current]:
+                if child not in parents and self.position[child] <= upper:
+                    parents[child] = current
+                    forward.append(child)
+                    stack.append(child)
+
+        seen = {dep}
+        backward = [dep]
+        stack = [dep]
+        while stack:
+            for parent in self.requires[stack.pop()]:
+                if parent not in seen and self.position[parent] > lower:
+                    seen.add(parent)
+                    backward.append(parent)
+                    stack.append(parent)
+
+        backward.sort(key=self.position.__getitem__)
+        forward.sort(key=self.position.__getitem__)
+        pool = sorted(self.position[item] for item in backward + forward)
+        for item, position in zip(backward + forward, pool):
+            journal.moved.setdefault(item, self.position[item])
+            self.position[item] = position
+            self.slots[position] = item
+
+    def _reach(
+        self,
+        node: Any,
+        edges: Dict[Any, Set[Any]],
+        within: Callable[[int], bool],
+    ) -> List[Any]:
+        """Find names reachable from a name in topological order."""
+
+        seen = {node}
+        stack = [node]
+        while stack:
+            for item in edges[stack.pop()]:
+                if item not in seen and within(self.position[item]):
+                    seen.add(item)
+                    stack.append(item)
+
+        seen.remove(node)
+        return sorted(seen, key=self.position.__getitem__)
+
+    def _remove_edge(self, dep: Any, node: Any) -> None:
+        """Remove dependency of a name, which keeps the order valid."""
+
+        self.requires[node].discard(dep)
+        self.required_by[dep].discard(node)
+
+    def _undo(self, journal: "_Journal") -> None:
+        """Revert changes recorded in a journal."""
+
+        for dep, node in journal.added_edges:
+            self._remove_edge(dep, node)
+        for item in list(journal.moved) + journal.added_nodes:
+            self.slots[self.position[item]] = _REMOVED
+        for item, position in journal.moved.items():
+            self.position[item] = position
+            self.slots[position] = item
+        for item in journal.added_nodes:
+            del self.position[item], self.requires[item]
+            del self.required_by[item]
+        del self.slots[journal.size :]
+
+        for item, position in journal.removed_nodes:
+            self.requires[item] = set()
+            self.required_by[item] = set()
+            self.position[item] = position
+            self.slots[position] = item
+        for dep, node in journal.removed_edges:
+            self.requires[node].add(dep)
+            self.required_by[dep].add(node)
+
+
+def resolve(
+    file_path: pathlib.Path,
+    depends: str,
+    name: str,
+    backend: Backend = Backend.AUTO,
+) -> Tuple[Graph, int]:
+    """Load dependency graph of a table file and bring it up to date.
+
+    Unchanged files are not read. Graphs of changed files are synced with
+    their rows, and missing graphs are built. Updated graphs are saved.
+
+    Args:
+        file_path: Table file path.
+        depends: Dictionary key whose values are other dictionary dependencies.
+        name: Foreign key for dependencies.
+        backend: YAML parser implementation.
+
+    Raises:
+        FileNotFoundError: If unable to find file path.
+        TypeError: If file is not organized as a list.
+        ValueError: If rows repeat names, lack keys, or contain circular or
+            unknown requirements.
+
+    Returns:
+        Current graph and number of rows applied to it, or -1 if it was built
+            from scratch.
+    """
+
+    current = fingerprint(file_path, digest=False)
+    graph = Graph.load(file_path, depends, name)
+    if graph is not None and graph.fingerprint == current:
+        return graph, 0
+
+    rows, _ = iter_rows(file_path, backend)
+    if graph is None:
+        graph, changed = Graph.build(rows, depends, name), -1
+    else:
+        changed = graph.sync(rows)
+    graph.fingerprint = current
+    graph.save(file_path)
+    return graph, changed
+
+
+class _Journal:
+    """Changes made to a graph, so that they can be reverted."""
+
+    def __init__(self, size: int) -> None:
+        """Create empty journal for a graph with a number of slots."""
+
+        self.size = size
+        self.added_edges: List[Edge] = []
+        self.added_nodes: List[Any] = []
+        self.moved: Dict[Any, int] = {}
+        self.removed_edges: List[Edge] = []
+        self.removed_nodes: List[Tuple[Any, int]] = []
+
+
+def _cycle(parents: Dict[Any, Any], dep: Any, node: Any) -> str:
+    """Describe cycle closed by a new dependency of a name."""
+
+    # Parents lead from the dependency back to the name through names that
+    # each depend on the one before.
+    path = [dep]
+    while path[-1] != node:
+        path.append(parents[path[-1]])
+    cycle = [node] + path
+    return " -> ".join(repr(item) for item in cycle)
+
+
+def _requirements(
+    rows: Iterable[Row], depends: str, name: str
+) -> Dict[Any, Set[Any]]:
+    """Map row names to the names they depend on.
+
+    Raises:
+        ValueError: If rows repeat names or lack keys.
+    """
+
+    requires: Dict[Any, Set[Any]] = {}
+    for idx, row in enumerate(rows):
+        try:
+            node, deps = row[name], set(row[depends])
+            hash(node)
+        except (KeyError, TypeError):
+            raise ValueError(
+                f"row {idx} needs a scalar {name!r} value and a list of"
+                f" {depends!r} names."
+            )
+        if node in requires:
+            raise ValueError(f"row {idx} repeats name {node!r}.")
+        requires[node] = deps
+    return requires
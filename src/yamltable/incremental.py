@@ -0,0 +1,181 @@
+"""Incremental validation of changed rows.
+
+A fingerprint store keeps the digests of rows that satisfied a schema during a
+previous run, along with the schema hash. Later runs skip rows whose digest is
+in the store and only validate new or changed rows, so their verdict matches a
+full run. Stores of a different schema are discarded.
+
+Row digests hash the representation of parsed rows, which keeps value types
+apart, such as 1, 1.0, "1" and true. Reordered keys count as changed rows.
+"""
+
+
+import array
+import hashlib
+import pathlib
+import pickle  # nosec
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from yamltable import validation
+from yamltable.cache import directory
+from yamltable.stream import atomic_open
+from yamltable.typing import Row, Schema
+
+
+# Increment when the store layout or row digests change to ignore old stores.
+FORMAT_VERSION = 1
+DIGEST_SIZE = 16
+
+
+class Result(NamedTuple):
+    """Outcome of an incremental validation run."""
+
+    error: Optional[Tuple[int, str]]
+    checked: int
+    skipped: int
+
+
+def row_digest(row: Row) -> bytes:
+    """Compute digest of row.
+
+    Args:
+        row: Parsed row.
+
+    Returns:
+        Binary digest of the row's representation.
+
+    Examples:
+        >>> row_digest({"a": 1}) == row_digest({"a": 1.0})
+        False
+    """
+
+    text = repr(row).encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(text, digest_size=DIGEST_SIZE).digest()
+
+
+class Store:
+    """Digests of rows that satisfied a schema.
+
+    Attributes:
+        path: Store file path.
+        schema_hash: Hash of the schema the rows satisfied.
+        digests: Digests of valid rows.
+    """
+
+    def __init__(
+        self, path: pathlib.Path, schema_hash: str, digests: Set[bytes]
+    ) -> None:
+        """Create store of valid row digests.
+
+        Args:
+            path: Store file path.
+            schema_hash: Hash of the schema the rows satisfied.
+            digests: Digests of valid rows.
+        """
+
+        self.path = path
+        self.schema_hash = schema_hash
+        self.digests = digests
+
+    @classmethod
+    def load(
+        cls,
+        file_path: pathlib.Path,
+        schema: Optional[Schema],
+        path: Optional[pathlib.Path] = None,
+    ) -> "Store":
+        """Load store of a YAML file, which is empty if the schema changed.
+
+        Args:
+            file_path: YAML file path.
+            schema: Current JSON schema of the file.
+            path: Store directory, defaulting to the user cache directory.
+
+        Returns:
+            Store of valid row digests.
+        """
+
+        directory_ = directory() / "validation" if path is None else path
+        key = str(file_path.resolve()).encode("utf-8")
+        store_path = directory_ / f"{hashlib.sha256(key).hexdigest()}.pickle"
+        schema_hash = validation.schema_hash(schema)
+
+        try:
+            with store_path.open("rb") as handle:
+                version, hash_, digests = pickle.load(handle)  # nosec
+        except (EOFError, OSError, pickle.UnpicklingError, ValueError):
+            return cls(store_path, schema_hash, set())
+
+        if (version, hash_) != (FORMAT_VERSION, schema_hash):
+            digests = set()
+        return cls(store_path, schema_hash, digests)
+
+    def save(self) -> None:
+        """Atomically write store.
+
+        Store write failures are ignored since the store is an optimization.
+        """
+
+        data = (FORMAT_VERSION, self.schema_hash, self.digests)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_open(self.path, "wb") as handle:
+                pickle.dump(data, handle, pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            return
+
+    def validate(
+        self, rows: Iterable[Row], schema: Optional[Schema], workers: int = 1
+    ) -> Result:
+        """Validate rows that are not in the store and update the store.
+
+        Args:
+            rows: Dictionaries to validate.
+            schema: JSON schema for validation.
+            workers: Number of worker processes.
+
+        Raises:
+            SchemaError: If schema is not a valid JSON schema.
+            UnknownType: If schema uses an unknown type.
+
+        Returns:
+            First invalid row index and error message or None, and numbers of
+                validated and skipped rows.
+        """
+
+        previous = self.digests
+        valid: Set[bytes] = set()
+        indices = array.array("q")
+        digests: List[bytes] = []
+        skipped = 0
+
+        def changed() -> Iterator[Row]:
+            nonlocal skipped
+            for idx, row in enumerate(rows):
+                digest = row_digest(row)
+                if digest in previous:
+                    valid.add(digest)
+                    skipped += 1
+                else:
+                    indices.append(idx)
+                    digests.append(digest)
+                    yield row
+
+        error = validation.first_error(changed(), schema, workers)
+        if error is None:
+            self.digests = valid.union(digests)
+            return Result(None, len(digests), skipped)
+
+        # Rows are validated in order, so rows before the error are valid.
+        # Digests identify row contents, so unread rows keep their entries.
+        position, msg = error
+        self.digests = previous.union(digests[:position])
+        return Result((indices[position], msg), position + 1, skipped)
@@ -0,0 +1,249 @@
+"""Persistent secondary hash indexes for row lookups.
+
+An index maps the values of a row key to the byte spans of the matching rows,
+so searches only parse the rows that match. Indexes are stored in sidecar files
+next to the YAML file and are invalidated when the file's modification time or
+size changes. Content hashes are not checked since hashing the file would cost
+as much as scanning it.
+
+Sidecars are JSON documents, since they may come from anyone who can write to
+the YAML file's directory and loading them must not run code. Key values
+without a JSON type, such as YAML timestamps, are stored as YAML text.
+"""
+
+
+import json
+import pathlib
+from typing import Any, Dict, Iterable, List, Optional
+from urllib import parse
+
+import yaml
+
+from yamltable.cache import Fingerprint, fingerprint
+from yamltable.stream import atomic_open, iter_spans, read_span, Span
+from yamltable.typing import Backend, Row
+
+
+# Increment when the sidecar layout changes to ignore stale indexes.
+FORMAT_VERSION = 2
+# Key value types stored as JSON values instead of YAML text.
+JSON_TYPES = (bool, float, int, str, type(None))
+
+
+def path(file_path: pathlib.Path, key: str) -> pathlib.Path:
+    """Get index sidecar path for a YAML file and key.
+
+    Args:
+        file_path: YAML file path.
+        key: Indexed row key.
+
+    Returns:
+        Hidden sidecar path in the YAML file's directory.
+    """
+
+    name = f".{file_path.name}.{parse.quote(key, safe='')}.index"
+    return file_path.with_name(name)
+
+
+class Index:
+    """Hash map from row key values to row byte spans.
+
+    Attributes:
+        key: Indexed row key.
+        spans: Mapping from key values to spans of rows with that value.
+        fingerprint: YAML file fingerprint when the index was built.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        spans: Dict[Any, List[Span]],
+        fingerprint: Optional[Fingerprint] = None,
+    ) -> None:
+        """Create index from spans.
+
+        Args:
+            key: Indexed row key.
+            spans: Mapping from key values to spans of rows with that value.
+            fingerprint: YAML file fingerprint when the index was built.
+        """
+
+        self.key = key
+        self.spans = spans
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(
+        cls,
+        file_path: pathlib.Path,
+        key: str,
+        backend: Backend = Backend.AUTO,
+    ) -> "Index":
+        """Build index by scanning a YAML file.
+
+        Rows without the key or with unhashable values are not indexed, since
+        they cannot equal a hashable search value.
+
+        Args:
+            file_path: YAML file path.
+            key: Row key to index.
+            backend: YAML parser implementation.
+
+        Raises:
+            FileNotFoundError: If unable to find file path.
+            TypeError: If file is not organized as a list.
+
+        Returns:
+            Index of file.
+        """
+
+        fingerprint_ = fingerprint(file_path, digest=False)
+        rows, _ = iter_spans(file_path, backend)
+
+        spans: Dict[Any, List[Span]] = {}
+        for row, span in rows:
+            if not isinstance(row, dict) or key not in row:
+                continue
+            try:
+                spans.setdefault(row[key], []).append(span)
+            except TypeError:
+                continue
+
+        return cls(key, spans, fingerprint_)
+
+    @classmethod
+    def load(cls, file_path: pathlib.Path, key: str) -> Optional["Index"]:
+        """Load index from sidecar file if it is up to date.
+
+        Args:
+            file_path: YAML file path.
+            key: Indexed row key.
+
+        Returns:
+            Index or None if missing or stale.
+        """
+
+        try:
+            with path(file_path, key).open("rb") as handle:
+                data = json.load(handle)
+            if data["version"] != FORMAT_VERSION or data["key"] != key:
+                return None
+            fingerprint_ = Fingerprint(*data["fingerprint"])
+            if fingerprint_ != fingerprint(file_path, digest=False):
+                return None
+            spans = {
+                _decode(value): list(zip(offsets[::2], offsets[1::2]))
+                for value, offsets in data["spans"]
+            }
+        except (KeyError, OSError, TypeError, ValueError, yaml.YAMLError):
+            return None
+
+        return cls(key, spans, fingerprint_)
+
+    def lookup(self, val: Any) -> List[Span]:
+        """Get spans of rows whose key equals value.
+
+        Args:
+            val: Key comparison value.
+
+        Returns:
+            Row spans in file order.
+        """
+
+        try:
+            return self.spans.get(val, [])
+        except TypeError:
+            return []
+
+    def save(self, file_path: pathlib.Path) -> pathlib.Path:
+        """Atomically write index to sidecar file.
+
+        Args:
+            file_path: YAML file path.
+
+        Returns:
+            Sidecar path.
+        """
+
+        sidecar = path(file_path, self.key)
+        data = {
+            "version": FORMAT_VERSION,
+            "key": self.key,
+            "fingerprint": self.fingerprint,
+            "spans": [
+                [_encode(value), [offset for span in spans for offset in span]]
+                for value, spans in self.spans.items()
+            ],
+        }
+        with atomic_open(sidecar) as handle:
+            json.dump(data, handle, separators=(",", ":"))
+        return sidecar
+
+    def search(
+        self,
+        file_path: pathlib.Path,
+        val: Any,
+        backend: Backend = Backend.AUTO,
+    ) -> List[Row]:
+        """Read rows whose key equals value.
+
+        Args:
+            file_path: YAML file path.
+            val: Key comparison value.
+            backend: YAML parser implementation.
+
+        Raises:
+            TypeError: If a matching row cannot be parsed on its own.
+
+        Returns:
+            Matching rows.
+        """
+
+        return self.select(file_path, [val], backend)
+
+    def select(
+        self,
+        file_path: pathlib.Path,
+        values: Iterable[Any],
+        backend: Backend = Backend.AUTO,
+    ) -> List[Row]:
+        """Read rows whose key equals any of the values.
+
+        Args:
+            file_path: YAML file path.
+            values: Key comparison values.
+            backend: YAML parser implementation.
+
+        Raises:
+            TypeError: If a matching row cannot be parsed on its own.
+
+        Returns:
+            Matching rows in file order.
+        """
+
+        spans = sorted({span for val in values for span in self.lookup(val)})
+        if not spans:
+            return []
+
+        with file_path.open("rb") as handle:
+            return [read_span(handle, span, backend) for span in spans]
+
+
+def _decode(value: Any) -> Any:
+    """Convert sidecar entry back into a key value."""
+
+    if isinstance(value, dict):
+        return yaml.safe_load(value["yaml"])
+    return value
+
+
+def _encode(value: Any) -> Any:
+    """Convert key value into a sidecar entry.
+
+    Dictionaries are unhashable and never key values, so they mark values
+    stored as YAML text.
+    """
+
+    if isinstance(value, JSON_TYPES):
+        return value
+    return {"yaml": yaml.safe_dump(value)}
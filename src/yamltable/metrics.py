@@ -0,0 +1,224 @@
+"""Phase metrics of table operations.
+
+Reading, validating, transforming, and emitting tables are timed as phases
+that are reported to subscribed callbacks, so that applications can forward
+them to their own telemetry. Time spent in a nested phase, such as reading the
+rows that a write consumes, only counts toward the nested phase. Phases are
+not timed while no callback is subscribed.
+
+Examples:
+    >>> import yamltable
+    >>> received = []
+    >>> subscribe(received.append)
+    >>> rows = yamltable.sort("foo", [{"foo": 2}, {"foo": 1}])
+    >>> unsubscribe(received.append)
+    >>> [(metric.phase.value, metric.rows) for metric in received]
+    [('transform', 2)]
+"""
+
+
+import contextlib
+import time
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    TypeVar,
+)
+
+from yamltable.typing import Phase
+
+
+T = TypeVar("T")
+
+
+class Metric(NamedTuple):
+    """Measurements of a timed phase.
+
+    Attributes:
+        phase: Phase of the operation.
+        seconds: Time spent in the phase, excluding nested phases.
+        rows: Number of rows processed.
+        bytes: Number of bytes read or written, or 0 if unknown.
+    """
+
+    phase: Phase
+    seconds: float
+    rows: int
+    bytes: int
+
+
+Callback = Callable[[Metric], None]
+
+_callbacks: List[Callback] = []
+# Time spent in phases nested within each open phase.
+_nested: List[float] = []
+
+
+class Counter:
+    """Counts of rows and bytes processed during a phase."""
+
+    def __init__(self, active: bool) -> None:
+        """Create counter that only counts rows while the phase is timed."""
+
+        self.active = active
+        self.bytes = 0
+        self.rows = 0
+
+    def count(self, rows: Iterable[T]) -> Iterable[T]:
+        """Count rows as they are consumed.
+
+        Args:
+            rows: Iterable of rows.
+
+        Returns:
+            Rows, wrapped in a counting generator if the phase is timed.
+        """
+
+        if not self.active:
+            return rows
+        return self._count(rows)
+
+    def _count(self, rows: Iterable[T]) -> Iterator[T]:
+        """Yield rows while incrementing the row count."""
+
+        for row in rows:
+            self.rows += 1
+            yield row
+
+
+def active() -> bool:
+    """Check whether phases are timed.
+
+    Returns:
+        Whether any callback is subscribed.
+    """
+
+    return bool(_callbacks)
+
+
+@contextlib.contextmanager
+def phase(name: Phase) -> Iterator[Counter]:
+    """Time a block of code as a phase.
+
+    The phase is reported to every callback when the block exits, even if it
+    raises an exception.
+
+    Args:
+        name: Phase of the operation.
+
+    Returns:
+        Context manager of counter for rows and bytes of the phase.
+
+    Examples:
+        >>> received = []
+        >>> subscribe(received.append)
+        >>> with phase(Phase.EMIT) as counter:
+        ...     counter.bytes = 42
+        >>> unsubscribe(received.append)
+        >>> received[0].phase, received[0].bytes
+        (<Phase.EMIT: 'emit'>, 42)
+    """
+
+    counter = Counter(active())
+    if not counter.active:
+        yield counter
+        return
+
+    _nested.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield counter
+    finally:
+        elapsed = time.perf_counter() - start
+        _report(name, elapsed, counter.rows, counter.bytes)
+
+
+def subscribe(callback: Callback) -> None:
+    """Report metrics of every phase to a callback.
+
+    Callbacks are called in the thread that ran the phase, and should return
+    quickly since their time counts toward enclosing phases.
+
+    Args:
+        callback: Function that receives metrics.
+    """
+
+    _callbacks.append(callback)
+
+
+def timed(rows: Iterator[T], name: Phase) -> Iterator[T]:
+    """Time iteration over rows as a phase.
+
+    Only time spent producing rows is counted, not time spent by the consumer
+    between rows. The phase is reported once the rows are exhausted or the
+    iterator is closed.
+
+    Args:
+        rows: Row iterator.
+        name: Phase of the operation.
+
+    Returns:
+        Rows, wrapped in a timing generator if phases are timed.
+    """
+
+    if not active():
+        return rows
+    return _timed(rows, name)
+
+
+def unsubscribe(callback: Callback) -> None:
+    """Stop reporting metrics to a callback.
+
+    Args:
+        callback: Previously subscribed function.
+
+    Raises:
+        ValueError: If callback is not subscribed.
+    """
+
+    _callbacks.remove(callback)
+
+
+def _emit(metric: Metric) -> None:
+    """Send metric to every callback."""
+
+    for callback in list(_callbacks):
+        callback(metric)
+
+
+def _report(name: Phase, elapsed: float, rows: int, bytes_: int) -> None:
+    """Close innermost phase and send its metric to callbacks."""
+
+    nested = _nested.pop()
+    if _nested:
+        _nested[-1] += elapsed
+
+    _emit(Metric(name, elapsed - nested, rows, bytes_))
+
+
+def _timed(rows: Iterator[T], name: Phase) -> Iterator[T]:
+    """Yield rows while accumulating the time spent producing them."""
+
+    count = 0
+    seconds = 0.0
+    try:
+        while True:
+            _nested.append(0.0)
+            start = time.perf_counter()
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = _nested.pop()
+                if _nested:
+                    _nested[-1] += elapsed
+                seconds += elapsed - nested
+            count += 1
+            yield row
+    finally:
+        _emit(Metric(name, seconds, count, 0))
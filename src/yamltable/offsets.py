@@ -0,0 +1,183 @@
+"""Byte offset tables for random row access.
+
+An offset table stores the start and end byte of every row as unsigned 64 bit
+integers in a sidecar file next to the YAML file. Looking up a row reads a
+fixed size header and a single table entry, so only the row itself has to be
+parsed. Tables are invalidated when the file's modification time or size
+changes.
+"""
+
+
+import array
+import pathlib
+import struct
+import sys
+from typing import Optional
+
+from yamltable.cache import Fingerprint, fingerprint
+from yamltable.stream import atomic_open, iter_spans, Span
+from yamltable.typing import Backend
+
+
+# Increment when the sidecar layout changes to ignore stale tables.
+FORMAT_VERSION = 1
+# Magic bytes, format version, file modification time, file size, row count.
+HEADER = struct.Struct("<4sIqqQ")
+MAGIC = b"YTOF"
+
+
+def path(file_path: pathlib.Path) -> pathlib.Path:
+    """Get offset table sidecar path for a YAML file.
+
+    Args:
+        file_path: YAML file path.
+
+    Returns:
+        Hidden sidecar path in the YAML file's directory.
+    """
+
+    return file_path.with_name(f".{file_path.name}.offsets")
+
+
+def span(file_path: pathlib.Path, index: int) -> Optional[Span]:
+    """Read byte span of row from an up to date offset table sidecar.
+
+    Args:
+        file_path: YAML file path.
+        index: Row position, where negative values count from the end.
+
+    Raises:
+        IndexError: If index is out of bounds.
+
+    Returns:
+        Start and end byte offsets of row or None if the table is missing or
+            stale.
+    """
+
+    try:
+        with path(file_path).open("rb") as handle:
+            header = HEADER.unpack(handle.read(HEADER.size))
+            magic, version, mtime_ns, size, count = header
+            current = fingerprint(file_path, digest=False)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return None
+            elif (mtime_ns, size) != (current.mtime_ns, current.size):
+                return None
+
+            position = index + count if index < 0 else index
+            if not 0 <= position < count:
+                raise IndexError(f"row index {index} out of range")
+
+            entry = array.array("Q")
+            handle.seek(HEADER.size + 2 * entry.itemsize * position)
+            entry.frombytes(handle.read(2 * entry.itemsize))
+    except (OSError, struct.error, ValueError):
+        return None
+
+    if len(entry) != 2:
+        return None
+
+    if sys.byteorder != "little":
+        entry.byteswap()
+    return entry[0], entry[1]
+
+
+class Offsets:
+    """Table of row byte spans in file order.
+
+    Attributes:
+        spans: Flat array of start and end byte offsets of each row.
+        fingerprint: YAML file fingerprint when the table was built.
+    """
+
+    def __init__(
+        self, spans: "array.array[int]", fingerprint: Fingerprint
+    ) -> None:
+        """Create offset table from spans.
+
+        Args:
+            spans: Flat array of start and end byte offsets of each row.
+            fingerprint: YAML file fingerprint when the table was built.
+        """
+
+        self.spans = spans
+        self.fingerprint = fingerprint
+
+    def __getitem__(self, index: int) -> Span:
+        """Get byte span of row at index.
+
+        Args:
+            index: Row position, where negative values count from the end.
+
+        Raises:
+            IndexError: If index is out of bounds.
+
+        Returns:
+            Start and end byte offsets of row.
+        """
+
+        position = index + len(self) if index < 0 else index
+        if not 0 <= position < len(self):
+            raise IndexError(f"row index {index} out of range")
+        return self.spans[2 * position], self.spans[2 * position + 1]
+
+    def __len__(self) -> int:
+        """Get number of rows."""
+
+        return len(self.spans) // 2
+
+    @classmethod
+    def build(
+        cls, file_path: pathlib.Path, backend: Backend = Backend.AUTO
+    ) -> "Offsets":
+        """Build offset table by scanning a YAML file.
+
+        Args:
+            file_path: YAML file path.
+            backend: YAML parser implementation.
+
+        Raises:
+            FileNotFoundError: If unable to find file path.
+            TypeError: If file is not organized as a list.
+
+        Returns:
+            Offset table of file.
+        """
+
+        fingerprint_ = fingerprint(file_path, digest=False)
+        rows, _ = iter_spans(file_path, backend)
+
+        spans = array.array("Q")
+        for _, span_ in rows:
+            spans.extend(span_)
+
+        return cls(spans, fingerprint_)
+
+    def save(self, file_path: pathlib.Path) -> pathlib.Path:
+        """Atomically write offset table to sidecar file.
+
+        Args:
+            file_path: YAML file path.
+
+        Returns:
+            Sidecar path.
+        """
+
+        spans = self.spans
+        if sys.byteorder != "little":
+            spans = array.array("Q", spans)
+            spans.byteswap()
+
+        sidecar = path(file_path)
+        with atomic_open(sidecar, "wb") as handle:
+            handle.write(
+                HEADER.pack(
+                    MAGIC,
+                    FORMAT_VERSION,
+                    self.fingerprint.mtime_ns,
+                    self.fingerprint.size,
+                    len(self),
+                )
+            )
+            handle.write(spans.tobytes())
+        return sidecar
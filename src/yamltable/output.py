@@ -0,0 +1,193 @@
+"""Buffered writers for command output.
+
+Values and rows are formatted into lines of text that are encoded and written
+in chunks to the binary buffer beneath standard output. This avoids rendering
+every line through Rich, which takes longer than reading the table. Pretty
+output is only rendered with Rich by the CLI when writing to a terminal.
+"""
+
+
+import csv
+import io
+import itertools
+import json
+from typing import Any, IO, Iterable, Iterator, List, Sequence
+
+from yamltable import metrics
+from yamltable.typing import Format, Phase, Row
+
+
+# Number of lines joined into each write.
+CHUNK_LINES = 4096
+DELIMITERS = {Format.CSV: ",", Format.TSV: "\t"}
+
+
+def cell(value: Any) -> str:
+    """Convert value into a CSV or TSV cell.
+
+    Args:
+        value: Parsed YAML value.
+
+    Returns:
+        Strings as is, empty text for null values, and JSON for other values.
+
+    Examples:
+        >>> [cell(value) for value in ["a", None, True, 1.5, [1, "b"]]]
+        ['a', '', 'true', '1.5', '[1, "b"]']
+    """
+
+    if isinstance(value, str):
+        return value
+    elif value is None:
+        return ""
+    return json.dumps(value, default=str)
+
+
+def format_rows(rows: Sequence[Row], format_: Format) -> Iterator[str]:
+    r"""Format rows into lines of text.
+
+    Pretty rows are indented over several lines, while plain rows take one
+    line each. CSV and TSV columns are the keys of all rows in order of first
+    appearance.
+
+    Args:
+        rows: Dictionaries to format.
+        format_: Output format.
+
+    Returns:
+        Lines of text with trailing newlines.
+
+    Examples:
+        >>> rows = [{"a": 1}, {"b": None}]
+        >>> "".join(format_rows(rows, Format.CSV))
+        'a,b\n1,\n,\n'
+        >>> "".join(format_rows(rows, Format.JSONL))
+        '{"a": 1}\n{"b": null}\n'
+    """
+
+    if format_ == Format.PRETTY:
+        import pprint
+
+        return (pprint.pformat(row, indent=2) + "\n" for row in rows)
+    elif format_ == Format.PLAIN:
+        return (f"{row!r}\n" for row in rows)
+    elif format_ in DELIMITERS:
+        keys = list(dict.fromkeys(itertools.chain.from_iterable(rows)))
+        records = ([row.get(key) for key in keys] for row in rows)
+        return _delimited(keys, records, DELIMITERS[format_])
+    return _json(rows, format_)
+
+
+def format_values(
+    values: Iterable[Any], format_: Format, key: str
+) -> Iterator[str]:
+    r"""Format values of a key into lines of text.
+
+    Args:
+        values: Values to format.
+        format_: Output format.
+        key: Key name, which is the header of CSV and TSV output.
+
+    Returns:
+        Lines of text with trailing newlines.
+
+    Examples:
+        >>> "".join(format_values(["a", None], Format.PLAIN, "name"))
+        'a\nNone\n'
+        >>> "".join(format_values(["a", None], Format.JSON, "name"))
+        '[\n"a",\nnull\n]\n'
+    """
+
+    if format_ in (Format.PLAIN, Format.PRETTY):
+        return (f"{value}\n" for value in values)
+    elif format_ in DELIMITERS:
+        records = ([value] for value in values)
+        return _delimited([key], records, DELIMITERS[format_])
+    return _json(values, format_)
+
+
+def is_terminal(stream: IO[str]) -> bool:
+    """Check whether stream is an interactive terminal.
+
+    Args:
+        stream: Text stream.
+
+    Returns:
+        Whether stream is attached to a terminal.
+    """
+
+    isatty = getattr(stream, "isatty", None)
+    return bool(isatty is not None and isatty())
+
+
+def write(lines: Iterable[str], stream: IO[str]) -> None:
+    """Write lines in chunks to the binary buffer beneath a text stream.
+
+    Streams without a binary buffer, such as captured output, are written as
+    text. Lines read before an exception in their iterable are still written.
+
+    Args:
+        lines: Lines of text with trailing newlines.
+        stream: Text stream.
+    """
+
+    buffer = getattr(stream, "buffer", None)
+    encoding = getattr(stream, "encoding", None) or "utf-8"
+    errors = getattr(stream, "errors", None) or "strict"
+    stream.flush()
+
+    def emit(chunk: List[str]) -> int:
+        text = "".join(chunk)
+        if buffer is None:
+            stream.write(text)
+            return len(text)
+        data = text.encode(encoding, errors)
+        buffer.write(data)
+        return len(data)
+
+    chunk: List[str] = []
+    with metrics.phase(Phase.EMIT) as counter:
+        try:
+            for line in counter.count(lines):
+                chunk.append(line)
+                if len(chunk) >= CHUNK_LINES:
+                    counter.bytes += emit(chunk)
+                    chunk.clear()
+        finally:
+            counter.bytes += emit(chunk)
+            (stream if buffer is None else buffer).flush()
+
+
+def _delimited(
+    header: List[Any], records: Iterable[List[Any]], delimiter: str
+) -> Iterator[str]:
+    """Format header and records as delimiter separated lines."""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\n")
+    writer.writerow([cell(value) for value in header])
+    for record in records:
+        writer.writerow([cell(value) for value in record])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Flush the header if there were no records.
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _json(items: Iterable[Any], format_: Format) -> Iterator[str]:
+    """Format items as a JSON array or as JSON lines."""
+
+    if format_ == Format.JSONL:
+        for item in items:
+            yield json.dumps(item, default=str) + "\n"
+        return
+
+    yield "["
+    separator = "\n"
+    for item in items:
+        yield separator + json.dumps(item, default=str)
+        separator = ",\n"
+    yield "\n]\n"
@@ -0,0 +1,274 @@
+"""Profilers for command line runs.
+
+The time profiler subscribes to phase metrics and reports the time, rows, and
+bytes of each phase together with peak memory. The cProfile profiler writes
+statistics that pstats and snakeviz read. The speedscope profiler samples the
+stack of the main thread from a background thread, so that its overhead and
+output size stay small, and writes a sampled profile for
+https://www.speedscope.app. Every profiler runs in process without a browser,
+and only covers the current process, not worker processes.
+"""
+
+
+import json
+import pathlib
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from yamltable import metrics
+from yamltable.typing import Phase, Profile
+
+
+DEFAULT_PATHS = {
+    Profile.CPROFILE: pathlib.Path("yamltable.prof"),
+    Profile.SPEEDSCOPE: pathlib.Path("yamltable.speedscope.json"),
+}
+# Seconds between stack samples, limited by the interpreter switch interval.
+SAMPLE_INTERVAL = 0.001
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+Frame = Tuple[str, str, int]
+
+
+class Sampler:
+    """Stack sampler of a thread that exports speedscope profiles."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL) -> None:
+        """Create sampler of the calling thread.
+
+        Args:
+            interval: Seconds between samples.
+        """
+
+        self.interval = interval
+        self.frames: Dict[Frame, int] = {}
+        self.samples: List[List[int]] = []
+        self.weights: List[float] = []
+        self._ident = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        """Export samples as a speedscope profile.
+
+        Args:
+            name: Profile name.
+
+        Returns:
+            Speedscope file contents.
+        """
+
+        frames = [
+            {"name": frame, "file": file_, "line": line}
+            for frame, file_, line in self.frames
+        ]
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "exporter": "yamltable",
+            "name": name,
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(self.weights),
+                    "samples": self.samples,
+                    "weights": self.weights,
+                }
+            ],
+            "shared": {"frames": frames},
+        }
+
+    def start(self) -> None:
+        """Start sampling in a background thread."""
+
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the background thread."""
+
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Sample stacks until stopped."""
+
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._ident)
+            now = time.perf_counter()
+            if frame is not None:
+                self.samples.append(self._stack(frame))
+                self.weights.append(now - last)
+            last = now
+
+    def _stack(self, frame: Any) -> List[int]:
+        """Get frame indices of a stack from outermost to innermost."""
+
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (
+                getattr(code, "co_qualname", code.co_name),
+                code.co_filename,
+                code.co_firstlineno,
+            )
+            stack.append(self.frames.setdefault(key, len(self.frames)))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+
+class Timer:
+    """Phase timer that reports totals of every phase."""
+
+    def __init__(self) -> None:
+        """Create timer without subscribing it to metrics."""
+
+        self.totals: Dict[Phase, List[float]] = {}
+        self._start = 0.0
+        self._traced = False
+
+    def __call__(self, metric: metrics.Metric) -> None:
+        """Add metric to the totals of its phase."""
+
+        totals = self.totals.setdefault(metric.phase, [0.0, 0, 0])
+        totals[0] += metric.seconds
+        totals[1] += metric.rows
+        totals[2] += metric.bytes
+
+    def report(self, seconds: float, peak: Optional[Tuple[str, int]]) -> str:
+        """Format phase totals as a table.
+
+        Args:
+            seconds: Total wall time.
+            peak: Peak memory description and size in bytes.
+
+        Returns:
+            Report text without a trailing newline.
+
+        Examples:
+            >>> timer = Timer()
+            >>> timer(metrics.Metric(Phase.READ, 0.5, 1000, 20480))
+            >>> print(timer.report(0.75, ("Peak RSS", 2 ** 20)))
+            Phase       Seconds        Rows       Bytes      Rows/s
+            read          0.500       1,000      20,480       2,000
+            other         0.250
+            total         0.750
+            Peak RSS: 1.0 MiB
+        """
+
+        lines = [
+            f"{'Phase':<10}{'Seconds':>9}{'Rows':>12}{'Bytes':>12}"
+            f"{'Rows/s':>12}"
+        ]
+        for phase in Phase:
+            if phase not in self.totals:
+                continue
+            spent, rows, bytes_ = self.totals[phase]
+            rate = f"{rows / spent:,.0f}" if spent and rows else "-"
+            lines.append(
+                f"{phase.value:<10}{spent:>9.3f}{int(rows):>12,}"
+                f"{int(bytes_):>12,}{rate:>12}"
+            )
+
+        other = seconds - sum(totals[0] for totals in self.totals.values())
+        lines.append(f"{'other':<10}{max(other, 0.0):>9.3f}")
+        lines.append(f"{'total':<10}{seconds:>9.3f}")
+        if peak is not None:
+            lines.append(f"{peak[0]}: {peak[1] / 2 ** 20:.1f} MiB")
+        return "\n".join(lines)
+
+    def start(self) -> None:
+        """Subscribe to metrics and start the wall clock.
+
+        Peak memory is taken from the resident set size where the resource
+        module exists, and otherwise traced with tracemalloc.
+        """
+
+        try:
+            import resource  # noqa: F401
+        except ImportError:  # pragma: no cover
+            import tracemalloc
+
+            tracemalloc.start()
+            self._traced = True
+
+        metrics.subscribe(self)
+        self._start = time.perf_counter()
+
+    def stop(self) -> str:
+        """Unsubscribe from metrics and report the totals.
+
+        Returns:
+            Report text.
+        """
+
+        seconds = time.perf_counter() - self._start
+        metrics.unsubscribe(self)
+        return self.report(seconds, self._peak())
+
+    def _peak(self) -> Tuple[str, int]:
+        """Get peak memory description and size in bytes."""
+
+        if self._traced:  # pragma: no cover
+            import tracemalloc
+
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return "Peak traced memory", peak
+
+        import resource
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes while macOS reports bytes.
+        return "Peak RSS", rss if sys.platform == "darwin" else rss * 1024
+
+
+def start(
+    mode: Profile, file_path: Optional[pathlib.Path] = None
+) -> Callable[[], str]:
+    """Start profiling the current process.
+
+    Args:
+        mode: Profiling mode.
+        file_path: Output path of cProfile and speedscope profiles, defaulting
+            to a file in the working directory.
+
+    Returns:
+        Function that stops profiling, writes any output file, and returns a
+            report for the user.
+    """
+
+    if mode == Profile.TIME:
+        timer = Timer()
+        timer.start()
+        return timer.stop
+
+    path = DEFAULT_PATHS[mode] if file_path is None else file_path
+    if mode == Profile.CPROFILE:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def stop_cprofile() -> str:
+            profiler.disable()
+            profiler.dump_stats(str(path))
+            return f"Wrote cProfile statistics to {path}."
+
+        return stop_cprofile
+
+    sampler = Sampler()
+    sampler.start()
+
+    def stop_sampler() -> str:
+        sampler.stop()
+        profile = sampler.speedscope(" ".join(sys.argv))
+        path.write_text(json.dumps(profile))
+        return f"Wrote speedscope profile to {path}."
+
+    return stop_sampler
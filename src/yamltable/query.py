@@ -0,0 +1,368 @@
+"""Query expressions for filtering rows.
+
+Expressions compare row values at dotted key paths with literals and combine
+comparisons with boolean operators, such as
+
+    port >= 80 and (name ~ "^aws" or exists meta.owner)
+
+Supported comparisons are ==, = (alias of ==), !=, <, <=, >, >=, ~ (regular
+expression search), in with a bracketed list of literals, and exists. Literals
+are parsed as YAML scalars, so 80 is an integer, true is a boolean, and quoted
+text is always a string. Comparisons with missing paths or incomparable types
+are false, except for != which is the negation of ==.
+
+Expressions are compiled once into nested closures. The top-level keys that
+an expression reads are exposed, so that streaming readers can evaluate it on
+those keys before building the rest of a row.
+"""
+
+
+import operator
+import re
+from typing import (
+    Any,
+    Callable,
+    FrozenSet,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import yaml
+
+
+Equality = Tuple[str, List[Any]]
+Predicate = Callable[[Any], bool]
+
+KEYWORDS = {"and", "exists", "in", "not", "or"}
+OPERATORS = {
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+_MISSING = object()
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^']|'')*')
+        |(?P<symbol>==|!=|<=|>=|[=<>~()\[\],])
+        |(?P<word>[^\s"'()\[\],=!<>~]+)
+    )""",
+    re.VERBOSE,
+)
+
+
+def literal(text: str) -> Any:
+    """Parse text as a YAML scalar.
+
+    Args:
+        text: Scalar text, which may be quoted.
+
+    Returns:
+        Typed value or the text itself if it is not a scalar.
+
+    Examples:
+        >>> literal("80"), literal("true"), literal("'80'"), literal("a: b")
+        (80, True, '80', 'a: b')
+    """
+
+    try:
+        value = yaml.safe_load(text)
+    except yaml.YAMLError:
+        return text
+    return text if isinstance(value, (dict, list)) else value
+
+
+class Query:
+    """Compiled row filter expression.
+
+    Attributes:
+        text: Source expression.
+        keys: Top-level row keys read by the expression.
+        equality: Row key and values if the expression only checks that a
+            top-level key equals one of several values, otherwise None.
+    """
+
+    def __init__(self, text: str) -> None:
+        """Compile query expression.
+
+        Args:
+            text: Query expression.
+
+        Raises:
+            ValueError: If the expression is invalid.
+
+        Examples:
+            >>> query = Query('port >= 80 and name ~ "^aws"')
+            >>> query({"port": 443, "name": "aws-east"}), sorted(query.keys)
+            (True, ['name', 'port'])
+            >>> query({"port": "80", "name": "aws-west"})
+            False
+        """
+
+        parser = _Parser(text)
+        self.text = text
+        self._predicate, self.equality = parser.parse()
+        self.keys: FrozenSet[str] = frozenset(parser.keys)
+
+    def __call__(self, row: Any) -> bool:
+        """Check whether row matches the expression."""
+
+        return self._predicate(row)
+
+    def __repr__(self) -> str:
+        """Get query representation."""
+
+        return f"Query({self.text!r})"
+
+    @classmethod
+    def match(cls, key: str, values: Sequence[Any]) -> "Query":
+        """Create query for rows whose top-level key equals any value.
+
+        Args:
+            key: Row key, where dots are part of the key name.
+            values: Comparison values.
+
+        Returns:
+            Compiled query.
+        """
+
+        query = cls.__new__(cls)
+        query.text = f"{key} in {list(values)!r}"
+        query._predicate = _member(_getter([key]), values)
+        query.equality = key, list(values)
+        query.keys = frozenset([key])
+        return query
+
+
+class _Parser:
+    """Recursive descent parser that compiles expressions into closures."""
+
+    def __init__(self, text: str) -> None:
+        """Tokenize expression."""
+
+        self.keys: List[str] = []
+        self.position = 0
+        self.tokens: List[Tuple[str, str]] = []
+
+        index = 0
+        text = text.rstrip()
+        while index < len(text):
+            match = _TOKEN.match(text, index)
+            if match is None or match.end() == index:
+                raise ValueError(f"invalid query syntax at {text[index:]!r}")
+            kind = match.lastgroup or ""
+            self.tokens.append((kind, match.group(kind)))
+            index = match.end()
+
+    def parse(self) -> Tuple[Predicate, Optional[Equality]]:
+        """Parse whole expression."""
+
+        predicate, equality = self.disjunction()
+        if self.position < len(self.tokens):
+            raise ValueError(f"unexpected query token {self.peek()!r}")
+        return predicate, equality
+
+    def disjunction(self) -> Tuple[Predicate, Optional[Equality]]:
+        """Parse expressions joined by or."""
+
+        predicate, equality = self.conjunction()
+        while self.accept("or"):
+            predicate = _either(predicate, self.conjunction()[0])
+            equality = None
+        return predicate, equality
+
+    def conjunction(self) -> Tuple[Predicate, Optional[Equality]]:
+        """Parse expressions joined by and."""
+
+        predicate, equality = self.negation()
+        while self.accept("and"):
+            predicate = _both(predicate, self.negation()[0])
+            equality = None
+        return predicate, equality
+
+    def negation(self) -> Tuple[Predicate, Optional[Equality]]:
+        """Parse optionally negated expression."""
+
+        if self.accept("not"):
+            predicate, _ = self.negation()
+            return (lambda row: not predicate(row)), None
+        return self.atom()
+
+    def atom(self) -> Tuple[Predicate, Optional[Equality]]:
+        """Parse parenthesized expression or comparison."""
+
+        if self.accept("("):
+            result = self.disjunction()
+            self.expect(")")
+            return result
+        elif self.accept("exists"):
+            get = self.path()
+            return (lambda row: get(row) is not _MISSING), None
+
+        name = self.peek()
+        get = self.path()
+        if self.accept("in"):
+            values = self.values()
+            return _member(get, values), self.equality(name, values)
+
+        symbol = self.take("symbol")
+        if symbol == "~":
+            return _search(get, self.pattern()), None
+        elif symbol not in OPERATORS:
+            raise ValueError(f"expected comparison operator after {name!r}")
+
+        value = literal(self.take())
+        predicate = _compare(get, OPERATORS[symbol], value)
+        if OPERATORS[symbol] is operator.eq:
+            return predicate, self.equality(name, [value])
+        return predicate, None
+
+    def accept(self, token: str) -> bool:
+        """Consume next token if it matches."""
+
+        if self.position < len(self.tokens) and self.peek() == token:
+            self.position += 1
+            return True
+        return False
+
+    def equality(self, name: str, values: List[Any]) -> Optional[Equality]:
+        """Describe equality check of a top-level key."""
+
+        return None if "." in name else (name, values)
+
+    def expect(self, token: str) -> None:
+        """Consume next token or raise an error if it does not match."""
+
+        if not self.accept(token):
+            raise ValueError(f"expected {token!r} in query")
+
+    def path(self) -> Callable[[Any], Any]:
+        """Parse dotted key path into a value getter."""
+
+        name = self.take("word")
+        parts = name.split(".")
+        if name in KEYWORDS or not all(parts):
+            raise ValueError(f"invalid query key path {name!r}")
+
+        self.keys.append(parts[0])
+        return _getter(parts)
+
+    def pattern(self) -> "re.Pattern[str]":
+        """Parse regular expression literal, which is never typed."""
+
+        quoted = self.peek()[:1] in {'"', "'"}
+        text = self.take()
+        try:
+            return re.compile(literal(text) if quoted else text)
+        except re.error as xcpt:
+            raise ValueError(f"invalid query pattern {text!r}: {xcpt}")
+
+    def peek(self) -> str:
+        """Get next token text without consuming it."""
+
+        if self.position < len(self.tokens):
+            return self.tokens[self.position][1]
+        return ""
+
+    def take(self, kind: Optional[str] = None) -> str:
+        """Consume next token of an optional kind."""
+
+        if self.position >= len(self.tokens):
+            raise ValueError("unexpected end of query")
+
+        kind_, text = self.tokens[self.position]
+        if kind is not None and kind_ != kind:
+            raise ValueError(f"unexpected query token {text!r}")
+        elif kind_ == "symbol" and kind is None:
+            raise ValueError(f"expected value instead of {text!r}")
+        self.position += 1
+        return text
+
+    def values(self) -> List[Any]:
+        """Parse bracketed list of literals."""
+
+        self.expect("[")
+        values: List[Any] = []
+        while not self.accept("]"):
+            if values:
+                self.expect(",")
+            values.append(literal(self.take()))
+        return values
+
+
+def _both(left: Predicate, right: Predicate) -> Predicate:
+    """Create predicate requiring both predicates."""
+
+    return lambda row: left(row) and right(row)
+
+
+def _compare(
+    get: Callable[[Any], Any], compare: Callable[[Any, Any], Any], value: Any
+) -> Predicate:
+    """Create predicate comparing row value with a literal."""
+
+    missing = compare is operator.ne
+
+    def predicate(row: Any) -> bool:
+        found = get(row)
+        if found is _MISSING:
+            return missing
+        try:
+            return bool(compare(found, value))
+        except TypeError:
+            return False
+
+    return predicate
+
+
+def _either(left: Predicate, right: Predicate) -> Predicate:
+    """Create predicate requiring either predicate."""
+
+    return lambda row: left(row) or right(row)
+
+
+def _getter(parts: List[str]) -> Callable[[Any], Any]:
+    """Create function to get value at key path or a missing marker."""
+
+    if len(parts) == 1:
+        key = parts[0]
+        return lambda row: (
+            row.get(key, _MISSING) if isinstance(row, dict) else _MISSING
+        )
+
+    def get(row: Any) -> Any:
+        for part in parts:
+            if not isinstance(row, dict):
+                return _MISSING
+            row = row.get(part, _MISSING)
+        return row
+
+    return get
+
+
+def _member(get: Callable[[Any], Any], values: Sequence[Any]) -> Predicate:
+    """Create predicate checking whether row value equals any literal."""
+
+    def predicate(row: Any) -> bool:
+        found = get(row)
+        return found is not _MISSING and any(
+            found == value for value in values
+        )
+
+    return predicate
+
+
+def _search(get: Callable[[Any], Any], pattern: "re.Pattern[str]") -> Predicate:
+    """Create predicate searching string row value with a pattern."""
+
+    def predicate(row: Any) -> bool:
+        found = get(row)
+        return isinstance(found, str) and pattern.search(found) is not None
+
+    return predicate
@@ -0,0 +1,205 @@
+"""Resident server for answering commands over a Unix socket.
+
+The server keeps parsed tables in memory and runs commands sent by clients.
+Requests and responses are single lines of JSON. A request holds the command
+arguments, shared options, and the client's working directory, and a response
+holds the command's exit code and captured output. Watched files are polled
+for modification time and size changes between requests and reloaded once
+they change.
+"""
+
+
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import pathlib
+import socket
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from yamltable.cache import fingerprint
+from yamltable.typing import ExitCode
+
+
+Handler = Callable[[List[str], List[str]], Tuple[int, str, str]]
+# Maximum size of a request line in bytes.
+LIMIT = 2 ** 24
+
+
+class Watcher:
+    """Poller that reloads files once their modification time or size changes.
+
+    Attributes:
+        load: Function that loads a file into memory, or discards it if the
+            file is missing or invalid.
+    """
+
+    def __init__(
+        self,
+        file_paths: Iterable[pathlib.Path],
+        load: Callable[[pathlib.Path], Any],
+    ) -> None:
+        """Load files and remember their fingerprints.
+
+        Args:
+            file_paths: Files to watch.
+            load: Function that loads a file into memory, or discards it if
+                the file is missing or invalid.
+        """
+
+        self.load = load
+        # Negative stamps never match, so the first poll loads every file.
+        self._stamps: Dict[pathlib.Path, Optional[Tuple[int, int]]] = {
+            file_path: (-1, -1) for file_path in file_paths
+        }
+        self.poll()
+
+    def poll(self) -> List[pathlib.Path]:
+        """Reload files that changed since the last poll.
+
+        Returns:
+            Reloaded file paths.
+        """
+
+        changed = []
+        for file_path, stamp in self._stamps.items():
+            try:
+                mtime_ns, size, _ = fingerprint(file_path, digest=False)
+                current: Optional[Tuple[int, int]] = (mtime_ns, size)
+            except OSError:
+                current = None
+
+            if current != stamp:
+                self.load(file_path)
+                self._stamps[file_path] = current
+                changed.append(file_path)
+
+        return changed
+
+
+async def serve(
+    socket_path: pathlib.Path,
+    handler: Handler,
+    poll: Callable[[], Any],
+    interval: float = 1.0,
+) -> None:
+    """Answer requests on a Unix socket until cancelled.
+
+    Args:
+        socket_path: Unix socket path, which is replaced if it exists.
+        handler: Function that runs command options and arguments.
+        poll: Function that reloads changed files.
+        interval: Seconds between polls for changed files.
+    """
+
+    with contextlib.suppress(FileNotFoundError):
+        socket_path.unlink()
+
+    server = await asyncio.start_unix_server(
+        functools.partial(_respond, handler, poll),
+        path=str(socket_path),
+        limit=LIMIT,
+    )
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            poll()
+    finally:
+        server.close()
+        await server.wait_closed()
+        with contextlib.suppress(FileNotFoundError):
+            socket_path.unlink()
+
+
+def request(
+    socket_path: pathlib.Path, options: List[str], arguments: List[str]
+) -> Optional[Tuple[int, str, str]]:
+    """Run command on a server.
+
+    Args:
+        socket_path: Unix socket path.
+        options: Shared command line options.
+        arguments: Command name and arguments.
+
+    Raises:
+        ConnectionError: If the server closes the connection without a valid
+            response.
+
+    Returns:
+        Exit code, standard output, and standard error or None if no server
+            is listening on the socket.
+    """
+
+    message = {"options": options, "arguments": arguments, "cwd": os.getcwd()}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(socket_path))
+            client.sendall(json.dumps(message).encode("utf-8") + b"\n")
+            with client.makefile("rb") as handle:
+                line = handle.readline()
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
+
+    try:
+        response = json.loads(line)
+    except ValueError:
+        raise ConnectionError(
+            f"server at {socket_path} closed the connection without a response"
+        )
+    return response["exit_code"], response["stdout"], response["stderr"]
+
+
+@contextlib.contextmanager
+def _chdir(path: str) -> Iterator[None]:
+    """Temporarily change working directory."""
+
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+async def _respond(
+    handler: Handler,
+    poll: Callable[[], Any],
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    """Answer every request line of a connection."""
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+
+            try:
+                message = json.loads(line)
+                poll()
+                with _chdir(message["cwd"]):
+                    code, stdout, stderr = handler(
+                        message["options"], message["arguments"]
+                    )
+            except (KeyError, OSError, TypeError, ValueError) as xcpt:
+                code, stdout = ExitCode.ERROR.value, ""
+                stderr = f"Error: invalid request: {xcpt}\n"
+
+            response = {"exit_code": code, "stdout": stdout, "stderr": stderr}
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
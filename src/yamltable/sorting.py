@@ -0,0 +1,208 @@
+"""Multi-key row ordering with per-key direction and null placement.
+
+Sort key values are extracted once per row into key columns. Rows are then
+ordered with one stable sort per key, from the least to the most significant
+key, so that every comparison runs on plain values instead of dictionary
+lookups. Missing keys and null values are ordered separately from other
+values according to the null placement policy.
+
+Tables without missing or null values whose keys share a direction take a
+single sort pass, where list.sort already computes each key once per row.
+"""
+
+
+import functools
+import operator
+from typing import Any, Callable, List, NamedTuple, Sequence, Union
+
+from yamltable.typing import Nulls, Row
+
+
+class SortKey(NamedTuple):
+    """Row key name and sort direction."""
+
+    name: str
+    descending: bool = False
+
+
+def columns(rows: Sequence[Row], keys: Sequence[SortKey]) -> List[List[Any]]:
+    """Extract sort key values of rows.
+
+    Args:
+        rows: Dictionaries to sort.
+        keys: Sort keys.
+
+    Returns:
+        List of row values for each key, where missing keys are None.
+    """
+
+    return [[row.get(key.name) for row in rows] for key in keys]
+
+
+def comparator(
+    keys: Sequence[SortKey], nulls: Nulls = Nulls.LAST
+) -> Callable[[Sequence[Any]], Any]:
+    """Create sort key function for sequences of row key values.
+
+    The comparison is equivalent to the ordering of the order function and is
+    meant for merging already sorted rows.
+
+    Args:
+        keys: Sort keys.
+        nulls: Placement of missing and null values.
+
+    Returns:
+        Function mapping key values to comparable objects.
+
+    Examples:
+        >>> key = comparator(parse_keys(["a", "-b"]))
+        >>> sorted([(1, 2), (None, 0), (1, 3), (0, 1)], key=key)
+        [(0, 1), (1, 3), (1, 2), (None, 0)]
+    """
+
+    first = -1 if nulls is Nulls.FIRST else 1
+
+    def compare(left: Sequence[Any], right: Sequence[Any]) -> int:
+        """Compare row key values by sort key precedence."""
+
+        for key, lhs, rhs in zip(keys, left, right):
+            if lhs is None or rhs is None:
+                if lhs is rhs:
+                    continue
+                return first if lhs is None else -first
+
+            try:
+                if lhs < rhs:
+                    result = -1
+                elif rhs < lhs:
+                    result = 1
+                else:
+                    continue
+            except TypeError:
+                raise TypeError(_message(key, [lhs, rhs])) from None
+            return -result if key.descending else result
+
+        return 0
+
+    return functools.cmp_to_key(compare)
+
+
+def order(
+    values: Sequence[Sequence[Any]],
+    keys: Sequence[SortKey],
+    nulls: Nulls = Nulls.LAST,
+) -> List[int]:
+    """Compute stable sorted order of rows from their key columns.
+
+    Args:
+        values: Row values for each key.
+        keys: Sort keys.
+        nulls: Placement of missing and null values.
+
+    Raises:
+        TypeError: If values of a key are not comparable.
+
+    Returns:
+        Row indices in sorted order.
+
+    Examples:
+        >>> keys = parse_keys(["a", "-b"])
+        >>> order([[1, None, 1, 0], [2, 0, 3, 1]], keys)
+        [3, 2, 0, 1]
+    """
+
+    indices = list(range(len(values[0]))) if values else []
+
+    # Later passes take precedence while keeping ties in the earlier order.
+    for key, column in reversed(list(zip(keys, values))):
+        present = indices
+        missing = []
+        if None in column:
+            present = []
+            for idx in indices:
+                if column[idx] is None:
+                    missing.append(idx)
+                else:
+                    present.append(idx)
+
+        try:
+            present.sort(key=column.__getitem__, reverse=key.descending)
+        except TypeError:
+            raise TypeError(_message(key, column)) from None
+
+        if nulls is Nulls.FIRST:
+            indices = missing + present
+        else:
+            indices = present + missing
+
+    return indices
+
+
+def parse_keys(keys: Union[str, Sequence[str]]) -> List[SortKey]:
+    """Parse sort key names, where a leading hyphen sorts in descending order.
+
+    Args:
+        keys: Sort key name or names in order of precedence.
+
+    Raises:
+        ValueError: If no key names are given or a name is empty.
+
+    Returns:
+        Sort keys.
+
+    Examples:
+        >>> parse_keys("-size")
+        [SortKey(name='size', descending=True)]
+    """
+
+    names = [keys] if isinstance(keys, str) else keys
+    if not names:
+        raise ValueError("at least one sort key is required")
+
+    sort_keys = []
+    for name in names:
+        key = SortKey(name[1:], True) if name.startswith("-") else SortKey(name)
+        if not key.name:
+            raise ValueError(f"invalid sort key {name!r}")
+        sort_keys.append(key)
+
+    return sort_keys
+
+
+def sort_rows(
+    rows: Sequence[Row], keys: Sequence[SortKey], nulls: Nulls = Nulls.LAST
+) -> List[Row]:
+    """Sort rows by key values.
+
+    Args:
+        rows: Dictionaries to sort.
+        keys: Sort keys.
+        nulls: Placement of missing and null values.
+
+    Raises:
+        TypeError: If values of a key are not comparable.
+
+    Returns:
+        List of sorted dictionaries.
+    """
+
+    if len({key.descending for key in keys}) == 1:
+        # Missing keys raise KeyError and null values raise TypeError once
+        # compared, which only matters for ties of the preceding keys.
+        getter = operator.itemgetter(*[key.name for key in keys])
+        try:
+            return sorted(rows, key=getter, reverse=keys[0].descending)
+        except (KeyError, TypeError):
+            pass
+
+    return [rows[idx] for idx in order(columns(rows, keys), keys, nulls)]
+
+
+def _message(key: SortKey, values: Sequence[Any]) -> str:
+    """Describe incomparable value types of a sort key."""
+
+    types = sorted({type(value).__name__ for value in values} - {"NoneType"})
+    return (
+        f"cannot sort by key {key.name!r} with incomparable value types: "
+        + ", ".join(types)
+    )
@@ -0,0 +1,623 @@
+"""Streaming readers and writers for list organized YAML files.
+
+Paths of JSON, JSON Lines, and MessagePack files are dispatched on their
+extension to the readers and writers of the formats module.
+"""
+
+
+import contextlib
+import itertools
+import mmap
+import os
+import pathlib
+import stat
+import tempfile
+from typing import (
+    Any,
+    Collection,
+    IO,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import yaml
+
+from yamltable import formats, metrics
+from yamltable.backend import dumper, loader as load
+from yamltable.query import Query
+from yamltable.typing import Backend, FileFormat, Phase, Row, Schema
+
+
+BUFFER_SIZE = 2 ** 20
+Span = Tuple[int, int]
+
+_MAP_TAG = "tag:yaml.org,2002:map"
+_MERGE_TAG = "tag:yaml.org,2002:merge"
+_STR_TAG = "tag:yaml.org,2002:str"
+
+
+@contextlib.contextmanager
+def atomic_open(file_path: pathlib.Path, mode: str = "w") -> Iterator[IO[Any]]:
+    """Open buffered temporary file that atomically replaces a file on success.
+
+    The temporary file is created in the same directory as the target, synced
+    to disk, given the target's permissions, and renamed over the target once
+    the context exits without an error. Otherwise the target is untouched and
+    the temporary file is removed.
+
+    Args:
+        file_path: File path to replace.
+        mode: Write mode, either "w" for UTF-8 text or "wb" for bytes.
+
+    Returns:
+        Context manager of writable file handle.
+    """
+
+    descriptor, name = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp"
+    )
+    try:
+        encoding = None if "b" in mode else "utf-8"
+        with open(descriptor, mode, BUFFER_SIZE, encoding) as handle:
+            yield handle
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.chmod(name, _file_mode(file_path))
+        os.replace(name, file_path)
+    except BaseException:
+        os.unlink(name)
+        raise
+
+
+def dump_rows(
+    handle: IO[str],
+    rows: Iterable[Row],
+    schema: Optional[Schema] = None,
+    sort_keys: bool = False,
+    backend: Backend = Backend.AUTO,
+) -> None:
+    """Write rows to YAML stream one row at a time.
+
+    Output is byte identical to dumping the whole table at once, but only a
+    single row is held by the emitter at any time.
+
+    Args:
+        handle: Text I/O stream.
+        rows: Iterable of rows to write.
+        schema: JSON schema dictionary.
+        sort_keys: Whether to sort row keys.
+        backend: YAML emitter implementation.
+
+    Raises:
+        ValueError: If the requested backend is unavailable.
+
+    Examples:
+        >>> import io
+        >>> handle = io.StringIO()
+        >>> dump_rows(handle, iter([{"foo": 1}, {"foo": 2}]))
+        >>> print(handle.getvalue(), end="")
+        - foo: 1
+        - foo: 2
+    """
+
+    items = iter(rows)
+    head = list(itertools.islice(items, 1))
+
+    if schema is None:
+        if not head:
+            handle.write(_dump([], sort_keys, backend))
+        for row in itertools.chain(head, items):
+            handle.write(_dump([row], sort_keys, backend))
+        return
+
+    # Sorted keys place the rows key before the schema key.
+    header = _dump({"schema": schema}, sort_keys, backend)
+    if not sort_keys:
+        handle.write(header)
+    if head:
+        handle.write("rows:\n")
+        for row in itertools.chain(head, items):
+            handle.write(_dump([row], sort_keys, backend))
+    else:
+        handle.write("rows: []\n")
+    if sort_keys:
+        handle.write(header)
+
+
+def iter_rows(
+    stream: Union[IO[str], pathlib.Path, str],
+    backend: Backend = Backend.AUTO,
+    where: Optional[Query] = None,
+    format_: Optional[FileFormat] = None,
+) -> Tuple[Iterator[Row], Optional[Schema]]:
+    r"""Lazily read rows from YAML file.
+
+    Rows are built one top-level sequence item at a time from the YAML event
+    stream, so memory usage stays near the size of a single row. For schema
+    organized files, the schema is read before the first row. If the rows key
+    precedes the schema key, the rows must be buffered to reach the schema.
+
+    A query is evaluated on the keys it reads before the rest of a row is
+    built, so rows that do not match are skipped cheaply.
+
+    Args:
+        stream: YAML text, text I/O stream, or file path.
+        backend: YAML parser implementation.
+        where: Query that rows must match.
+        format_: File format, detected from the file extension by default.
+            Formats other than YAML are only read from file paths.
+
+    Raises:
+        FileNotFoundError: If unable to find file path.
+        TypeError: If file is not organized as a list. Invalid YAML found after
+            the first row raises during iteration.
+        ValueError: If the requested backend or format is unavailable.
+
+    Returns:
+        Row iterator, YAML schema.
+
+    Examples:
+        >>> rows, schema = iter_rows("- foo: 1\n- foo: 2")
+        >>> next(rows)
+        {'foo': 1}
+        >>> list(rows)
+        [{'foo': 2}]
+    """
+
+    with metrics.phase(Phase.READ) as counter:
+        if counter.active and isinstance(stream, pathlib.Path):
+            counter.bytes = stream.stat().st_size
+        rows, schema = _open_rows(stream, backend, where, format_)
+    return metrics.timed(rows, Phase.READ), schema
+
+
+def iter_spans(
+    file_path: pathlib.Path, backend: Backend = Backend.AUTO
+) -> Tuple[Iterator[Tuple[Row, Span]], Optional[Schema]]:
+    """Lazily read rows and their byte spans from a UTF-8 YAML file.
+
+    A span covers the row's YAML node, from the first byte after the sequence
+    item indicator to the start of the next token.
+
+    Args:
+        file_path: YAML file path.
+        backend: YAML parser implementation.
+
+    Raises:
+        FileNotFoundError: If unable to find file path.
+        TypeError: If file is not organized as a list or is not a YAML file.
+        ValueError: If the requested backend is unavailable.
+
+    Returns:
+        Iterator of rows and their start and end byte offsets, YAML schema.
+    """
+
+    format_ = formats.detect(file_path)
+    if format_ != FileFormat.YAML:
+        raise TypeError(
+            f"byte spans of {formats.NAMES[format_]} files are unsupported"
+        )
+
+    items, schema = _iter_items(file_path, backend)
+    return _with_spans(file_path, items), schema
+
+
+def read_span(
+    handle: Union[IO[bytes], mmap.mmap],
+    span: Span,
+    backend: Backend = Backend.AUTO,
+) -> Row:
+    """Read a single row from its byte span in a YAML file.
+
+    Args:
+        handle: Binary file handle or memory map of YAML file.
+        span: Start and end byte offsets of row.
+        backend: YAML parser implementation.
+
+    Raises:
+        TypeError: If the span does not contain a standalone YAML node, such as
+            a row with aliases to anchors in other rows.
+
+    Returns:
+        Row data.
+    """
+
+    start, end = span
+
+    # Replace the line prefix before the row, such as a sequence indicator,
+    # with spaces to keep the row's block indentation valid.
+    window = max(0, start - 4096)
+    handle.seek(window)
+    prefix = handle.read(start - window)
+    prefix = prefix[prefix.rfind(b"\n") + 1 :]
+
+    text = handle.read(end - start).decode("utf-8")
+    loader = load(" " * len(prefix.decode("utf-8")) + text, backend)
+    try:
+        row: Row = loader.get_single_data()
+    except yaml.YAMLError as xcpt:
+        raise TypeError(f"invalid YAML row: {xcpt}")
+    finally:
+        loader.dispose()
+
+    return row
+
+
+def write_rows(
+    file_path: pathlib.Path,
+    rows: Iterable[Row],
+    schema: Optional[Schema] = None,
+    sort_keys: bool = False,
+    backend: Backend = Backend.AUTO,
+    format_: Optional[FileFormat] = None,
+) -> None:
+    """Atomically write rows to a table file in its format.
+
+    Args:
+        file_path: Table file path.
+        rows: Iterable of rows to write.
+        schema: JSON schema dictionary.
+        sort_keys: Whether to sort row keys.
+        backend: YAML emitter implementation.
+        format_: File format, detected from the file extension by default.
+
+    Raises:
+        ValueError: If the requested backend or format is unavailable.
+    """
+
+    format_ = formats.detect(file_path) if format_ is None else format_
+    with metrics.phase(Phase.EMIT) as counter:
+        rows = counter.count(rows)
+        if format_ == FileFormat.YAML:
+            with atomic_open(file_path) as handle:
+                dump_rows(handle, rows, schema, sort_keys, backend)
+        else:
+            with atomic_open(file_path, "wb") as handle:
+                formats.dump_rows(handle, rows, schema, format_, sort_keys)
+        if counter.active:
+            counter.bytes = file_path.stat().st_size
+
+
+class _ByteOffsets:
+    """Translate parser character indices into byte offsets of a UTF-8 file.
+
+    Indices must be requested in non-decreasing order, which holds for the
+    marks of consecutive YAML nodes.
+    """
+
+    def __init__(self, handle: IO[str]) -> None:
+        """Create translator for text handle opened without newline mapping."""
+
+        self._handle = handle
+        self._chunk = ""
+        self._chunk_start = 0
+        self._index = 0
+        self._offset = 0
+
+    def __call__(self, index: int) -> int:
+        """Get byte offset of character index."""
+
+        while index > self._chunk_start + len(self._chunk):
+            self._advance(self._chunk_start + len(self._chunk))
+            self._chunk_start += len(self._chunk)
+            self._chunk = self._handle.read(2 ** 16)
+            if not self._chunk:
+                raise ValueError(f"character index {index} is out of range")
+
+        self._advance(index)
+        return self._offset
+
+    def _advance(self, index: int) -> None:
+        """Move position forward within the current chunk."""
+
+        begin = self._index - self._chunk_start
+        end = index - self._chunk_start
+        self._offset += len(self._chunk[begin:end].encode("utf-8"))
+        self._index = index
+
+
+def _close(loader: Any, handle: Optional[IO[Any]]) -> None:
+    """Release loader resources and close file handle if owned."""
+
+    if loader is not None:
+        loader.dispose()
+    if handle is not None:
+        handle.close()
+
+
+def _construct(loader: Any) -> Any:
+    """Compose and construct the next YAML node as a Python object."""
+
+    node = loader.compose_node(None, None)
+    return loader.construct_document(node)
+
+
+def _construct_keys(
+    loader: Any, node: Any, keys: Collection[str]
+) -> Optional[Row]:
+    """Construct mapping with only the selected string keys.
+
+    Returns:
+        Partial row or None if the mapping has merge keys.
+    """
+
+    partial = {}
+    for key_node, value_node in node.value:
+        if key_node.tag == _MERGE_TAG:
+            return None
+        elif key_node.tag == _STR_TAG and key_node.value in keys:
+            partial[key_node.value] = loader.construct_object(
+                value_node, deep=True
+            )
+
+    return partial
+
+
+def _dump(data: Any, sort_keys: bool, backend: Backend) -> str:
+    """Dump data to YAML text with the selected emitter."""
+
+    text: str = yaml.dump(
+        data, Dumper=dumper(data, backend), sort_keys=sort_keys
+    )
+    return text
+
+
+def _file_mode(file_path: pathlib.Path) -> int:
+    """Get permissions of file or the default permissions for new files."""
+
+    try:
+        return stat.S_IMODE(file_path.stat().st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _finish(loader: Any) -> None:
+    """Consume remaining events after the rows sequence.
+
+    Raises:
+        TypeError: If the stream contains more than one document.
+    """
+
+    # Skip any trailing keys of a schema and rows organized mapping.
+    while not loader.check_event(yaml.MappingEndEvent, yaml.DocumentEndEvent):
+        loader.compose_node(None, None)
+    if loader.check_event(yaml.MappingEndEvent):
+        loader.get_event()
+    loader.get_event()  # DocumentEndEvent
+
+    if not loader.check_event(yaml.StreamEndEvent):
+        raise TypeError("YAML file must contain a single document")
+    loader.get_event()
+
+
+def _iter_items(
+    stream: Union[IO[str], pathlib.Path, str],
+    backend: Backend,
+    where: Optional[Query] = None,
+) -> Tuple[Iterator[Tuple[Any, Row]], Optional[Schema]]:
+    """Open YAML stream and read up to the first row.
+
+    Args:
+        stream: YAML text, text I/O stream, or file path.
+        backend: YAML parser implementation.
+        where: Query that rows must match.
+
+    Returns:
+        Iterator of row nodes and rows, YAML schema.
+    """
+
+    handle: Optional[IO[Any]] = None
+    source: Union[IO[Any], str]
+    if isinstance(stream, pathlib.Path):
+        handle = source = stream.open("rb")
+    else:
+        source = stream
+
+    loader = None
+    try:
+        loader = load(source, backend)
+        schema, buffered = _read_header(loader)
+    except BaseException:
+        _close(loader, handle)
+        raise
+
+    return _iter_nodes(loader, handle, buffered, where), schema
+
+
+def _iter_nodes(
+    loader: Any,
+    handle: Optional[IO[Any]],
+    buffered: Any,
+    where: Optional[Query] = None,
+) -> Iterator[Tuple[Any, Row]]:
+    """Yield row nodes and rows until the end of the rows sequence.
+
+    Args:
+        loader: YAML loader positioned inside the rows sequence.
+        handle: File handle to close after iteration.
+        buffered: Rows sequence node if it was composed ahead of time.
+        where: Query that rows must match.
+
+    Raises:
+        TypeError: If YAML file is invalid.
+
+    Returns:
+        Iterator of row nodes and rows.
+    """
+
+    try:
+        if buffered is None:
+            while not loader.check_event(yaml.SequenceEndEvent):
+                node = loader.compose_node(None, None)
+                if where is None:
+                    yield node, loader.construct_document(node)
+                else:
+                    yield from _select(loader, node, where)
+            loader.get_event()
+            _finish(loader)
+        else:
+            for node in buffered.value:
+                if where is None:
+                    yield node, loader.construct_document(node)
+                else:
+                    yield from _select(loader, node, where)
+    except yaml.YAMLError as xcpt:
+        raise TypeError(f"invalid YAML file: {xcpt}")
+    finally:
+        _close(loader, handle)
+
+
+def _open_rows(
+    stream: Union[IO[str], pathlib.Path, str],
+    backend: Backend,
+    where: Optional[Query],
+    format_: Optional[FileFormat],
+) -> Tuple[Iterator[Row], Optional[Schema]]:
+    """Open row iterator of a table in any format."""
+
+    if format_ is None and isinstance(stream, pathlib.Path):
+        format_ = formats.detect(stream)
+    if format_ not in (None, FileFormat.YAML):
+        if not isinstance(stream, pathlib.Path):
+            raise ValueError(
+                f"{formats.NAMES[format_]} tables are only read from files"
+            )
+        rows, schema = formats.iter_rows(stream, format_)
+        if where is not None:
+            rows = (row for row in rows if where(row))
+        return rows, schema
+
+    items, schema = _iter_items(stream, backend, where)
+    return (row for _, row in items), schema
+
+
+def _read_header(loader: Any) -> Tuple[Optional[Schema], Any]:
+    """Read events up to the start of the rows sequence.
+
+    Args:
+        loader: YAML loader positioned at the start of the stream.
+
+    Raises:
+        TypeError: If YAML file is invalid or not organized as a table.
+
+    Returns:
+        YAML schema, rows sequence node if it had to be composed to find the
+            schema.
+    """
+
+    try:
+        loader.get_event()  # StreamStartEvent
+        if loader.check_event(yaml.DocumentStartEvent):
+            loader.get_event()
+            if loader.check_event(yaml.SequenceStartEvent):
+                loader.get_event()
+                return None, None
+            elif loader.check_event(yaml.MappingStartEvent):
+                loader.get_event()
+                return _read_mapping(loader)
+    except yaml.YAMLError as xcpt:
+        raise TypeError(f"invalid YAML file: {xcpt}")
+
+    raise TypeError("YAML file is not organized in a tabular format")
+
+
+def _read_mapping(loader: Any) -> Tuple[Optional[Schema], Any]:
+    """Read schema and rows organized mapping keys up to the rows sequence.
+
+    Args:
+        loader: YAML loader positioned at the first mapping key.
+
+    Raises:
+        TypeError: If the mapping lacks schema or rows keys.
+
+    Returns:
+        YAML schema, rows sequence node if it had to be composed to find the
+            schema.
+    """
+
+    found_schema = False
+    schema: Optional[Schema] = None
+    rows: Any = None
+
+    while not loader.check_event(yaml.MappingEndEvent):
+        key = _construct(loader)
+        if key == "rows" and rows is None:
+            if not loader.check_event(yaml.SequenceStartEvent):
+                raise TypeError("YAML file rows are not organized as a list")
+            elif found_schema:
+                loader.get_event()
+                return schema, None
+            rows = loader.compose_node(None, None)
+        elif key == "schema" and not found_schema:
+            found_schema = True
+            schema = _construct(loader)
+        else:
+            loader.compose_node(None, None)
+
+    if rows is None or not found_schema:
+        raise TypeError(
+            "YAML file does not have a schema and rows organization"
+        )
+
+    _finish(loader)
+    return schema, rows
+
+
+def _select(
+    loader: Any, node: Any, where: Query
+) -> Iterator[Tuple[Any, Row]]:
+    """Yield row node and row if the row matches a query.
+
+    Only the row keys read by the query are constructed to evaluate it. Rows
+    with merge keys or non-standard mapping tags are fully constructed first.
+
+    Args:
+        loader: YAML loader that composed the row node.
+        node: Row node.
+        where: Query that the row must match.
+
+    Returns:
+        Iterator of the row node and row if it matches.
+    """
+
+    partial: Optional[Row] = {}
+    if isinstance(node, yaml.MappingNode):
+        if node.tag != _MAP_TAG:
+            partial = None
+        else:
+            partial = _construct_keys(loader, node, where.keys)
+
+    if partial is not None and not where(partial):
+        # Discard partially constructed values before the next row.
+        loader.constructed_objects = {}
+        loader.recursive_objects = {}
+        return
+
+    row = loader.construct_document(node)
+    if partial is not None or where(row):
+        yield node, row
+
+
+def _with_spans(
+    file_path: pathlib.Path, items: Iterator[Tuple[Any, Row]]
+) -> Iterator[Tuple[Row, Span]]:
+    """Attach byte spans to rows using their node marks.
+
+    Args:
+        file_path: YAML file path.
+        items: Iterator of row nodes and rows.
+
+    Returns:
+        Iterator of rows and their start and end byte offsets.
+    """
+
+    with file_path.open("r", encoding="utf-8", newline="") as handle:
+        offsets = _ByteOffsets(handle)
+        for node, row in items:
+            start = offsets(node.start_mark.index)
+            yield row, (start, offsets(node.end_mark.index))
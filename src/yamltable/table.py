@@ -0,0 +1,509 @@
+"""Columnar in-memory tables.
+
+A table stores each row key as a typed column instead of keeping a dictionary
+per row. Integers, floats, and booleans are packed into arrays, strings are
+dictionary encoded into arrays of codes, and every other value falls back to a
+list. A byte mask per column records whether each row has a value, a null, or
+no such key. The key order of every row is dictionary encoded as well, so rows
+convert back into dictionaries identical to the ones the table was built from.
+"""
+
+
+import array
+import itertools
+import operator
+import pathlib
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from yamltable import metrics, sorting
+from yamltable.stream import iter_rows
+from yamltable.typing import Backend, Nulls, Phase, Row, Schema
+
+
+MISSING = 0
+VALUE = 1
+NULL = 2
+
+# Array type codes of packed column kinds, where strings store their codes.
+TYPECODES = {"bool": "b", "float": "d", "int": "q", "str": "I"}
+SCHEMA_KINDS = {"boolean": "bool", "integer": "int", "string": "str"}
+
+_INT_RANGE = range(-(2 ** 63), 2 ** 63)
+_TYPES = {bool: "bool", float: "float", int: "int", str: "str"}
+
+
+class Column:
+    """Typed column of row values.
+
+    Attributes:
+        kind: Value type of column, either bool, float, int, str, object, or
+            None if the column has no values yet.
+        data: Array of values or string codes, or list of objects.
+        mask: Whether each row is missing the key, has a value, or a null.
+        dictionary: Distinct strings of a string column in order of first use.
+    """
+
+    def __init__(self, kind: Optional[str] = None) -> None:
+        """Create empty column.
+
+        Args:
+            kind: Expected value type of column.
+        """
+
+        self.kind = kind
+        self.data: Any = _empty(kind)
+        self.mask = bytearray()
+        self.dictionary: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __getitem__(self, index: int) -> Any:
+        """Get value of row, where nulls and missing values are None."""
+
+        if self.mask[index] != VALUE:
+            return None
+        elif self.kind == "str":
+            return self.dictionary[self.data[index]]
+        elif self.kind == "bool":
+            return bool(self.data[index])
+        return self.data[index]
+
+    def __len__(self) -> int:
+        """Get number of rows."""
+
+        return len(self.mask)
+
+    def append(self, value: Any) -> None:
+        """Append value of next row.
+
+        Values that do not fit the column's type turn it into an object
+        column.
+
+        Args:
+            value: Row value.
+        """
+
+        if value is None:
+            self.append_missing(NULL)
+            return
+
+        kind = _TYPES.get(type(value), "object")
+        if kind == "int" and value not in _INT_RANGE:
+            kind = "object"
+        if self.kind is None:
+            self._convert(kind)
+        elif kind != self.kind and self.kind != "object":
+            self._convert("object")
+
+        if self.kind == "str":
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self.dictionary)
+                self.dictionary.append(value)
+            self.data.append(code)
+        else:
+            self.data.append(value)
+        self.mask.append(VALUE)
+
+    def append_missing(self, state: int = MISSING) -> None:
+        """Append placeholder for a row without a value.
+
+        Args:
+            state: Whether the row is missing the key or has a null.
+        """
+
+        if self.kind is not None:
+            self.data.append(None if self.kind == "object" else 0)
+        self.mask.append(state)
+
+    def equal(self, val: Any) -> List[int]:
+        """Find rows whose value equals a value.
+
+        Args:
+            val: Comparison value.
+
+        Returns:
+            Indices of matching rows.
+        """
+
+        if val is None:
+            return self.states(NULL)
+        elif self.kind is None:
+            return []
+
+        data = self.data
+        if self.kind == "str":
+            try:
+                code = self._codes.get(val)
+            except TypeError:
+                return []
+            if code is None:
+                return []
+            val = code
+
+        # Both comparisons are mapped in C, and placeholders are masked out.
+        matches = map(
+            operator.and_,
+            map(operator.eq, data, itertools.repeat(val)),
+            map(operator.eq, self.mask, itertools.repeat(VALUE)),
+        )
+        return list(itertools.compress(range(len(self)), matches))
+
+    def states(self, state: int) -> List[int]:
+        """Find rows with a mask state.
+
+        Args:
+            state: Mask state.
+
+        Returns:
+            Indices of rows.
+        """
+
+        matches = map(operator.eq, self.mask, itertools.repeat(state))
+        return list(itertools.compress(range(len(self)), matches))
+
+    def take(self, indices: Sequence[int]) -> "Column":
+        """Create column from rows at indices.
+
+        Args:
+            indices: Row positions.
+
+        Returns:
+            New column sharing the string dictionary.
+        """
+
+        column = Column(self.kind)
+        column.mask = bytearray(_gather(self.mask, indices))
+        if self.kind == "object":
+            column.data = list(_gather(self.data, indices))
+        elif self.kind is not None:
+            column.data.fromlist(list(_gather(self.data, indices)))
+        column.dictionary = self.dictionary
+        column._codes = self._codes
+        return column
+
+    def values(self) -> List[Any]:
+        """Get values of every row, where nulls and missing values are None.
+
+        Returns:
+            Row values.
+        """
+
+        values: List[Any]
+        if self.kind is None:
+            return [None] * len(self)
+        elif self.kind == "str":
+            values = list(map(self.dictionary.__getitem__, self.data))
+        elif self.kind == "bool":
+            values = list(map(bool, self.data))
+        else:
+            values = list(self.data)
+
+        if self.mask.count(VALUE) != len(self):
+            for idx in self.states(MISSING) + self.states(NULL):
+                values[idx] = None
+        return values
+
+    def _convert(self, kind: str) -> None:
+        """Change column type and move existing values into new storage."""
+
+        values = self.values()
+        self.kind = kind
+        self.data = _empty(kind)
+        if kind == "object":
+            self.data.extend(values)
+        else:
+            self.data.extend(0 for _ in values)
+        self.dictionary = []
+        self._codes = {}
+
+
+class Table:
+    """Columnar table of rows.
+
+    Attributes:
+        columns: Mapping from row keys to columns.
+        layouts: Distinct row key orders.
+        rows_layout: Index into layouts for every row.
+        schema: YAML schema.
+    """
+
+    def __init__(self, schema: Optional[Schema] = None) -> None:
+        """Create empty table.
+
+        Args:
+            schema: YAML schema whose property types are used as column types.
+        """
+
+        self.columns: Dict[str, Column] = {}
+        self.layouts: List[Tuple[str, ...]] = []
+        self.rows_layout = array.array("I")
+        self.schema = schema
+        self._layout_codes: Dict[Tuple[str, ...], int] = {}
+
+    def __getitem__(self, index: int) -> Row:
+        """Convert row at index into a dictionary.
+
+        Args:
+            index: Row position, where negative values count from the end.
+
+        Raises:
+            IndexError: If index is out of bounds.
+
+        Returns:
+            Row data.
+        """
+
+        layout = self.layouts[self.rows_layout[index]]
+        if index < 0:
+            index += len(self)
+        return {key: self.columns[key][index] for key in layout}
+
+    def __iter__(self) -> Iterator[Row]:
+        """Convert rows into dictionaries one at a time."""
+
+        for index in range(len(self)):
+            yield self[index]
+
+    def __len__(self) -> int:
+        """Get number of rows."""
+
+        return len(self.rows_layout)
+
+    def append(self, row: Row) -> None:
+        """Append row to table.
+
+        Args:
+            row: Row dictionary.
+
+        Raises:
+            TypeError: If row is not a dictionary.
+        """
+
+        if not isinstance(row, dict):
+            raise TypeError(
+                f"table row {len(self)} is a {type(row).__name__} instead of a"
+                " dictionary"
+            )
+
+        layout = tuple(row)
+        code = self._layout_codes.get(layout)
+        if code is None:
+            code = self._layout_codes[layout] = len(self.layouts)
+            self.layouts.append(layout)
+            for key in layout:
+                if key not in self.columns:
+                    self.columns[key] = self._column(key)
+
+        for key, column in self.columns.items():
+            if key in row:
+                column.append(row[key])
+            else:
+                column.append_missing()
+        self.rows_layout.append(code)
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[Row], schema: Optional[Schema] = None
+    ) -> "Table":
+        """Build table from rows.
+
+        Args:
+            rows: Iterable of row dictionaries.
+            schema: YAML schema whose property types are used as column types.
+
+        Raises:
+            TypeError: If a row is not a dictionary.
+
+        Returns:
+            Table of rows.
+
+        Examples:
+            >>> table = Table.from_rows([{"id": 2, "name": "b"}, {"id": 1}])
+            >>> table.columns["id"].kind, table.columns["name"].kind
+            ('int', 'str')
+            >>> list(table.sort("id"))
+            [{'id': 1}, {'id': 2, 'name': 'b'}]
+        """
+
+        table = cls(schema)
+        for row in rows:
+            table.append(row)
+        return table
+
+    @classmethod
+    def read(
+        cls,
+        stream: Union[pathlib.Path, str],
+        backend: Backend = Backend.AUTO,
+    ) -> "Table":
+        """Stream rows from YAML file into table.
+
+        Args:
+            stream: YAML text or file path.
+            backend: YAML parser implementation.
+
+        Raises:
+            FileNotFoundError: If unable to find file path.
+            TypeError: If file is not organized as a list of dictionaries.
+
+        Returns:
+            Table of rows and schema.
+        """
+
+        rows, schema = iter_rows(stream, backend)
+        return cls.from_rows(rows, schema)
+
+    def search(self, key: str, val: Any) -> "Table":
+        """Select rows whose key equals value.
+
+        Args:
+            key: Search key.
+            val: Key comparison value.
+
+        Returns:
+            Table of matching rows.
+        """
+
+        column = self.columns.get(key)
+        return self.take([] if column is None else column.equal(val))
+
+    def sort(
+        self, key: Union[str, Sequence[str]], nulls: Nulls = Nulls.LAST
+    ) -> "Table":
+        """Sort rows by key values.
+
+        Ordering is identical to yamltable.sort. String columns are ordered by
+        the rank of their dictionary entries.
+
+        Args:
+            key: Sort key name or names.
+            nulls: Placement of missing and null values.
+
+        Raises:
+            TypeError: If values of a key are not comparable.
+            ValueError: If no key names are given.
+
+        Returns:
+            Table of sorted rows.
+        """
+
+        keys = sorting.parse_keys(key)
+        with metrics.phase(Phase.TRANSFORM) as counter:
+            counter.rows = len(self)
+            values = [self._sort_values(key_.name) for key_ in keys]
+            return self.take(sorting.order(values, keys, nulls))
+
+    def take(self, indices: Sequence[int]) -> "Table":
+        """Create table from rows at indices.
+
+        Args:
+            indices: Row positions.
+
+        Returns:
+            New table.
+        """
+
+        table = Table(self.schema)
+        table.columns = {
+            key: column.take(indices) for key, column in self.columns.items()
+        }
+        table.layouts = self.layouts
+        table.rows_layout.fromlist(list(_gather(self.rows_layout, indices)))
+        table._layout_codes = self._layout_codes
+        return table
+
+    def values(self, key: str) -> List[Any]:
+        """Get key values of every row.
+
+        Args:
+            key: Row key.
+
+        Raises:
+            KeyError: If a row does not have the key.
+
+        Returns:
+            Row values in order.
+        """
+
+        column = self.columns.get(key)
+        if column is None:
+            if len(self):
+                raise KeyError(f"row 0 does not have key {key!r}")
+            return []
+
+        missing = column.mask.find(MISSING)
+        if missing >= 0:
+            raise KeyError(f"row {missing} does not have key {key!r}")
+        return column.values()
+
+    def _column(self, key: str) -> Column:
+        """Create column for new key with missing values for existing rows."""
+
+        column = Column(self._schema_kind(key))
+        for _ in range(len(self)):
+            column.append_missing()
+        return column
+
+    def _schema_kind(self, key: str) -> Optional[str]:
+        """Get column type from the schema's property type of a key."""
+
+        properties = (self.schema or {}).get("properties")
+        if not isinstance(properties, dict):
+            return None
+
+        type_ = (properties.get(key) or {}).get("type")
+        if isinstance(type_, list):
+            types = [elem for elem in type_ if elem != "null"]
+            type_ = types[0] if len(types) == 1 else None
+        return SCHEMA_KINDS.get(type_) if isinstance(type_, str) else None
+
+    def _sort_values(self, key: str) -> List[Any]:
+        """Get comparable key values, where nulls and missing values are None.
+
+        String values are replaced by their rank among the column's strings.
+        """
+
+        column = self.columns.get(key)
+        if column is None:
+            return [None] * len(self)
+        elif column.kind != "str":
+            return column.values()
+
+        ranks = [0] * len(column.dictionary)
+        for rank, code in enumerate(
+            sorted(range(len(ranks)), key=column.dictionary.__getitem__)
+        ):
+            ranks[code] = rank
+
+        values: List[Any] = list(map(ranks.__getitem__, column.data))
+        if column.mask.count(VALUE) != len(column):
+            for idx in column.states(MISSING) + column.states(NULL):
+                values[idx] = None
+        return values
+
+
+def _empty(kind: Optional[str]) -> Any:
+    """Create empty storage for column type."""
+
+    if kind in TYPECODES:
+        return array.array(TYPECODES[kind])
+    return []
+
+
+def _gather(values: Sequence[Any], indices: Sequence[int]) -> Sequence[Any]:
+    """Get values at indices with a single call into C."""
+
+    if len(indices) < 2:
+        return [values[idx] for idx in indices]
+    gathered: Sequence[Any] = operator.itemgetter(*indices)(values)
+    return gathered
@@ -10,6 +10,14 @@ Row = Dict[str, Any]
 Schema = Dict[str, Any]
 
 
+class Backend(enum.Enum):
+    """YAML parser and emitter implementations."""
+
+    AUTO = "auto"
+    C = "c"
+    PYTHON = "python"
+
+
 class ExitCode(enum.Enum):
     """Exit code statuses."""
 
@@ -18,11 +26,65 @@ class ExitCode(enum.Enum):
     ERROR = 2
 
 
+class FileFormat(enum.Enum):
+    """Table file formats."""
+
+    JSON = "json"
+    JSONL = "jsonl"
+    MSGPACK = "msgpack"
+    YAML = "yaml"
+
+
+class Format(enum.Enum):
+    """Output formats of listed values and rows."""
+
+    CSV = "csv"
+    JSON = "json"
+    JSONL = "jsonl"
+    PLAIN = "plain"
+    PRETTY = "pretty"
+    TSV = "tsv"
+
+
 FileArg = typer.Argument(
     ..., dir_okay=False, exists=True, file_okay=True, resolve_path=True
 )
 
 
+FormatOption = typer.Option(
+    Format.PRETTY.value,
+    "--format",
+    help=(
+        "Output format, where pretty output is only rendered with Rich on a"
+        " terminal."
+    ),
+)
+
+
+class Nulls(enum.Enum):
+    """Placements of missing and null values in sorted rows."""
+
+    FIRST = "first"
+    LAST = "last"
+
+
+class Phase(enum.Enum):
+    """Timed phases of table operations."""
+
+    READ = "read"
+    VALIDATE = "validate"
+    TRANSFORM = "transform"
+    EMIT = "emit"
+
+
+class Profile(enum.Enum):
+    """Command profiling modes."""
+
+    CPROFILE = "cprofile"
+    SPEEDSCOPE = "speedscope"
+    TIME = "time"
+
+
 class StatusColor(enum.Enum):
     """Colors for message types."""
 
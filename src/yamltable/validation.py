@@ -0,0 +1,171 @@
+"""Compiled JSON schema validators.
+
+Building a validator checks the schema against the metaschema, which costs more
+than validating a small table. Validators are therefore memoized by schema
+hash for the lifetime of the process. Schemas of simple keywords are validated
+with generated code and only use jsonschema to report errors. jsonschema is
+imported once the first validator is built, since it dominates startup time.
+"""
+
+
+import collections
+import hashlib
+import itertools
+import json
+from typing import Any, Deque, Iterable, Iterator, List, Optional, Tuple
+
+from yamltable.typing import Row, Schema
+
+
+CACHE_SIZE = 32
+CHUNK_SIZE = 1000
+
+_validators: "collections.OrderedDict[str, Any]" = collections.OrderedDict()
+
+
+def schema_hash(schema: Optional[Schema]) -> str:
+    """Compute hash of schema's canonical JSON form.
+
+    Args:
+        schema: JSON schema.
+
+    Returns:
+        Hexadecimal SHA-256 digest.
+    """
+
+    text = json.dumps(schema, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def validator(schema: Optional[Schema]) -> Any:
+    """Get compiled validator for schema.
+
+    Args:
+        schema: JSON schema.
+
+    Raises:
+        SchemaError: If schema is not a valid JSON schema.
+        UnknownType: If schema uses an unknown type.
+
+    Returns:
+        Draft 7 validator or generated validator with the same interface.
+    """
+
+    key = schema_hash(schema)
+    try:
+        validator_ = _validators.pop(key)
+    except KeyError:
+        import jsonschema
+
+        from yamltable import codegen
+
+        jsonschema.Draft7Validator.check_schema(schema)
+        validator_ = jsonschema.Draft7Validator(schema)
+        check = codegen.compile_schema(schema)
+        if check is not None:
+            validator_ = codegen.FastValidator(check, validator_)
+
+    # Reinsert validator as most recently used and evict the oldest.
+    _validators[key] = validator_
+    if len(_validators) > CACHE_SIZE:
+        _validators.popitem(last=False)
+    return validator_
+
+
+def first_error(
+    rows: Iterable[Row], schema: Optional[Schema], workers: int = 1
+) -> Optional[Tuple[int, str]]:
+    """Find the first row that does not satisfy the schema.
+
+    With multiple workers, rows are validated in chunks across a process pool.
+    Chunk results are collected in order, so the reported row is the same as
+    for serial validation.
+
+    Args:
+        rows: Dictionaries to validate.
+        schema: JSON schema for validation.
+        workers: Number of worker processes.
+
+    Raises:
+        SchemaError: If schema is not a valid JSON schema.
+        UnknownType: If schema uses an unknown type.
+
+    Returns:
+        Invalid row index and error message or None if all rows are valid.
+    """
+
+    validator_ = validator(schema)
+    if workers <= 1:
+        return _first_error(validator_, 0, rows)
+
+    from concurrent import futures
+
+    with futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=validator, initargs=(schema,)
+    ) as executor:
+        # Bound the number of submitted chunks to keep rows streaming.
+        pending: Deque[Any] = collections.deque()
+        for start, chunk in _chunks(rows, CHUNK_SIZE):
+            pending.append(
+                executor.submit(_validate_chunk, schema, start, chunk)
+            )
+            if len(pending) >= 2 * workers:
+                error: Optional[Tuple[int, str]] = pending.popleft().result()
+                if error is not None:
+                    _cancel(pending)
+                    return error
+
+        while pending:
+            error = pending.popleft().result()
+            if error is not None:
+                _cancel(pending)
+                return error
+
+    return None
+
+
+def _cancel(pending: Iterable[Any]) -> None:
+    """Cancel futures that have not started running."""
+
+    for future in pending:
+        future.cancel()
+
+
+def _chunks(rows: Iterable[Row], size: int) -> Iterator[Tuple[int, List[Row]]]:
+    """Split rows into chunks with their starting row index."""
+
+    iterator = iter(rows)
+    start = 0
+    chunk = list(itertools.islice(iterator, size))
+    while chunk:
+        yield start, chunk
+        start += len(chunk)
+        chunk = list(itertools.islice(iterator, size))
+
+
+def _first_error(
+    validator_: Any, start: int, rows: Iterable[Row]
+) -> Optional[Tuple[int, str]]:
+    """Find first invalid row with a compiled validator."""
+
+    from jsonschema import exceptions
+
+    for idx, row in enumerate(rows, start):
+        try:
+            validator_.validate(row)
+        except exceptions.ValidationError as xcpt:
+            return idx, str(xcpt)
+
+    return None
+
+
+def _validate_chunk(
+    schema: Optional[Schema], start: int, rows: List[Row]
+) -> Optional[Tuple[int, str]]:
+    """Validate chunk of rows in a worker process.
+
+    The worker initializer compiles the validator, so this lookup is a cache
+    hit for every chunk.
+    """
+
+    return _first_error(validator(schema), start, rows)
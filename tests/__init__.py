@@ -2,14 +2,17 @@
 
 
 import pathlib
-from typing import List
+import random
+import stat
+from typing import Iterator, List
 
 import pytest
 import pytest_benchmark.fixture as bm
 import toml
 
 import yamltable
-from yamltable.typing import Row, Schema
+from yamltable import validation
+from yamltable.typing import Nulls, Row, Schema
 
 
 @pytest.mark.unit
@@ -30,6 +33,33 @@ def test_dependencies(benchmark: bm.BenchmarkFixture) -> None:
     assert actual == expected
 
 
+@pytest.mark.unit
+@pytest.mark.parametrize("size", [100, 1000, 10000])
+@pytest.mark.parametrize("density", [1, 4])
+def test_dependencies_scaling(
+    size: int, density: int, benchmark: bm.BenchmarkFixture
+) -> None:
+    """Check that dependencies resolve for large and dense graphs."""
+
+    generator = random.Random(size * density)
+    dicts = [
+        {
+            "name": idx,
+            "depends": generator.sample(range(idx), min(idx, density)),
+        }
+        for idx in range(size)
+    ]
+    generator.shuffle(dicts)
+
+    actual = benchmark(yamltable.dependencies, dicts, "depends", "name")
+
+    positions = {row["name"]: idx for idx, row in enumerate(actual)}
+    assert len(actual) == size
+    for row in actual:
+        for dep in row["depends"]:
+            assert positions[dep] < positions[row["name"]]
+
+
 @pytest.mark.unit
 def test_dependencies_circular_error() -> None:
     """Check that error is raised when a circular dependency is encountered."""
@@ -43,6 +73,56 @@ def test_dependencies_circular_error() -> None:
         yamltable.dependencies(dicts, "depends", "name")
 
 
+@pytest.mark.unit
+def test_dependencies_circular_rows() -> None:
+    """Check that circular dependency errors name the rows in the cycle."""
+
+    dicts = [
+        {"name": "a", "depends": []},
+        {"name": "b", "depends": ["a", "d"]},
+        {"name": "c", "depends": ["b"]},
+        {"name": "d", "depends": ["c"]},
+    ]
+
+    expected = (
+        "encountered circular dependencies: row 1 ('b') -> row 3 ('d') -> "
+        "row 2 ('c') -> row 1 ('b')"
+    )
+    with pytest.raises(ValueError) as error:
+        yamltable.dependencies(dicts, "depends", "name")
+
+    assert str(error.value) == expected
+
+
+@pytest.mark.unit
+def test_dependencies_stable_order() -> None:
+    """Check that rows keep their original order within a dependency level."""
+
+    dicts = [
+        {"name": "d", "depends": ["b", "c"]},
+        {"name": "c", "depends": []},
+        {"name": "b", "depends": ["a"]},
+        {"name": "e", "depends": ["c"]},
+        {"name": "a", "depends": []},
+    ]
+
+    expected = ["c", "a", "b", "e", "d"]
+    actual = [
+        row["name"] for row in yamltable.dependencies(dicts, "depends", "name")
+    ]
+    assert actual == expected
+
+
+@pytest.mark.unit
+def test_dependencies_unknown_error() -> None:
+    """Check that error is raised when a dependency name does not exist."""
+
+    dicts = [{"name": 1, "depends": [2]}]
+
+    with pytest.raises(ValueError, match="unknown name 2"):
+        yamltable.dependencies(dicts, "depends", "name")
+
+
 @pytest.mark.unit
 @pytest.mark.parametrize(
     "file_data",
@@ -140,6 +220,93 @@ def test_sort_list(tmp_path: pathlib.Path) -> None:
     assert actual == expected
 
 
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "keys,nulls,expected",
+    [
+        (["a", "b"], Nulls.LAST, [3, 0, 2, 1, 4]),
+        (["a", "-b"], Nulls.LAST, [3, 2, 0, 1, 4]),
+        (["-a", "b"], Nulls.LAST, [0, 2, 3, 1, 4]),
+        (["a", "b"], Nulls.FIRST, [4, 1, 3, 0, 2]),
+        (["-b"], Nulls.LAST, [2, 0, 3, 1, 4]),
+    ],
+)
+def test_sort_keys(keys: List[str], nulls: Nulls, expected: List[int]) -> None:
+    """Check multi-key sorting with directions and null placement."""
+
+    dicts: List[Row] = [
+        {"id": 0, "a": 1, "b": 2},
+        {"id": 1, "b": 0},
+        {"id": 2, "a": 1, "b": 3},
+        {"id": 3, "a": 0, "b": 2},
+        {"id": 4, "a": None},
+    ]
+
+    actual = yamltable.sort(keys, dicts, nulls)
+    assert [row["id"] for row in actual] == expected
+
+
+@pytest.mark.unit
+def test_sort_descending_stable() -> None:
+    """Check that descending sorts keep the order of equal rows."""
+
+    dicts = [{"key": idx % 3, "id": idx} for idx in range(9)]
+
+    actual = yamltable.sort("-key", dicts)
+    assert [row["id"] for row in actual] == [2, 5, 8, 1, 4, 7, 0, 3, 6]
+
+
+@pytest.mark.unit
+def test_sort_mixed_types() -> None:
+    """Check that incomparable values raise an error naming their types."""
+
+    dicts: List[Row] = [{"key": 1}, {"key": "one"}, {"key": None}]
+
+    with pytest.raises(TypeError, match="'key' .* types: int, str$"):
+        yamltable.sort("key", dicts)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("keys", ["-", []])
+def test_sort_invalid_keys(keys: List[str]) -> None:
+    """Check that empty sort keys are rejected."""
+
+    with pytest.raises(ValueError):
+        yamltable.sort(keys, [{"key": 1}])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("keys", [["a"], ["a", "-b", "c"]])
+def test_sort_scaling(keys: List[str], benchmark: bm.BenchmarkFixture) -> None:
+    """Compare single and multi-key sort times against the legacy sort."""
+
+    generator = random.Random(0)
+    dicts = [
+        {"a": generator.randrange(100), "b": generator.random(), "c": idx}
+        for idx in range(100000)
+    ]
+
+    if len(keys) == 1:
+        expected = sorted(dicts, key=lambda row: row["a"])
+    else:
+        expected = sorted(
+            dicts, key=lambda row: (row["a"], -row["b"], row["c"])
+        )
+
+    actual = benchmark(yamltable.sort, keys, dicts)
+    assert actual == expected
+
+
+@pytest.mark.unit
+def test_sort_scaling_legacy(benchmark: bm.BenchmarkFixture) -> None:
+    """Time the previous single key sort implementation as a baseline."""
+
+    generator = random.Random(0)
+    dicts = [{"a": generator.randrange(100)} for _ in range(100000)]
+
+    benchmark(sorted, dicts, key=lambda row: row["a"])
+
+
 @pytest.mark.unit
 def test_validate_bad_schema(benchmark: bm.BenchmarkFixture) -> None:
     """Check that validation works for unnested list of dictionaries."""
@@ -189,6 +356,110 @@ def test_validate_good_data(
     assert actual == expected
 
 
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_validate_workers(
+    schema: Schema, workers: int, benchmark: bm.BenchmarkFixture
+) -> None:
+    """Check that parallel validation finds the first invalid row."""
+
+    dicts: List[Row] = [
+        {"mock_key_1": idx, "mock_key_2": idx} for idx in range(20_000)
+    ]
+    dicts[12_345]["mock_key_2"] = "invalid"
+    dicts[17_000]["mock_key_1"] = "invalid"
+
+    expected = (False, 12_345, "'invalid' is not of type 'number'")
+    result = benchmark(yamltable.validate, dicts, schema, workers)
+    actual = (result[0], result[1], result[2].split("\n")[0])
+    assert actual == expected
+
+
+@pytest.mark.unit
+def test_validate_all(schema: Schema, benchmark: bm.BenchmarkFixture) -> None:
+    """Check that every invalid row is found."""
+
+    dicts = [
+        {"mock_key_1": 1, "mock_key_2": 5},
+        {"mock_key_1": 2, "mock_key_2": False},
+        {"mock_key_1": 3},
+    ]
+
+    expected = [
+        (1, "False is not of type 'number'"),
+        (2, "'mock_key_2' is a required property"),
+    ]
+    actual = benchmark(yamltable.validate_all, dicts, schema)
+    assert actual == expected
+
+
+@pytest.mark.unit
+def test_validate_all_bad_schema() -> None:
+    """Check that an invalid schema is reported with row index -1."""
+
+    result = yamltable.validate_all([{}], {"type": "data"})
+
+    assert len(result) == 1
+    assert result[0][0] == -1
+
+
+@pytest.mark.unit
+def test_validator_cache(schema: Schema) -> None:
+    """Check that validators are reused for equal schemas."""
+
+    copy = dict(reversed(list(schema.items())))
+
+    assert validation.validator(schema) is validation.validator(copy)
+    assert validation.validator(schema) is not validation.validator({})
+
+
+@pytest.mark.integration
+def test_write_generator(tmp_path: pathlib.Path) -> None:
+    """Check that rows are written from a generator like from a list."""
+
+    rows: List[Row] = [{"foo": idx, "bar": "ü" * idx} for idx in range(5)]
+    list_path = tmp_path / "list.yaml"
+    generator_path = tmp_path / "generator.yaml"
+
+    yamltable.write(list_path, rows, {"type": "object"})
+    yamltable.write(generator_path, iter(rows), {"type": "object"})
+
+    assert generator_path.read_bytes() == list_path.read_bytes()
+    assert yamltable.read(generator_path) == (rows, {"type": "object"})
+
+
+@pytest.mark.integration
+def test_write_failure(tmp_path: pathlib.Path) -> None:
+    """Check that a failed write leaves the original file intact."""
+
+    def rows() -> Iterator[Row]:
+        yield {"foo": 2}
+        raise RuntimeError("interrupted")
+
+    yaml_file = tmp_path / "file.yaml"
+    yaml_file.write_text("- foo: 1\n")
+
+    with pytest.raises(RuntimeError):
+        yamltable.write(yaml_file, rows())
+
+    assert yaml_file.read_text() == "- foo: 1\n"
+    assert list(tmp_path.iterdir()) == [yaml_file]
+
+
+@pytest.mark.integration
+def test_write_permissions(tmp_path: pathlib.Path) -> None:
+    """Check that overwriting a file keeps its permissions."""
+
+    yaml_file = tmp_path / "file.yaml"
+    yaml_file.write_text("[]\n")
+    yaml_file.chmod(0o640)
+
+    yamltable.write(yaml_file, [{"foo": 1}])
+
+    assert stat.S_IMODE(yaml_file.stat().st_mode) == 0o640
+    assert yaml_file.read_text() == "- foo: 1\n"
+
+
 @pytest.mark.unit
 def test_yamltable_version() -> None:
     """Check that all the version tags are in sync."""
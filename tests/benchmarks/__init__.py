@@ -0,0 +1,10 @@
+r"""Benchmark suite for YamlTable on generated tables.
+
+Benchmarks run at the row counts given by the --benchmark-rows option, which
+defaults to 1000 rows, and record the peak memory of each operation next to
+its timings. Save a baseline and gate regressions against it with:
+
+    pytest tests/benchmarks --benchmark-autosave
+    pytest tests/benchmarks --benchmark-compare \
+        --benchmark-compare-fail=mean:10% --benchmark-memory-fail=10
+"""
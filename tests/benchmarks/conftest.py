@@ -0,0 +1,94 @@
+"""Fixtures for benchmarks on generated tables."""
+
+
+import functools
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+import pytest
+import pytest_benchmark.fixture as bm
+from tests.benchmarks import generate
+
+from yamltable.typing import Row, Schema
+
+
+Measure = Callable[..., Any]
+
+
+def pytest_generate_tests(metafunc: Any) -> None:
+    """Parametrize row counts from the --benchmark-rows option."""
+
+    if "size" in metafunc.fixturenames:
+        option = metafunc.config.getoption("benchmark_rows")
+        sizes = [int(size) for size in option.split(",")]
+        metafunc.parametrize("size", sizes, ids=[f"{s}rows" for s in sizes])
+
+
+@pytest.fixture
+def measure(request: Any, benchmark: bm.BenchmarkFixture) -> Measure:
+    """Benchmark a function and record its peak memory.
+
+    Peak memory is traced in a separate call before the timed rounds, since
+    tracing slows allocations. It is saved in the extra info of the benchmark
+    and compared against the run given by --benchmark-compare if the
+    --benchmark-memory-fail option is set.
+
+    Return:
+        Function that takes a function and its arguments.
+    """
+
+    def measure_(function: Callable[..., Any], *args: Any) -> Any:
+        if benchmark.disabled:
+            return benchmark(function, *args)
+
+        tracemalloc.start()
+        try:
+            function(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_memory"] = peak
+
+        result = benchmark(function, *args)
+        _check_memory(request, peak)
+        return result
+
+    return measure_
+
+
+@pytest.fixture
+def table(size: int) -> Tuple[List[Row], Schema]:
+    """Generated table with a simple schema.
+
+    Tables are shared between benchmarks and must not be modified.
+
+    Return:
+        Rows, JSON schema.
+    """
+
+    return _table(size)
+
+
+def _check_memory(request: Any, peak: int) -> None:
+    """Fail benchmark if peak memory regressed against the compared run."""
+
+    percent = request.config.getoption("benchmark_memory_fail")
+    if percent is None:
+        return
+
+    session = request.config._benchmarksession
+    for mapping in (session.compared_mapping or {}).values():
+        compared = mapping.get(request.node.nodeid, {})
+        baseline = compared.get("extra_info", {}).get("peak_memory")
+        if baseline and peak > baseline * (1 + percent / 100):
+            pytest.fail(
+                f"Peak memory regressed from {baseline} to {peak} bytes, "
+                f"more than {percent:g}%"
+            )
+
+
+@functools.lru_cache(maxsize=None)
+def _table(size: int) -> Tuple[List[Row], Schema]:
+    """Generate table once for each row count."""
+
+    return generate.table(size)
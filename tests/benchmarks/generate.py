@@ -0,0 +1,174 @@
+"""Seeded generators of synthetic tables."""
+
+
+import enum
+import random
+from typing import Any, Dict, List, Tuple
+
+from yamltable.typing import Row, Schema
+
+
+class Complexity(enum.Enum):
+    """Schema complexity.
+
+    Simple schemas only use keywords with generated validators, while complex
+    schemas also use keywords that are checked by jsonschema.
+    """
+
+    COMPLEX = "complex"
+    SIMPLE = "simple"
+
+
+# Value types of generated columns in rotation.
+TYPES = ["integer", "number", "string", "boolean", "array", "null"]
+
+
+def graph(count: int, density: int, seed: int = 0) -> List[Row]:
+    """Generate rows that depend on earlier rows in a shuffled order.
+
+    Args:
+        count: Number of rows.
+        density: Maximum number of dependencies of each row.
+        seed: Random number generator seed.
+
+    Returns:
+        Rows with name and depends keys.
+    """
+
+    generator = random.Random(seed)
+    rows: List[Row] = [
+        {
+            "name": idx,
+            "depends": generator.sample(range(idx), min(idx, density)),
+        }
+        for idx in range(count)
+    ]
+    generator.shuffle(rows)
+    return rows
+
+
+def rows(
+    count: int, columns: int = 8, depth: int = 1, seed: int = 0
+) -> List[Row]:
+    """Generate rows with columns of every value type.
+
+    Args:
+        count: Number of rows.
+        columns: Number of columns, including the id and name columns.
+        depth: Nesting depth of the nested column, or 1 for flat rows.
+        seed: Random number generator seed.
+
+    Returns:
+        Rows that are valid against the schema of the same shape.
+    """
+
+    generator = random.Random(seed)
+    return [_row(generator, idx, columns, depth) for idx in range(count)]
+
+
+def schema(
+    columns: int = 8,
+    depth: int = 1,
+    complexity: Complexity = Complexity.SIMPLE,
+) -> Schema:
+    """Generate JSON schema for rows of a shape.
+
+    Args:
+        columns: Number of columns, including the id and name columns.
+        depth: Nesting depth of the nested column, or 1 for flat rows.
+        complexity: Schema complexity.
+
+    Returns:
+        JSON schema dictionary.
+    """
+
+    complex_ = complexity == Complexity.COMPLEX
+    properties: Dict[str, Any] = {
+        "id": {"type": "integer", **({"minimum": 0} if complex_ else {})},
+        "name": {"type": "string", "pattern": "^row-[0-9]+$"},
+    }
+    for column in range(2, columns):
+        type_ = TYPES[column % len(TYPES)]
+        types = [type_] if type_ == "null" else [type_, "null"]
+        properties[f"col{column}"] = {"type": types}
+        if complex_ and type_ == "string":
+            properties[f"col{column}"]["maxLength"] = 16
+        elif complex_ and type_ == "array":
+            properties[f"col{column}"]["items"] = {"type": "integer"}
+    if depth > 1:
+        properties["nested"] = _nested_schema(depth - 1)
+
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": ["id", "name"],
+        "additionalProperties": False,
+    }
+
+
+def table(
+    count: int,
+    columns: int = 8,
+    depth: int = 1,
+    complexity: Complexity = Complexity.SIMPLE,
+    seed: int = 0,
+) -> Tuple[List[Row], Schema]:
+    """Generate rows and their JSON schema.
+
+    Args:
+        count: Number of rows.
+        columns: Number of columns, including the id and name columns.
+        depth: Nesting depth of the nested column, or 1 for flat rows.
+        complexity: Schema complexity.
+        seed: Random number generator seed.
+
+    Returns:
+        Rows, JSON schema.
+    """
+
+    return rows(count, columns, depth, seed), schema(columns, depth, complexity)
+
+
+def _nested(depth: int, value: int) -> Any:
+    """Generate nested dictionaries around a value."""
+
+    if not depth:
+        return value
+    return {"level": depth, "child": _nested(depth - 1, value)}
+
+
+def _nested_schema(depth: int) -> Schema:
+    """Generate schema of nested dictionaries around an integer."""
+
+    if not depth:
+        return {"type": "integer"}
+    return {
+        "type": "object",
+        "properties": {
+            "level": {"type": "integer"},
+            "child": _nested_schema(depth - 1),
+        },
+    }
+
+
+def _row(generator: random.Random, idx: int, columns: int, depth: int) -> Row:
+    """Generate row with random values."""
+
+    row: Row = {"id": idx, "name": f"row-{idx}"}
+    for column in range(2, columns):
+        type_ = TYPES[column % len(TYPES)]
+        value: Any = None
+        if type_ == "integer":
+            value = generator.randrange(1000)
+        elif type_ == "number":
+            value = round(generator.random(), 6)
+        elif type_ == "string":
+            value = f"v{generator.randrange(100)}"
+        elif type_ == "boolean":
+            value = generator.random() < 0.5
+        elif type_ == "array":
+            value = [generator.randrange(10) for _ in range(3)]
+        row[f"col{column}"] = value
+    if depth > 1:
+        row["nested"] = _nested(depth - 1, idx)
+    return row
@@ -0,0 +1,43 @@
+"""Tests for synthetic table generators."""
+
+
+import pytest
+from tests.benchmarks import generate
+
+import yamltable
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("columns", [2, 8, 20])
+@pytest.mark.parametrize("depth", [1, 4])
+@pytest.mark.parametrize("complexity", list(generate.Complexity))
+def test_table_valid(
+    columns: int, depth: int, complexity: generate.Complexity
+) -> None:
+    """Check that generated rows are valid against their schema."""
+
+    rows, schema = generate.table(50, columns, depth, complexity)
+
+    assert yamltable.validate_all(rows, schema) == []
+    assert all(len(row) == columns + (depth > 1) for row in rows)
+
+
+@pytest.mark.unit
+def test_table_seed() -> None:
+    """Check that tables are reproducible from their seed."""
+
+    assert generate.rows(20, seed=1) == generate.rows(20, seed=1)
+    assert generate.rows(20, seed=1) != generate.rows(20, seed=2)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("density", [0, 3])
+def test_graph(density: int) -> None:
+    """Check that rows only depend on a bounded number of earlier rows."""
+
+    rows = generate.graph(100, density)
+
+    assert sorted(row["name"] for row in rows) == list(range(100))
+    for row in rows:
+        assert len(row["depends"]) == min(row["name"], density)
+        assert all(dep < row["name"] for dep in row["depends"])
@@ -0,0 +1,154 @@
+"""Benchmarks of table operations at production scale."""
+
+
+import pathlib
+import subprocess  # nosec
+import sys
+from typing import Any, Callable, List, Tuple
+
+import pytest
+import pytest_benchmark.fixture as bm
+from tests.benchmarks import generate
+
+import yamltable
+from yamltable import graph
+from yamltable.typing import FileFormat, Row, Schema
+
+
+Measure = Callable[..., Any]
+Table = Tuple[List[Row], Schema]
+
+# Calls at a million rows take seconds, so rounds are bounded by time alone.
+pytestmark = pytest.mark.benchmark(min_rounds=1, warmup=False)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("density", [1, 4])
+def test_dependencies(size: int, density: int, measure: Measure) -> None:
+    """Benchmark dependency resolution of generated graphs."""
+
+    rows = generate.graph(size, density, seed=size)
+
+    actual = measure(yamltable.dependencies, rows, "depends", "name")
+
+    assert len(actual) == size
+
+
+@pytest.mark.unit
+def test_dependencies_incremental(size: int, measure: Measure) -> None:
+    """Benchmark adding and removing a row of a maintained graph."""
+
+    rows = generate.graph(size, 4, seed=size)
+    graph_ = graph.Graph.build(rows, "depends", "name")
+    row = {"name": -1, "depends": [0, size - 1]}
+
+    def change() -> List[Any]:
+        graph_.update([row])
+        graph_.update([], [-1])
+        return graph_.order()
+
+    assert len(measure(change)) == size
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("format_", [FileFormat.YAML, FileFormat.JSONL])
+def test_read(
+    tmp_path: pathlib.Path,
+    table: Table,
+    format_: FileFormat,
+    measure: Measure,
+) -> None:
+    """Benchmark reading table files."""
+
+    file_path = tmp_path / f"table.{format_.value}"
+    yamltable.write(file_path, *table)
+
+    actual = measure(yamltable.read, file_path)
+
+    assert actual == table
+
+
+@pytest.mark.unit
+def test_search(table: Table, measure: Measure) -> None:
+    """Benchmark searching rows for a value."""
+
+    rows, _ = table
+
+    actual = measure(yamltable.search, "col2", "v0", rows)
+
+    assert all(row["col2"] == "v0" for row in actual)
+
+
+@pytest.mark.integration
+def test_search_where(
+    tmp_path: pathlib.Path, table: Table, measure: Measure
+) -> None:
+    """Benchmark streaming a query over a table file."""
+
+    file_path = tmp_path / "table.yaml"
+    yamltable.write(file_path, *table)
+    query = yamltable.Query("col6 < 100 and col3 == true")
+
+    def search() -> List[Row]:
+        return list(yamltable.iter_rows(file_path, where=query)[0])
+
+    actual = measure(search)
+
+    assert all(row["col6"] < 100 and row["col3"] for row in actual)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("keys", [["id"], ["col2", "-col7"]])
+def test_sort(table: Table, keys: List[str], measure: Measure) -> None:
+    """Benchmark single and multi-key sorts."""
+
+    rows, _ = table
+
+    actual = measure(yamltable.sort, keys, rows)
+
+    assert len(actual) == len(rows)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("complexity", list(generate.Complexity))
+def test_validate(
+    table: Table, complexity: generate.Complexity, measure: Measure
+) -> None:
+    """Benchmark validation against simple and complex schemas."""
+
+    rows, _ = table
+    schema = generate.schema(complexity=complexity)
+
+    actual = measure(yamltable.validate, rows, schema)
+
+    assert actual == (True, -1, "")
+
+
+@pytest.mark.functional
+def test_version(benchmark: bm.BenchmarkFixture) -> None:
+    """Benchmark command line startup, which is dominated by imports."""
+
+    command = [sys.executable, "-m", "yamltable", "version"]
+
+    actual = benchmark(
+        subprocess.run, command, stdout=subprocess.DEVNULL, check=True  # nosec
+    )
+
+    assert actual.returncode == 0
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("format_", [FileFormat.YAML, FileFormat.JSONL])
+def test_write(
+    tmp_path: pathlib.Path,
+    table: Table,
+    format_: FileFormat,
+    measure: Measure,
+) -> None:
+    """Benchmark writing table files."""
+
+    file_path = tmp_path / f"table.{format_.value}"
+
+    measure(yamltable.write, file_path, *table)
+
+    assert file_path.stat().st_size > 0
@@ -2,6 +2,7 @@
 
 
 import pathlib
+from typing import Any
 from unittest.mock import MagicMock
 
 import pytest
@@ -11,6 +12,37 @@ import yamltable.__main__ as main
 from yamltable.typing import Schema
 
 
+def pytest_addoption(parser: Any) -> None:
+    """Add benchmark suite command line options."""
+
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark-rows",
+        default="1000",
+        help="Comma separated row counts of generated benchmark tables.",
+    )
+    group.addoption(
+        "--benchmark-memory-fail",
+        default=None,
+        metavar="PERCENT",
+        type=float,
+        help=(
+            "Fail benchmarks whose peak memory exceeds the compared run by "
+            "more than PERCENT."
+        ),
+    )
+
+
+def pytest_configure(config: Any) -> None:
+    """Check that memory regressions are compared against a saved run."""
+
+    memory_fail = config.getoption("benchmark_memory_fail")
+    if memory_fail is not None and not config.getoption("benchmark_compare"):
+        raise pytest.UsageError(
+            "--benchmark-memory-fail requires --benchmark-compare."
+        )
+
+
 @pytest.fixture
 def console(mocker: MockFixture) -> MagicMock:
     """Replaces Rich console in CLI with a magic mock.
@@ -19,8 +51,9 @@ def console(mocker: MockFixture) -> MagicMock:
         Magic mock instance.
     """
 
-    main.console = MagicMock()
-    return main.console
+    console_ = MagicMock()
+    main.console = console_
+    return console_
 
 
 @pytest.fixture(scope="module")
@@ -1,19 +1,143 @@
 """Integration tests for YamlTable's command line interface."""
 
 
+import io
+import json
 import pathlib
 import pprint
+import re
+import subprocess  # nosec
+import sys
+from typing import Any, Dict, List, Set
 from unittest.mock import call, MagicMock
 
 import pytest
+from pytest_mock import MockFixture
+from rich.console import Console
 from typer import testing
 import yaml
 
 import yamltable
 import yamltable.__main__ as main
+import yamltable.output
 from yamltable.typing import ExitCode
 
 
+# Modules that commands import on first use, since they are slow to import.
+LAZY_MODULES = [
+    "asyncio",
+    "cProfile",
+    "concurrent.futures",
+    "jsonschema",
+    "msgpack",
+    "rich",
+    "yamltable.codegen",
+    "yamltable.profiling",
+    "yamltable.server",
+]
+NAMES = [
+    "repo",
+    "ssh",
+    "bash-profile",
+    "system",
+    "bash-key",
+    "drive",
+    "vscode-settings",
+    "vscode-keybindings",
+    "vscode-snippets",
+]
+
+
+@pytest.mark.functional
+@pytest.mark.parametrize("backend_", ["auto", "python"])
+def test_backend(backend_: str) -> None:
+    """Ensure commands run with every available YAML backend."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["--backend", backend_, "validate", "tests/data/path.yaml"]
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+
+
+@pytest.mark.functional
+def test_backend_error(mocker: MockFixture) -> None:
+    """Ensure error exit code when the C backend is unavailable."""
+
+    mocker.patch.object(yamltable.backend, "LIBYAML", False)
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["--backend", "c", "validate", "tests/data/path.yaml"]
+    )
+
+    assert result.exit_code == ExitCode.ERROR.value
+
+
+@pytest.mark.functional
+def test_batch(tmp_yaml: pathlib.Path, mocker: MockFixture) -> None:
+    """Ensure batch command parses the file once for every command."""
+
+    mocker.patch.object(main, "console", None)
+    spy = mocker.spy(yamltable, "read")
+    script = (
+        "list name\n"
+        "# comment\n"
+        "\n"
+        "search name bash-profile\n"
+        "index -- -1\n"
+        "validate\n"
+    )
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["batch", "--separator", "===", str(tmp_yaml)], input=script
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert spy.call_count == 1
+    outputs = result.stdout.split("===\n")
+    assert len(outputs) == 5 and outputs[-1] == ""
+    assert outputs[0].splitlines()[2] == "bash-profile"
+    assert "'dest': '$HOME/.bash_profile'" in outputs[1]
+    assert "vscode-snippets" in outputs[2]
+    assert "conform" in outputs[3]
+    assert not main.state["loaded"]
+
+
+@pytest.mark.functional
+def test_batch_json_lines(
+    tmp_path: pathlib.Path, mocker: MockFixture
+) -> None:
+    """Ensure batch command reports every result and the worst exit code."""
+
+    mocker.patch.object(main, "console", None)
+    file_path = tmp_path / "file.yaml"
+    yamltable.write(file_path, [{"name": "a"}, {"name": "b", "id": 1}])
+    script = tmp_path / "script.txt"
+    script.write_text("list id\nsort name\nsearch 'name\nlist name\n")
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app,
+        ["batch", "--json-lines", "--script", str(script), str(file_path)],
+    )
+    results = [json.loads(line) for line in result.stdout.splitlines()]
+
+    assert result.exit_code == ExitCode.ERROR.value
+    assert [elem["exit_code"] for elem in results] == [
+        ExitCode.ERROR.value,
+        ExitCode.ERROR.value,
+        ExitCode.ERROR.value,
+        ExitCode.SUCCESS.value,
+    ]
+    assert results[0]["command"] == "list id"
+    assert "unsupported command 'sort'" in results[1]["stderr"]
+    assert results[3]["stdout"] == "a\nb\n"
+    assert file_path.read_text() == "- name: a\n- name: b\n  id: 1\n"
+
+
 @pytest.mark.functional
 def test_index(console: MagicMock) -> None:
     """Ensure correct stdout for index command."""
@@ -36,6 +160,21 @@ def test_index(console: MagicMock) -> None:
     console.print.assert_called_once_with(expected)
 
 
+@pytest.mark.functional
+def test_index_negative(console: MagicMock) -> None:
+    """Ensure index command counts negative indices from the last row."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["index", "--", "-1", "tests/data/path.yaml"]
+    )
+
+    args, _ = console.print.call_args
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert "'name': 'vscode-snippets'" in args[0]
+
+
 @pytest.mark.functional
 def test_index_error() -> None:
     """Ensure correct exit code for erroneous index command invocation."""
@@ -59,29 +198,75 @@ def test_load_data_error() -> None:
 
 
 @pytest.mark.functional
-def test_list(console: MagicMock) -> None:
-    """Ensure correct stdout for list command."""
+def test_list(console: MagicMock, mocker: MockFixture) -> None:
+    """Ensure list command prints with Rich on a terminal."""
+
+    mocker.patch.object(yamltable.output, "is_terminal", return_value=True)
 
     runner = testing.CliRunner()
     result = runner.invoke(main.app, ["list", "name", "tests/data/path.yaml"])
 
-    expected = [
-        call("repo"),
-        call("ssh"),
-        call("bash-profile"),
-        call("system"),
-        call("bash-key"),
-        call("drive"),
-        call("vscode-settings"),
-        call("vscode-keybindings"),
-        call("vscode-snippets"),
-    ]
+    expected = [call(name, markup=False, emoji=False) for name in NAMES]
 
     assert result.exit_code == ExitCode.SUCCESS.value
 
     console.print.assert_has_calls(expected)
 
 
+@pytest.mark.functional
+@pytest.mark.parametrize(
+    "command", [["list", "name"], ["search", "--where", "exists name"]]
+)
+def test_pretty_markup(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mocker: MockFixture,
+    command: List[str],
+) -> None:
+    """Ensure values that look like Rich markup are printed unchanged."""
+
+    file_path = tmp_path / "path.yaml"
+    yamltable.write(file_path, [{"name": "[red]x[/]"}, {"name": "[/] :smile:"}])
+    mocker.patch.object(yamltable.output, "is_terminal", return_value=True)
+    handle = io.StringIO()
+    monkeypatch.setattr(main, "console", Console(file=handle, width=80))
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, [*command, str(file_path)])
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert "[red]x[/]" in handle.getvalue()
+    assert "[/] :smile:" in handle.getvalue()
+
+
+@pytest.mark.functional
+@pytest.mark.parametrize(
+    "format_,expected",
+    [
+        ("pretty", "\n".join(NAMES) + "\n"),
+        ("plain", "\n".join(NAMES) + "\n"),
+        ("json", json.dumps(NAMES, indent=0) + "\n"),
+        ("jsonl", "".join(f'"{name}"\n' for name in NAMES)),
+        ("csv", "name\n" + "\n".join(NAMES) + "\n"),
+        ("tsv", "name\n" + "\n".join(NAMES) + "\n"),
+    ],
+)
+def test_list_format(
+    console: MagicMock, format_: str, expected: str
+) -> None:
+    """Ensure list command writes every format without Rich to a pipe."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app,
+        ["list", "--format", format_, "name", "tests/data/path.yaml"],
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert result.stdout == expected
+    console.print.assert_not_called()
+
+
 @pytest.mark.functional
 def test_list_error() -> None:
     """Ensure correct exit code for erroneous list command invocation."""
@@ -119,6 +304,36 @@ def test_search() -> None:
     assert actual == expected
 
 
+@pytest.mark.functional
+@pytest.mark.parametrize("format_", ["json", "jsonl", "csv", "tsv"])
+def test_search_format(tmp_yaml: pathlib.Path, format_: str) -> None:
+    """Ensure search command writes machine readable formats."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app,
+        [
+            "search",
+            *["--format", format_, "--where", "type == file"],
+            str(tmp_yaml),
+        ],
+    )
+
+    rows, _ = yamltable.read(tmp_yaml)
+    rows = [row for row in rows if row["type"] == "file"]
+    lines = result.stdout.splitlines()
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    if format_ == "json":
+        assert json.loads(result.stdout) == rows
+    elif format_ == "jsonl":
+        assert [json.loads(line) for line in lines] == rows
+    else:
+        delimiter = "," if format_ == "csv" else "\t"
+        assert lines[0].split(delimiter) == list(rows[0])
+        assert len(lines) == len(rows) + 1
+
+
 @pytest.mark.functional
 def test_search_empty() -> None:
     """Ensure correct stdout for search command with no results."""
@@ -155,6 +370,65 @@ def test_sort(tmp_path: pathlib.Path) -> None:
     assert actual == expected
 
 
+@pytest.mark.functional
+def test_sort_keys(tmp_path: pathlib.Path) -> None:
+    """Ensure sort command orders rows by several keys and directions."""
+
+    data = [{"a": 1, "b": 1}, {"b": 3}, {"a": 1, "b": 2}, {"a": 0, "b": 0}]
+    file_path = tmp_path / "path.yaml"
+    with file_path.open("w") as handle:
+        yaml.dump(data, handle)
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app,
+        ["sort", "--key", "a", "-k", "-b", "--nulls", "first", str(file_path)],
+    )
+
+    expected = [data[1], data[3], data[2], data[0]]
+    with file_path.open("r") as handle:
+        actual = yaml.safe_load(handle)
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert actual == expected
+
+
+@pytest.mark.functional
+def test_sort_values(tmp_path: pathlib.Path) -> None:
+    """Ensure sort command writes back row values and key orders unchanged."""
+
+    data: List[Dict[str, Any]] = [
+        {"id": 2, "tags": ["a"], "ok": True, "ratio": 0.5},
+        {"ok": None, "id": 1, "name": "b"},
+        {"id": 2 ** 70, "name": "a", "ok": False},
+    ]
+    file_path = tmp_path / "path.yaml"
+    with file_path.open("w") as handle:
+        yaml.dump(data, handle, sort_keys=False)
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, ["sort", "id", str(file_path)])
+
+    with file_path.open("r") as handle:
+        actual = yaml.safe_load(handle)
+
+    expected = [data[1], data[0], data[2]]
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert actual == expected
+    assert [list(row) for row in actual] == [list(row) for row in expected]
+
+
+@pytest.mark.functional
+@pytest.mark.parametrize("arguments", [[], ["-k", "name", "name"]])
+def test_sort_arguments(tmp_yaml: pathlib.Path, arguments: List[str]) -> None:
+    """Ensure sort command requires exactly one source of keys."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, ["sort", *arguments, str(tmp_yaml)])
+
+    assert result.exit_code == ExitCode.ERROR.value
+
+
 @pytest.mark.functional
 def test_sort_error(tmp_yaml: pathlib.Path) -> None:
     """Ensure correct exit code for erroneous search command invocation."""
@@ -175,6 +449,56 @@ def test_validate() -> None:
     assert result.exit_code == ExitCode.SUCCESS.value
 
 
+@pytest.mark.functional
+@pytest.mark.parametrize(
+    "max_errors,expected,truncated",
+    [
+        ([], [1, 2], False),
+        (["--max-errors", "1"], [1], True),
+        (["--max-errors", "2"], [1, 2], False),
+    ],
+)
+def test_validate_all_errors(
+    tmp_path: pathlib.Path,
+    max_errors: List[str],
+    expected: List[int],
+    truncated: bool,
+) -> None:
+    """Ensure JSON report of every invalid row."""
+
+    file_path = tmp_path / "file.yaml"
+    file_path.write_text(
+        "schema:\n  properties:\n    foo:\n      type: number\n"
+        "rows:\n- foo: 1\n- foo: a\n- foo: b\n"
+    )
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["validate", "--all-errors", *max_errors, str(file_path)]
+    )
+    report = json.loads(result.stdout)
+
+    assert result.exit_code == ExitCode.INVALID.value
+    assert not report["valid"]
+    assert [error["row"] for error in report["errors"]] == expected
+    assert report["truncated"] == truncated
+
+
+@pytest.mark.functional
+def test_validate_all_errors_schema() -> None:
+    """Ensure JSON report of an invalid schema."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["validate", "--all-errors", "tests/data/bad_schema.yaml"]
+    )
+    report = json.loads(result.stdout)
+
+    assert result.exit_code == ExitCode.ERROR.value
+    assert report["schema_error"] is not None
+    assert report["errors"] == []
+
+
 @pytest.mark.functional
 def test_validate_bad_schema() -> None:
     """Ensure correct exit code for validating bad schemas."""
@@ -209,3 +533,31 @@ def test_version() -> None:
 
     assert result.exit_code == ExitCode.SUCCESS.value
     assert actual == expected
+
+
+def imported_modules(arguments: List[str]) -> Set[str]:
+    """Run command in a new interpreter and collect imported module names.
+
+    Return:
+        Names of every module imported by the command.
+    """
+
+    process = subprocess.run(  # nosec
+        [sys.executable, "-X", "importtime", "-m", "yamltable", *arguments],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    pattern = re.compile(r"^import time:\s+\d+ \|\s+\d+ \| +(\S+)$", re.M)
+    return set(pattern.findall(process.stderr))
+
+
+@pytest.mark.functional
+def test_version_imports() -> None:
+    """Ensure version command starts without importing heavy dependencies."""
+
+    modules = imported_modules(["version"])
+
+    assert "yamltable" in modules
+    assert sorted(modules.intersection(LAZY_MODULES)) == []
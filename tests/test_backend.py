@@ -0,0 +1,117 @@
+"""Tests for YAML backend selection."""
+
+
+import pathlib
+from typing import Any, List
+
+import pytest
+import pytest_benchmark.fixture as bm
+from pytest_mock import MockFixture
+import yaml
+
+import yamltable
+from yamltable import backend
+from yamltable.typing import Backend, Row
+
+
+libyaml = pytest.mark.skipif(
+    not backend.LIBYAML, reason="PyYAML was not built with libyaml."
+)
+
+
+@pytest.fixture(scope="module")
+def large_yaml(tmp_path_factory: pytest.TempPathFactory) -> pathlib.Path:
+    """Generate a schema organized YAML file with 100,000 rows."""
+
+    rows = [
+        {
+            "name": f"package-{idx}",
+            "description": f"generated package number {idx}",
+            "version": idx % 97,
+            "website": f"https://example.com/{idx}",
+        }
+        for idx in range(100_000)
+    ]
+
+    file_path = tmp_path_factory.mktemp("backend") / "large.yaml"
+    yamltable.write(file_path, rows, {"type": "object"})
+    return file_path
+
+
+@pytest.mark.unit
+@pytest.mark.benchmark(min_rounds=1, max_time=0, warmup=False)
+@pytest.mark.parametrize("backend_", [Backend.C, Backend.PYTHON])
+def test_read_benchmark(
+    backend_: Backend,
+    request: pytest.FixtureRequest,
+    benchmark: bm.BenchmarkFixture,
+) -> None:
+    """Record read time for each backend on a large file."""
+
+    # Check skip conditions first to avoid generating the large file.
+    if benchmark.disabled:
+        pytest.skip("Benchmarks are disabled.")
+    elif backend_ == Backend.C and not backend.LIBYAML:
+        pytest.skip("PyYAML was not built with libyaml.")
+
+    large_yaml = request.getfixturevalue("large_yaml")
+
+    rows, _ = benchmark(yamltable.read, large_yaml, backend_)
+    assert len(rows) == 100_000
+
+
+@libyaml
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "data,expected",
+    [
+        ([{"name": "ascii", "value": 1.5}], yaml.CSafeDumper),
+        ([{"name": "café"}], yaml.SafeDumper),
+        ([{"name": "line\nbreak"}], yaml.SafeDumper),
+        ([{"name": b"bytes"}], yaml.SafeDumper),
+    ],
+)
+def test_dumper(data: Any, expected: Any) -> None:
+    """Check that the C dumper is only used for identically emitted data."""
+
+    actual = backend.dumper(data, Backend.C)
+    assert actual == expected
+
+
+@pytest.mark.unit
+def test_unavailable(mocker: MockFixture) -> None:
+    """Check fallback and errors when libyaml is unavailable."""
+
+    mocker.patch.object(backend, "LIBYAML", False)
+
+    assert isinstance(backend.loader("- a: 1", Backend.AUTO), yaml.SafeLoader)
+    assert backend.dumper([], Backend.AUTO) == yaml.SafeDumper
+    with pytest.raises(ValueError):
+        backend.loader("- a: 1", Backend.C)
+
+
+@libyaml
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "rows",
+    [
+        [{"name": "plain", "size": 3, "tags": ["a", "b"], "empty": None}],
+        [{"text": "long text " * 20, "quote": "it's \"quoted\": yes"}],
+        [{"text": "café 漢字 " * 20, "lines": "a \nb\n\tc " * 20}],
+        [{"nested": {"deep": [{"key": "\x85 " * 30}]}}, {}],
+    ],
+)
+def test_write_identical(tmp_path: pathlib.Path, rows: List[Row]) -> None:
+    """Check that every backend writes and reads identical data."""
+
+    c_path = tmp_path / "c.yaml"
+    py_path = tmp_path / "python.yaml"
+    schema = {"type": "object", "description": "café " * 30}
+    yamltable.write(c_path, rows, schema, backend=Backend.C)
+    yamltable.write(py_path, rows, schema, backend=Backend.PYTHON)
+
+    assert c_path.read_bytes() == py_path.read_bytes()
+    assert yamltable.read(c_path, Backend.C) == yamltable.read(
+        py_path, Backend.PYTHON
+    )
+    assert yamltable.read(c_path, Backend.C) == (rows, schema)
@@ -0,0 +1,158 @@
+"""Tests for commands over many files."""
+
+
+import pathlib
+import time
+from typing import List
+
+import pytest
+from pytest_mock import MockFixture
+from typer import testing
+import yaml
+
+from yamltable import bulk
+import yamltable.__main__ as main
+from yamltable.typing import ExitCode
+
+
+@pytest.fixture
+def tables(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Directory of valid tables and one invalid table."""
+
+    text = pathlib.Path("tests/data/path.yaml").read_text()
+    (tmp_path / "sub").mkdir()
+    for name in ["a.yaml", "sub/c.yaml", "sub/d.yaml"]:
+        (tmp_path / name).write_text(text)
+
+    invalid = pathlib.Path("tests/data/invalid_row.yaml").read_text()
+    (tmp_path / "sub" / "b.yaml").write_text(invalid)
+    return tmp_path
+
+
+def slow_echo(item: int) -> bulk.Result:
+    """Return item after a delay that is shorter for later items."""
+
+    time.sleep(0.05 * (4 - item))
+    return item, str(item), ""
+
+
+@pytest.mark.unit
+def test_expand(tables: pathlib.Path) -> None:
+    """Check that patterns expand to sorted and unique file paths."""
+
+    paths = bulk.expand(
+        [str(tables / "sub" / "c.yaml"), str(tables / "**" / "*.yaml")]
+    )
+
+    names = [path.relative_to(tables).as_posix() for path in paths]
+    assert names == ["sub/c.yaml", "a.yaml", "sub/b.yaml", "sub/d.yaml"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("pattern", ["missing.yaml", "*.yml", "sub"])
+def test_expand_missing(tables: pathlib.Path, pattern: str) -> None:
+    """Check that missing files and empty patterns are errors."""
+
+    with pytest.raises(FileNotFoundError):
+        bulk.expand([str(tables / pattern)])
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("workers", [1, 4])
+def test_run_order(workers: int) -> None:
+    """Check that results keep item order whatever order workers finish."""
+
+    results = bulk.run(slow_echo, [0, 1, 2, 3], workers)
+
+    assert [code for code, _, _ in results] == [0, 1, 2, 3]
+
+
+@pytest.mark.functional
+@pytest.mark.parametrize("jobs", ["1", "3"])
+def test_validate(
+    tables: pathlib.Path, mocker: MockFixture, jobs: str
+) -> None:
+    """Ensure validate command reports every file and the worst exit code."""
+
+    mocker.patch.object(main, "console", None)
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["validate", "--jobs", jobs, str(tables / "**" / "*.yaml")]
+    )
+
+    headers = [
+        line for line in result.output.splitlines() if line.startswith("==>")
+    ]
+    assert result.exit_code == ExitCode.INVALID.value
+    assert [header.split()[1] for header in headers] == [
+        str(tables / name)
+        for name in ["a.yaml", "sub/b.yaml", "sub/c.yaml", "sub/d.yaml"]
+    ]
+    assert f"{tables / 'sub' / 'b.yaml'}: Invalid row 0" in result.output
+    assert "4 files: 3 succeeded, 1 invalid, 0 failed" in result.output
+
+
+@pytest.mark.functional
+def test_sort(tmp_path: pathlib.Path) -> None:
+    """Ensure sort command rewrites every matching file."""
+
+    for name in ["a.yaml", "b.yaml"]:
+        with (tmp_path / name).open("w") as handle:
+            yaml.dump([{"id": 2}, {"id": 1}, {}], handle)
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app,
+        [
+            "sort",
+            "--jobs",
+            "2",
+            "--key",
+            "-id",
+            "--nulls",
+            "first",
+            str(tmp_path / "*.yaml"),
+        ],
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    for name in ["a.yaml", "b.yaml"]:
+        with (tmp_path / name).open() as handle:
+            assert yaml.safe_load(handle) == [{}, {"id": 2}, {"id": 1}]
+
+
+@pytest.mark.functional
+@pytest.mark.parametrize(
+    "arguments", [["name", "ssh"], ["--where", "name == ssh"]]
+)
+def test_search(tables: pathlib.Path, arguments: List[str]) -> None:
+    """Ensure search command prints matches under each file's header."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app,
+        [
+            "search",
+            *arguments,
+            str(tables / "a.yaml"),
+            str(tables / "sub" / "[cd].yaml"),
+        ],
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert result.output.count("==>") == 3
+    assert result.output.count("'name': 'ssh'") == 3
+
+
+@pytest.mark.functional
+def test_missing_file(tables: pathlib.Path) -> None:
+    """Ensure commands fail before running if a file is missing."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app,
+        ["validate", str(tables / "a.yaml"), str(tables / "missing.yaml")],
+    )
+
+    assert result.exit_code == ExitCode.ERROR.value
+    assert "does not exist" in result.output
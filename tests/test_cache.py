@@ -0,0 +1,164 @@
+"""Tests for the parsed YAML file cache."""
+
+
+import os
+import pathlib
+
+import pytest
+from pytest_mock import MockFixture
+from typer import testing
+
+from yamltable import cache
+import yamltable.__main__ as main
+from yamltable.typing import ExitCode
+
+
+@pytest.fixture
+def cache_dir(tmp_path: pathlib.Path, mocker: MockFixture) -> pathlib.Path:
+    """Point the user cache directory to a temporary directory."""
+
+    path = tmp_path / "xdg"
+    mocker.patch.dict(os.environ, {"XDG_CACHE_HOME": str(path)})
+    return path / "yamltable" / "rows"
+
+
+@pytest.mark.unit
+def test_directory(mocker: MockFixture) -> None:
+    """Check that the cache directory follows the XDG specification."""
+
+    mocker.patch.dict(os.environ, {"XDG_CACHE_HOME": "/mock/cache"})
+
+    expected = pathlib.Path("/mock/cache/yamltable")
+    actual = cache.directory()
+    assert actual == expected
+
+
+@pytest.mark.integration
+def test_read(tmp_path: pathlib.Path, mocker: MockFixture) -> None:
+    """Check that unchanged files are read from the cache."""
+
+    file_path = tmp_path / "file.yaml"
+    file_path.write_text("- foo: 1\n")
+    cache_ = cache.Cache(tmp_path / "cache")
+
+    assert cache_.read(file_path) == ([{"foo": 1}], None)
+
+    spy = mocker.spy(cache, "iter_rows")
+    assert cache_.read(file_path) == ([{"foo": 1}], None)
+    spy.assert_not_called()
+
+
+@pytest.mark.integration
+def test_read_changed(tmp_path: pathlib.Path) -> None:
+    """Check that entries are invalidated by content changes."""
+
+    file_path = tmp_path / "file.yaml"
+    file_path.write_text("- foo: 1\n")
+    cache_ = cache.Cache(tmp_path / "cache")
+    cache_.read(file_path)
+
+    # Keep size and modification time fixed so only the hash changes.
+    stat = file_path.stat()
+    file_path.write_text("- foo: 2\n")
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert cache_.get(file_path) is None
+    assert cache_.read(file_path) == ([{"foo": 2}], None)
+
+
+@pytest.mark.integration
+def test_corrupt_entry(tmp_path: pathlib.Path) -> None:
+    """Check that corrupt entries are discarded."""
+
+    file_path = tmp_path / "file.yaml"
+    file_path.write_text("- foo: 1\n")
+    cache_ = cache.Cache(tmp_path / "cache")
+    cache_.read(file_path)
+
+    (entry,) = (tmp_path / "cache").iterdir()
+    entry.write_bytes(b"corrupt")
+
+    assert cache_.get(file_path) is None
+    assert not entry.exists()
+
+
+@pytest.mark.integration
+def test_evict(tmp_path: pathlib.Path) -> None:
+    """Check that least recently used entries are evicted."""
+
+    cache_ = cache.Cache(tmp_path / "cache")
+    paths = []
+    for idx in range(3):
+        file_path = tmp_path / f"file_{idx}.yaml"
+        file_path.write_text(f"- foo: {idx}\n")
+        cache_.read(file_path)
+        entry = cache_._entry(file_path)
+        os.utime(entry, ns=(idx, idx))
+        paths.append(file_path)
+
+    # Touch the oldest entry so the second file becomes least recently used.
+    cache_.get(paths[0])
+    cache_.max_size = cache_.stats()["size"] - 1
+    cache_._evict()
+
+    assert cache_.get(paths[0]) is not None
+    assert cache_.get(paths[1]) is None
+    assert cache_.get(paths[2]) is not None
+
+
+@pytest.mark.integration
+def test_evict_concurrent(tmp_path: pathlib.Path, mocker: MockFixture) -> None:
+    """Check that entries evicted by other processes are skipped."""
+
+    cache_ = cache.Cache(tmp_path / "cache", max_size=0)
+    for idx in range(2):
+        file_path = tmp_path / f"file_{idx}.yaml"
+        file_path.write_text(f"- foo: {idx}\n")
+        cache_.put(file_path, [], None)
+
+    # Report entries that another process already removed.
+    entries = cache_._entries()
+    for entry in entries:
+        entry.unlink()
+    mocker.patch.object(cache_, "_entries", return_value=entries)
+
+    cache_._evict()
+    assert cache_.clear() == 0
+
+
+@pytest.mark.integration
+def test_store_failure(tmp_path: pathlib.Path, mocker: MockFixture) -> None:
+    """Check that temporary files of failed writes are removed."""
+
+    file_path = tmp_path / "file.yaml"
+    file_path.write_text("- foo: 1\n")
+    cache_ = cache.Cache(tmp_path / "cache")
+    mocker.patch.object(cache.os, "replace", side_effect=OSError(28, "full"))
+
+    cache_.put(file_path, [{"foo": 1}], None)
+
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+@pytest.mark.functional
+def test_cli(cache_dir: pathlib.Path) -> None:
+    """Ensure cache is populated, inspected, and cleared from the CLI."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["--cache", "list", "name", "tests/data/path.yaml"]
+    )
+    assert result.exit_code == ExitCode.SUCCESS.value
+
+    result = runner.invoke(
+        main.app, ["--cache", "validate", "tests/data/path.yaml"]
+    )
+    assert result.exit_code == ExitCode.SUCCESS.value
+
+    result = runner.invoke(main.app, ["cache", "stats"])
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert "entries: 1" in result.stdout
+
+    result = runner.invoke(main.app, ["cache", "clear"])
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert list(cache_dir.iterdir()) == []
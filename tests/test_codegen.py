@@ -0,0 +1,195 @@
+"""Tests for generated schema validators."""
+
+
+import random
+import re
+from typing import Any, Dict, List
+
+import jsonschema
+import pytest
+import pytest_benchmark.fixture as bm
+
+from yamltable import codegen, validation
+from yamltable.typing import Row, Schema
+
+
+KEYS = ["id", "name", "tags", "meta"]
+PIPX: Schema = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "description": "pipx package metadata schema",
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "pattern": "^[\\w-]+$"},
+        "description": {"type": "string"},
+        "website": {"type": "string"},
+    },
+    "required": ["name", "description", "website"],
+    "additionalProperties": False,
+}
+SCALARS: List[Any] = [
+    None,
+    True,
+    False,
+    0,
+    1,
+    -7,
+    1.0,
+    2.5,
+    float("nan"),
+    "",
+    "a",
+    "b-c",
+    "a b",
+    "1",
+]
+
+
+def random_schema(rng: random.Random, depth: int = 0) -> Any:
+    """Generate random schema from the supported keywords."""
+
+    if rng.random() < 0.1:
+        return rng.choice([True, False, {}])
+
+    schema: Dict[str, Any] = {}
+    if rng.random() < 0.6:
+        types = rng.sample(sorted(codegen.TYPES), rng.randint(1, 3))
+        schema["type"] = types[0] if len(types) == 1 else types
+    if rng.random() < 0.2:
+        schema["enum"] = rng.sample(["a", "b-c", "1", None], rng.randint(0, 3))
+    if rng.random() < 0.3:
+        schema["pattern"] = rng.choice(["^[\\w-]+$", "b", "^$", "\\d"])
+    if depth < 2 and rng.random() < 0.5:
+        keys = rng.sample(KEYS, rng.randint(0, 3))
+        schema["properties"] = {
+            key: random_schema(rng, depth + 1) for key in keys
+        }
+    if rng.random() < 0.4:
+        schema["required"] = rng.sample(KEYS, rng.randint(0, 2))
+    if rng.random() < 0.3:
+        schema["additionalProperties"] = rng.choice([True, False])
+    if rng.random() < 0.2:
+        schema["description"] = "generated"
+    return schema
+
+
+def random_value(rng: random.Random, depth: int = 0) -> Any:
+    """Generate random scalar, list, or dictionary."""
+
+    choice = rng.random()
+    if depth < 2 and choice < 0.4:
+        keys = rng.sample(KEYS + ["extra"], rng.randint(0, 4))
+        return {key: random_value(rng, depth + 1) for key in keys}
+    elif depth < 2 and choice < 0.5:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 2))]
+    return rng.choice(SCALARS)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", range(20))
+def test_differential(seed: int) -> None:
+    """Check that generated checks agree with jsonschema on random data."""
+
+    rng = random.Random(seed)
+
+    for _ in range(25):
+        schema = random_schema(rng)
+        jsonschema.Draft7Validator.check_schema(schema)
+        expected = jsonschema.Draft7Validator(schema)
+        check = codegen.compile_schema(schema)
+        assert check is not None, schema
+
+        for _ in range(40):
+            value = random_value(rng)
+            assert check(value) == expected.is_valid(value), (schema, value)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "schema",
+    [
+        {"minLength": 1},
+        {"properties": {"id": {"$ref": "#/definitions/id"}}},
+        {"additionalProperties": {"type": "string"}},
+        {"enum": [1, "a"]},
+        {"type": "object", "patternProperties": {"^a": {}}},
+        {"items": {"type": "string"}},
+    ],
+)
+def test_unsupported(schema: Schema) -> None:
+    """Check that schemas with unsupported keywords are not compiled."""
+
+    assert codegen.compile_schema(schema) is None
+
+
+@pytest.mark.unit
+def test_injection() -> None:
+    """Check that schema strings with quotes and newlines stay data."""
+
+    payload = "x'\"]:\n    raise SystemExit\n#"
+    pattern = f"^{re.escape(payload)}"
+    schema = {
+        "properties": {payload: {"enum": [payload, None], "pattern": pattern}},
+        "required": [payload],
+        "additionalProperties": False,
+    }
+    rows = [{payload: payload}, {payload: None}, {payload: "x"}, {}, {"a": 1}]
+
+    check = codegen.compile_schema(schema)
+
+    assert check is not None
+    validator_ = jsonschema.Draft7Validator(schema)
+    assert [check(row) for row in rows] == [
+        validator_.is_valid(row) for row in rows
+    ]
+    assert [check(row) for row in rows] == [True, True, False, False, False]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "row",
+    [
+        {"name": "a b", "description": "", "website": ""},
+        {"name": "a", "description": 1, "website": ""},
+        {"name": "a", "description": ""},
+        {"name": "a", "description": "", "website": "", "extra": 1},
+    ],
+)
+def test_errors(row: Row) -> None:
+    """Check that errors of generated validators come from jsonschema."""
+
+    validation._validators.clear()
+    validator_ = validation.validator(PIPX)
+    expected = jsonschema.Draft7Validator(PIPX)
+
+    assert isinstance(validator_, codegen.FastValidator)
+    assert validation._first_error(validator_, 0, [row]) == (
+        validation._first_error(expected, 0, [row])
+    )
+    assert [error.message for error in validator_.iter_errors(row)] == [
+        error.message for error in expected.iter_errors(row)
+    ]
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(min_rounds=1, max_time=0, warmup=False)
+@pytest.mark.parametrize("generated", [False, True])
+def test_validate_benchmark(
+    generated: bool, benchmark: bm.BenchmarkFixture
+) -> None:
+    """Compare generated validators against jsonschema on valid rows."""
+
+    if benchmark.disabled:
+        pytest.skip("benchmarks are disabled")
+
+    rows: List[Row] = [
+        {"name": f"pkg-{idx}", "description": "tool", "website": "https://x"}
+        for idx in range(20000)
+    ]
+    validator_ = validation.validator(PIPX)
+    if not generated:
+        validator_ = validator_.fallback
+
+    def validate() -> object:
+        return validation._first_error(validator_, 0, rows)
+
+    assert benchmark(validate) is None
@@ -0,0 +1,282 @@
+"""Tests for in-place updates and deletions of table rows."""
+
+
+import pathlib
+from unittest.mock import MagicMock
+
+import pytest
+from typer import testing
+
+import yamltable
+from yamltable import edit
+import yamltable.__main__ as main
+from yamltable.query import Query
+from yamltable.typing import ExitCode
+
+
+TABLE = """\
+# Tools and their ports.
+schema:
+  type: object
+  properties:
+    name: {type: string}
+    port: {type: integer}
+rows:
+  - name: awscli  # Command line client.
+    port: 443
+
+  # Local services.
+  - name: redis
+    port: 6379
+  - {name: nginx, port: 80}
+"""
+
+
+@pytest.fixture
+def table(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Table file with comments, blank lines, and flow rows."""
+
+    file_path = tmp_path / "table.yaml"
+    file_path.write_text(TABLE)
+    return file_path
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("text", ["port", "=80", ""])
+def test_assignment_invalid(text: str) -> None:
+    """Reject assignments without a key or equals sign."""
+
+    with pytest.raises(ValueError):
+        edit.assignment(text)
+
+
+@pytest.mark.unit
+def test_splice_blocks(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Copy bytes between edits in blocks smaller than the gaps."""
+
+    monkeypatch.setattr(edit, "BLOCK_SIZE", 3)
+    file_path = tmp_path / "file.txt"
+    file_path.write_bytes(bytes(range(50)))
+
+    edits = [((10, 12), b"ab"), ((20, 30), b""), ((40, 40), b"c")]
+    edit.splice(file_path, edits)
+
+    expected = bytes(range(10)) + b"ab" + bytes(range(12, 20))
+    expected += bytes(range(30, 40)) + b"c" + bytes(range(40, 50))
+    assert file_path.read_bytes() == expected
+
+
+@pytest.mark.integration
+def test_update_preserves_file(table: pathlib.Path) -> None:
+    """Only rewrite the matching row and keep comments elsewhere."""
+
+    result = edit.update(table, {"port": 8443}, Query("name = redis"))
+
+    assert result == (1, False)
+    assert table.read_text() == TABLE.replace("port: 6379", "port: 8443")
+
+
+@pytest.mark.integration
+def test_update_multiple(table: pathlib.Path) -> None:
+    """Update every matching row, including rows with inline comments."""
+
+    result = edit.update(table, {"open": True}, Query("name != redis"))
+
+    assert result == (2, False)
+    text = table.read_text()
+    assert "  - name: awscli\n    port: 443\n    open: true\n\n" in text
+    assert "  # Local services.\n" in text
+    rows, _ = yamltable.read(table)
+    assert [row.get("open") for row in rows] == [True, None, True]
+
+
+@pytest.mark.integration
+def test_update_no_match(table: pathlib.Path) -> None:
+    """Leave file untouched if no rows match."""
+
+    assert edit.update(table, {"port": 1}, Query("name = none")) == (0, False)
+    assert table.read_text() == TABLE
+
+
+@pytest.mark.integration
+def test_update_invalid(table: pathlib.Path) -> None:
+    """Leave file untouched if an updated row violates the schema."""
+
+    with pytest.raises(ValueError, match="invalid row 2"):
+        edit.update(table, {"port": "http"}, Query("name = nginx"))
+
+    assert table.read_text() == TABLE
+
+
+@pytest.mark.integration
+def test_upsert(table: pathlib.Path) -> None:
+    """Append a row for an equality query without matches."""
+
+    result = edit.update(table, {"port": 22}, Query("name = ssh"), upsert=True)
+
+    assert result == (1, True)
+    assert table.read_text() == TABLE + "  - name: ssh\n    port: 22\n"
+
+
+@pytest.mark.integration
+def test_upsert_empty(tmp_path: pathlib.Path) -> None:
+    """Write a table with the inserted row if the table is empty."""
+
+    file_path = tmp_path / "table.yaml"
+    file_path.write_text("schema: {type: object}\nrows: []\n")
+
+    result = edit.update(
+        file_path, {"port": 22}, Query("name = ssh"), upsert=True
+    )
+
+    assert result == (1, True)
+    rows, schema = yamltable.read(file_path)
+    assert rows == [{"name": "ssh", "port": 22}]
+    assert schema == {"type": "object"}
+
+
+@pytest.mark.integration
+def test_upsert_query(table: pathlib.Path) -> None:
+    """Reject upserts with queries that do not determine a row."""
+
+    with pytest.raises(TypeError, match="single key"):
+        edit.update(table, {"a": 1}, Query("port > 9000"), upsert=True)
+
+
+@pytest.mark.integration
+def test_delete(table: pathlib.Path) -> None:
+    """Delete rows and keep comments after them."""
+
+    count = edit.delete(table, Query("name in [awscli, nginx]"))
+
+    assert count == 2
+    assert table.read_text() == TABLE.replace(
+        "  - name: awscli  # Command line client.\n    port: 443\n", ""
+    ).replace("  - {name: nginx, port: 80}\n", "")
+
+
+@pytest.mark.integration
+def test_delete_all(table: pathlib.Path) -> None:
+    """Rewrite the table with its schema if every row is deleted."""
+
+    assert edit.delete(table, Query("exists name")) == 3
+
+    rows, schema = yamltable.read(table)
+    assert rows == []
+    assert schema is not None and schema["type"] == "object"
+
+
+@pytest.mark.integration
+def test_delete_last(tmp_path: pathlib.Path) -> None:
+    """Delete the last row of a file without a trailing newline."""
+
+    file_path = tmp_path / "table.yaml"
+    file_path.write_text("- a: 1\n- a: 2")
+
+    edit.delete(file_path, Query("a = 2"))
+
+    assert file_path.read_text() == "- a: 1\n"
+
+
+@pytest.mark.integration
+def test_flow_sequence(tmp_path: pathlib.Path) -> None:
+    """Reject edits of rows in flow sequences."""
+
+    file_path = tmp_path / "table.yaml"
+    file_path.write_text("[{a: 1}, {a: 2}]\n")
+
+    with pytest.raises(TypeError, match="block sequence"):
+        edit.update(file_path, {"a": 3}, Query("a = 2"))
+
+
+@pytest.mark.integration
+def test_anchors(tmp_path: pathlib.Path) -> None:
+    """Reject updates of rows that other rows may refer to."""
+
+    file_path = tmp_path / "table.yaml"
+    text = "- &base {a: 1}\n- b: *base\n"
+    file_path.write_text(text)
+
+    with pytest.raises(TypeError, match="anchors"):
+        edit.update(file_path, {"a": 2}, Query("a = 1"))
+    assert file_path.read_text() == text
+
+
+@pytest.mark.functional
+def test_set(table: pathlib.Path, console: MagicMock) -> None:
+    """Set typed values from the command line."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app,
+        ["set", "port=8080", "tls=false", str(table), "--where", "name=nginx"],
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    console.print.assert_called_once_with("Updated 1 rows.", style="success")
+    rows, _ = yamltable.read(table)
+    assert rows[2] == {"name": "nginx", "port": 8080, "tls": False}
+
+
+@pytest.mark.functional
+def test_set_upsert(table: pathlib.Path, console: MagicMock) -> None:
+    """Report rows that upserts insert."""
+
+    runner = testing.CliRunner()
+    arguments = ["set", "port=22", str(table), "--where", "name=ssh"]
+    result = runner.invoke(main.app, [*arguments, "--upsert"])
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    console.print.assert_called_once_with("Inserted 1 row.", style="success")
+
+    console.reset_mock()
+    result = runner.invoke(main.app, [*arguments, "--upsert"])
+    console.print.assert_called_once_with("Updated 1 rows.", style="success")
+
+
+@pytest.mark.functional
+def test_set_invalid(table: pathlib.Path) -> None:
+    """Exit as invalid if the updated row violates the schema."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["set", "port=http", str(table), "--where", "port=443"]
+    )
+
+    assert result.exit_code == ExitCode.INVALID.value
+    assert "invalid row 0" in result.output
+    assert table.read_text() == TABLE
+
+
+@pytest.mark.functional
+@pytest.mark.parametrize(
+    "assignment,where", [("port", "name = redis"), ("port=1", "name =")]
+)
+def test_set_error(table: pathlib.Path, assignment: str, where: str) -> None:
+    """Exit with an error for malformed assignments and queries."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["set", assignment, str(table), "--where", where]
+    )
+
+    assert result.exit_code == ExitCode.ERROR.value
+    assert table.read_text() == TABLE
+
+
+@pytest.mark.functional
+def test_delete_command(table: pathlib.Path, console: MagicMock) -> None:
+    """Delete rows from the command line and report missing matches."""
+
+    runner = testing.CliRunner()
+    arguments = ["delete", str(table), "--where", "port < 1000"]
+    result = runner.invoke(main.app, arguments)
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    console.print.assert_called_once_with("Deleted 2 rows.", style="success")
+
+    result = runner.invoke(main.app, arguments)
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert "No rows found with query 'port < 1000'." in result.output
@@ -0,0 +1,147 @@
+"""Tests for external merge sort."""
+
+
+import pathlib
+import random
+from typing import List, Optional
+
+import pytest
+from typer import testing
+
+import yamltable
+from yamltable import external
+import yamltable.__main__ as main
+from yamltable.typing import ExitCode, Nulls, Row, Schema
+
+
+def make_rows(count: int) -> List[Row]:
+    """Create rows with duplicate keys and mixed emitter requirements."""
+
+    generator = random.Random(0)
+    return [
+        {
+            "id": generator.randrange(count // 4),
+            "order": idx,
+            "text": generator.choice(["plain", "ünïcode", "x" * 100]),
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "text,expected",
+    [("100", 100), ("4K", 4096), ("512M", 2 ** 29), ("2 GiB", 2 ** 31)],
+)
+def test_parse_size(text: str, expected: int) -> None:
+    """Parse sizes with binary unit suffixes."""
+
+    assert external.parse_size(text) == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("text", ["", "0", "-1M", "1.5G", "12X"])
+def test_parse_size_invalid(text: str) -> None:
+    """Reject malformed and empty sizes."""
+
+    with pytest.raises(ValueError):
+        external.parse_size(text)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("limit", [1, 512, 2 ** 20])
+@pytest.mark.parametrize("keys", [["id"], ["-id"], ["text", "-id"]])
+@pytest.mark.parametrize("nulls", list(Nulls))
+def test_sort_stable(limit: int, keys: List[str], nulls: Nulls) -> None:
+    """External sort matches the stable in-memory sort for any run size."""
+
+    rows = make_rows(200)
+    for row in rows[::7]:
+        row["id"] = None
+
+    actual = list(external.sort(keys, iter(rows), limit, nulls=nulls))
+    assert actual == yamltable.sort(keys, rows, nulls)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("schema", [None, {"type": "object"}])
+@pytest.mark.parametrize("limit", [256, 2 ** 20])
+def test_sort_file_identical(
+    tmp_path: pathlib.Path, schema: Optional[Schema], limit: int
+) -> None:
+    """External sort output is byte identical to the in-memory sort."""
+
+    rows = make_rows(500)
+    expected_path = tmp_path / "expected.yaml"
+    actual_path = tmp_path / "actual.yaml"
+    yamltable.write(actual_path, rows, schema)
+
+    yamltable.write(expected_path, yamltable.sort("id", rows), schema)
+    external.sort_file(actual_path, "id", limit)
+
+    assert actual_path.read_bytes() == expected_path.read_bytes()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "actual.yaml",
+        "expected.yaml",
+    ]
+
+
+@pytest.mark.integration
+def test_sort_file_empty(tmp_path: pathlib.Path) -> None:
+    """Empty tables are written like the in-memory sort."""
+
+    file_path = tmp_path / "path.yaml"
+    yamltable.write(file_path, [], {"type": "object"})
+    expected = file_path.read_bytes()
+
+    external.sort_file(file_path, "id", 1)
+
+    assert file_path.read_bytes() == expected
+
+
+@pytest.mark.integration
+def test_sort_file_incomparable(tmp_path: pathlib.Path) -> None:
+    """File is unchanged if keys of different runs are not comparable."""
+
+    file_path = tmp_path / "path.yaml"
+    yamltable.write(file_path, [{"id": 1}, {"id": "one"}])
+    expected = file_path.read_bytes()
+
+    with pytest.raises(TypeError):
+        external.sort_file(file_path, "id", 1)
+
+    assert file_path.read_bytes() == expected
+    assert [path.name for path in tmp_path.iterdir()] == ["path.yaml"]
+
+
+@pytest.mark.functional
+def test_sort_memory_limit(tmp_path: pathlib.Path) -> None:
+    """Sort command with memory limit matches the in-memory sort command."""
+
+    rows = make_rows(100)
+    expected_path = tmp_path / "expected.yaml"
+    actual_path = tmp_path / "actual.yaml"
+    yamltable.write(expected_path, rows, {"type": "object"})
+    yamltable.write(actual_path, rows, {"type": "object"})
+
+    runner = testing.CliRunner()
+    expected = runner.invoke(main.app, ["sort", "id", str(expected_path)])
+    actual = runner.invoke(
+        main.app, ["sort", "--memory-limit", "1K", "id", str(actual_path)]
+    )
+
+    assert expected.exit_code == actual.exit_code == ExitCode.SUCCESS.value
+    assert actual_path.read_bytes() == expected_path.read_bytes()
+
+
+@pytest.mark.functional
+def test_sort_memory_limit_invalid(tmp_yaml: pathlib.Path) -> None:
+    """Sort command rejects malformed memory limits."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["sort", "--memory-limit", "lots", "name", str(tmp_yaml)]
+    )
+
+    assert result.exit_code == ExitCode.ERROR.value
+    assert "invalid memory size" in result.output
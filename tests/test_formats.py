@@ -0,0 +1,242 @@
+"""Tests for JSON, JSON Lines, and MessagePack table files."""
+
+
+import importlib.util
+import pathlib
+from typing import Any, List, Optional
+
+import pytest
+import pytest_benchmark.fixture as bm
+from typer import testing
+
+import yamltable
+from yamltable import formats, stream
+import yamltable.__main__ as main
+from yamltable.typing import Backend, ExitCode, FileFormat, Row, Schema
+
+
+MSGPACK = pytest.param(
+    FileFormat.MSGPACK,
+    marks=pytest.mark.skipif(
+        importlib.util.find_spec("msgpack") is None,
+        reason="msgpack is not installed",
+    ),
+)
+FORMATS = [FileFormat.JSON, FileFormat.JSONL, MSGPACK]
+EXTENSIONS = {
+    FileFormat.JSON: "json",
+    FileFormat.JSONL: "jsonl",
+    FileFormat.MSGPACK: "msgpack",
+    FileFormat.YAML: "yaml",
+}
+
+
+def table_path(directory: pathlib.Path, format_: FileFormat) -> pathlib.Path:
+    """Get table file path with the extension of a format."""
+
+    return directory / f"table.{EXTENSIONS[format_]}"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("format_", FORMATS)
+@pytest.mark.parametrize(
+    "rows,schema",
+    [
+        ([{"a": 1, "b": [None, 1.5, "x"]}, {"a": {"c": True}}], None),
+        ([{"name": "é"}], {"type": "object"}),
+        ([], None),
+        ([], {"type": "object"}),
+        ([{"schema": 1}, {"schema": 2}], None),
+    ],
+)
+def test_roundtrip(
+    tmp_path: pathlib.Path,
+    format_: FileFormat,
+    rows: List[Row],
+    schema: Optional[Schema],
+) -> None:
+    """Check that tables are read back as written."""
+
+    file_path = table_path(tmp_path, format_)
+
+    yamltable.write(file_path, rows, schema)
+
+    assert yamltable.read(file_path) == (rows, schema)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("format_", FORMATS)
+def test_roundtrip_yaml_types(
+    tmp_path: pathlib.Path, format_: FileFormat
+) -> None:
+    """Check that values without a JSON type are written as strings."""
+
+    file_path = table_path(tmp_path, format_)
+    rows, _ = yamltable.read("- day: 2020-08-29\n  key: 1\n")
+
+    yamltable.write(file_path, rows, sort_keys=True)
+
+    assert yamltable.read(file_path)[0] == [{"day": "2020-08-29", "key": 1}]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "format_,text",
+    [
+        (FileFormat.JSON, b'{"rows": [{"a": 1}]}'),
+        (FileFormat.JSON, b'{"schema": {}, "rows": {"a": 1}}'),
+        (FileFormat.JSON, b"1"),
+        (FileFormat.JSON, b"[{"),
+        (FileFormat.JSONL, b'{"a": 1}\n{"a":\n'),
+    ],
+)
+def test_invalid(
+    tmp_path: pathlib.Path, format_: FileFormat, text: bytes
+) -> None:
+    """Check that invalid and non-tabular files raise type errors."""
+
+    file_path = table_path(tmp_path, format_)
+    file_path.write_bytes(text)
+
+    with pytest.raises(TypeError):
+        yamltable.read(file_path)
+
+
+@pytest.mark.unit
+def test_jsonl_stream(tmp_path: pathlib.Path) -> None:
+    """Check that JSON Lines rows are parsed one line at a time."""
+
+    file_path = tmp_path / "table.jsonl"
+    file_path.write_bytes(b'{"schema": null}\n{"a": 1}\n\n{"a": \n')
+
+    rows, schema = yamltable.iter_rows(file_path)
+
+    assert schema is None
+    assert next(rows) == {"a": 1}
+    with pytest.raises(TypeError, match="line 4"):
+        next(rows)
+
+
+@pytest.mark.unit
+def test_msgpack_rows_first(tmp_path: pathlib.Path) -> None:
+    """Check that MessagePack rows before the schema are buffered."""
+
+    msgpack = pytest.importorskip("msgpack")
+    file_path = tmp_path / "table.msgpack"
+    data = {"rows": [{"a": 1}], "extra": 0, "schema": {"type": "object"}}
+    file_path.write_bytes(msgpack.packb(data))
+
+    assert yamltable.read(file_path) == ([{"a": 1}], {"type": "object"})
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("format_", FORMATS)
+def test_where(tmp_path: pathlib.Path, format_: FileFormat) -> None:
+    """Check that queries filter rows of every format."""
+
+    file_path = table_path(tmp_path, format_)
+    yamltable.write(file_path, [{"a": idx} for idx in range(5)])
+
+    rows, _ = yamltable.iter_rows(file_path, where=yamltable.Query("a >= 3"))
+
+    assert list(rows) == [{"a": 3}, {"a": 4}]
+
+
+@pytest.mark.unit
+def test_format_override(tmp_path: pathlib.Path) -> None:
+    """Check that explicit formats take precedence over file extensions."""
+
+    file_path = tmp_path / "table.txt"
+    yamltable.write(file_path, [{"a": 1}], format_=FileFormat.JSONL)
+
+    assert file_path.read_text() == '{"a": 1}\n'
+    assert yamltable.read(file_path, format_=FileFormat.JSONL)[0] == [
+        {"a": 1}
+    ]
+    with pytest.raises(ValueError):
+        yamltable.read('{"a": 1}', format_=FileFormat.JSONL)
+
+
+@pytest.mark.unit
+def test_spans_unsupported(tmp_path: pathlib.Path) -> None:
+    """Check that byte spans are only read from YAML files."""
+
+    file_path = tmp_path / "table.json"
+    yamltable.write(file_path, [{"a": 1}])
+
+    with pytest.raises(TypeError):
+        stream.iter_spans(file_path)
+
+
+@pytest.mark.functional
+@pytest.mark.parametrize("format_", FORMATS)
+def test_cli(
+    tmp_yaml: pathlib.Path, tmp_path: pathlib.Path, format_: FileFormat
+) -> None:
+    """Ensure commands work on converted tables."""
+
+    file_path = table_path(tmp_path, format_)
+    rows, schema = yamltable.read(tmp_yaml)
+    runner = testing.CliRunner()
+
+    result = runner.invoke(main.app, ["convert", str(tmp_yaml), str(file_path)])
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert yamltable.read(file_path) == (rows, schema)
+
+    for arguments in [
+        ["validate"],
+        ["list", "name"],
+        ["index", "3"],
+        ["search", "name", "ssh"],
+        ["sort", "--key", "-name"],
+    ]:
+        result = runner.invoke(main.app, [*arguments, str(file_path)])
+        assert result.exit_code == ExitCode.SUCCESS.value, arguments
+
+    names = sorted((row["name"] for row in rows), reverse=True)
+    assert [row["name"] for row in yamltable.read(file_path)[0]] == names
+
+
+@pytest.mark.functional
+def test_cli_convert_formats(tmp_yaml: pathlib.Path) -> None:
+    """Ensure convert command honors explicit formats and reports errors."""
+
+    dest = tmp_yaml.with_suffix(".txt")
+    runner = testing.CliRunner()
+
+    result = runner.invoke(
+        main.app, ["convert", "--to", "jsonl", str(tmp_yaml), str(dest)]
+    )
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert formats.detect(dest) == FileFormat.YAML
+    assert yamltable.read(dest, format_=FileFormat.JSONL)[1] is not None
+
+    result = runner.invoke(
+        main.app, ["convert", "--from", "json", str(tmp_yaml), str(dest)]
+    )
+    assert result.exit_code == ExitCode.ERROR.value
+    assert "invalid JSON file" in result.output
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(min_rounds=1, max_time=0, warmup=False)
+@pytest.mark.parametrize("format_", [FileFormat.YAML, *FORMATS])
+def test_read_benchmark(
+    tmp_path: pathlib.Path, format_: FileFormat, benchmark: bm.BenchmarkFixture
+) -> None:
+    """Compare load times of a machine generated table in every format."""
+
+    if benchmark.disabled:
+        pytest.skip("benchmarks are disabled")
+
+    file_path = table_path(tmp_path, format_)
+    rows: List[Any] = [
+        {"id": idx, "name": f"row-{idx}", "tags": ["a", "b"], "score": 0.5}
+        for idx in range(20000)
+    ]
+    yamltable.write(file_path, rows, {"type": "object"})
+
+    def read() -> int:
+        return len(yamltable.read(file_path, Backend.AUTO)[0])
+
+    assert benchmark(read) == len(rows)
@@ -0,0 +1,322 @@
+"""Tests for persisted dependency graphs."""
+
+
+import pathlib
+import random
+from typing import Any, Dict, List, Set
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockFixture
+from typer import testing
+
+import yamltable
+from yamltable import graph
+import yamltable.__main__ as main
+import yamltable.output
+from yamltable.typing import ExitCode, Row
+
+
+@pytest.fixture(autouse=True)
+def cache_home(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> pathlib.Path:
+    """Redirect graph stores to a temporary cache directory."""
+
+    path = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(path))
+    return path
+
+
+@pytest.fixture
+def table(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Table of packages and their dependencies."""
+
+    file_path = tmp_path / "packages.yaml"
+    requires = {"awscli": ["botocore"], "botocore": [], "s3fs": ["awscli"]}
+    write(file_path, requires)
+    return file_path
+
+
+def check(graph_: graph.Graph) -> None:
+    """Assert that every name follows its dependencies."""
+
+    order = graph_.order()
+    positions = {node: idx for idx, node in enumerate(order)}
+    assert len(positions) == len(order) == len(graph_.requires)
+    for node, deps in graph_.requires.items():
+        assert all(positions[dep] < positions[node] for dep in deps)
+
+
+def reachable(edges: Dict[Any, Set[Any]], node: Any) -> Set[Any]:
+    """Find names reachable from a name by brute force."""
+
+    seen: Set[Any] = set()
+    stack = [node]
+    while stack:
+        for item in edges[stack.pop()]:
+            if item not in seen:
+                seen.add(item)
+                stack.append(item)
+    return seen
+
+
+def write(file_path: pathlib.Path, requires: Dict[str, List[str]]) -> None:
+    """Write table of names and their dependencies."""
+
+    rows = [{"name": key, "depends": deps} for key, deps in requires.items()]
+    yamltable.write(file_path, rows)
+
+
+@pytest.mark.unit
+def test_build() -> None:
+    """Check that built graphs match the dependencies order."""
+
+    rows = [
+        {"name": "a", "depends": ["b", "c"]},
+        {"name": "b", "depends": ["c"]},
+        {"name": "c", "depends": []},
+        {"name": "d", "depends": []},
+    ]
+
+    actual = graph.Graph.build(rows, "depends", "name").order()
+
+    expected = yamltable.dependencies(rows, "depends", "name")
+    assert actual == [row["name"] for row in expected]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "rows,message",
+    [
+        ([{"name": "a", "depends": ["b"]}], "unknown name 'b'"),
+        ([{"name": "a", "depends": []}] * 2, "repeats name 'a'"),
+        ([{"name": "a"}], "needs a scalar"),
+        ([{"name": ["a"], "depends": []}], "needs a scalar"),
+        ([{"name": "a", "depends": ["a"]}], "circular"),
+    ],
+)
+def test_build_invalid(rows: List[Row], message: str) -> None:
+    """Reject unknown, repeated, missing, and circular names."""
+
+    with pytest.raises(ValueError, match=message):
+        graph.Graph.build(rows, "depends", "name")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", range(20))
+def test_update_random(seed: int) -> None:
+    """Keep a valid order and unchanged graphs on cycles for random edits."""
+
+    generator = random.Random(seed)
+    rows = [
+        {"name": idx, "depends": generator.sample(range(idx), min(idx, 2))}
+        for idx in range(30)
+    ]
+    graph_ = graph.Graph.build(rows, "depends", "name")
+
+    for step in range(50):
+        nodes = list(graph_.requires)
+        node = generator.choice(nodes)
+        deps = graph_.requires[node] | {generator.choice(nodes)}
+        changed = [{"name": node, "depends": list(deps)}]
+        changed.append({"name": 100 + step, "depends": [node]})
+        order = graph_.order()
+        requires = {key: set(value) for key, value in graph_.requires.items()}
+
+        try:
+            graph_.update(changed)
+        except ValueError as xcpt:
+            assert "circular" in str(xcpt)
+            assert graph_.order() == order
+            assert graph_.requires == requires
+        check(graph_)
+
+    for node in graph_.requires:
+        expected = reachable(graph_.required_by, node)
+        assert set(graph_.dependents(node)) == expected
+        expected = reachable(graph_.requires, node)
+        assert set(graph_.dependencies(node)) == expected
+
+
+@pytest.mark.unit
+def test_update_cycle() -> None:
+    """Describe the cycle closed by a new dependency."""
+
+    rows = [
+        {"name": "a", "depends": []},
+        {"name": "b", "depends": ["a"]},
+        {"name": "c", "depends": ["b"]},
+    ]
+    graph_ = graph.Graph.build(rows, "depends", "name")
+
+    with pytest.raises(ValueError, match="'a' -> 'c' -> 'b' -> 'a'"):
+        graph_.update([{"name": "a", "depends": ["c"]}])
+
+
+@pytest.mark.unit
+def test_update_remove() -> None:
+    """Remove names only together with the names that depend on them."""
+
+    rows = [
+        {"name": "a", "depends": []},
+        {"name": "b", "depends": ["a"]},
+        {"name": "c", "depends": []},
+    ]
+    graph_ = graph.Graph.build(rows, "depends", "name")
+
+    with pytest.raises(ValueError, match="'b' depends on removed name 'a'"):
+        graph_.update([], ["a"])
+    with pytest.raises(ValueError, match="unable to remove name 'd'"):
+        graph_.update([], ["d"])
+
+    graph_.update([{"name": "b", "depends": ["c"]}], ["a"])
+    assert graph_.order() == ["c", "b"]
+
+
+@pytest.mark.unit
+def test_update_remove_chain() -> None:
+    """Remove names together with the names that depend on them."""
+
+    rows = [
+        {"name": "a", "depends": []},
+        {"name": "b", "depends": ["a"]},
+        {"name": "c", "depends": ["b"]},
+        {"name": "d", "depends": []},
+    ]
+    graph_ = graph.Graph.build(rows, "depends", "name")
+
+    graph_.update([], ["a", "b", "c"])
+
+    assert graph_.order() == ["d"]
+    assert graph_.requires == {"d": set()}
+    assert graph_.required_by == {"d": set()}
+
+
+@pytest.mark.unit
+def test_update_rollback(mocker: MockFixture) -> None:
+    """Keep the graph unchanged if an update fails unexpectedly."""
+
+    rows = [
+        {"name": "a", "depends": []},
+        {"name": "b", "depends": ["a"]},
+        {"name": "c", "depends": []},
+    ]
+    graph_ = graph.Graph.build(rows, "depends", "name")
+    order = graph_.order()
+    requires = {key: set(value) for key, value in graph_.requires.items()}
+
+    mocker.patch.object(
+        graph.Graph, "_order_edge", side_effect=RuntimeError("failure")
+    )
+    with pytest.raises(RuntimeError):
+        graph_.update([{"name": "a", "depends": ["c"]}], ["b"])
+
+    assert graph_.order() == order
+    assert graph_.requires == requires
+    check(graph_)
+
+
+@pytest.mark.unit
+def test_compact() -> None:
+    """Reclaim slots of removed names."""
+
+    rows = [{"name": idx, "depends": []} for idx in range(200)]
+    graph_ = graph.Graph.build(rows, "depends", "name")
+
+    graph_.update([], range(150))
+
+    assert graph_.order() == list(range(150, 200))
+    assert len(graph_.slots) == 50
+
+
+@pytest.mark.integration
+def test_resolve(table: pathlib.Path, mocker: MockFixture) -> None:
+    """Build, reuse, and incrementally update stored graphs."""
+
+    graph_, changed = graph.resolve(table, "depends", "name")
+    assert (graph_.order(), changed) == (["botocore", "awscli", "s3fs"], -1)
+
+    read = mocker.spy(graph, "iter_rows")
+    graph_, changed = graph.resolve(table, "depends", "name")
+    assert changed == 0
+    read.assert_not_called()
+
+    write(
+        table,
+        {"awscli": ["botocore"], "botocore": ["six"], "s3fs": [], "six": []},
+    )
+    graph_, changed = graph.resolve(table, "depends", "name")
+    assert changed == 3
+    check(graph_)
+    assert graph_.dependents("six") == ["botocore", "awscli"]
+
+
+@pytest.mark.integration
+def test_resolve_invalid(table: pathlib.Path) -> None:
+    """Keep the stored graph if changed rows are invalid."""
+
+    graph.resolve(table, "depends", "name")
+    write(table, {"awscli": ["s3fs"], "botocore": [], "s3fs": ["awscli"]})
+
+    with pytest.raises(ValueError, match="circular"):
+        graph.resolve(table, "depends", "name")
+
+    stored = graph.Graph.load(table, "depends", "name")
+    assert stored is not None
+    assert stored.order() == ["botocore", "awscli", "s3fs"]
+
+
+@pytest.mark.functional
+def test_deps(table: pathlib.Path) -> None:
+    """Print names in dependency order and reachable names."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, ["deps", str(table)])
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert result.output == "botocore\nawscli\ns3fs\n"
+
+    result = runner.invoke(
+        main.app, ["deps", "--dependents", "botocore", str(table)]
+    )
+    assert result.output == "awscli\ns3fs\n"
+
+    result = runner.invoke(
+        main.app, ["deps", "--requires", "s3fs", "--format", "json", str(table)]
+    )
+    assert result.output == '[\n"botocore",\n"awscli"\n]\n'
+
+
+@pytest.mark.functional
+def test_deps_terminal(
+    tmp_path: pathlib.Path, console: MagicMock, mocker: MockFixture
+) -> None:
+    """Print names on terminals without Rich markup."""
+
+    file_path = tmp_path / "packages.yaml"
+    write(file_path, {"[/]": []})
+    mocker.patch.object(yamltable.output, "is_terminal", return_value=True)
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, ["deps", str(file_path)])
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    console.print.assert_called_once_with("[/]", markup=False, emoji=False)
+
+
+@pytest.mark.functional
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        ["--dependents", "missing"],
+        ["--dependents", "a", "--requires", "b"],
+        ["--name", "depends"],
+    ],
+)
+def test_deps_error(table: pathlib.Path, arguments: List[str]) -> None:
+    """Exit with an error for unknown names and invalid options."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, ["deps", *arguments, str(table)])
+
+    assert result.exit_code == ExitCode.ERROR.value
@@ -0,0 +1,150 @@
+"""Tests for incremental validation."""
+
+
+import pathlib
+import random
+from typing import List
+
+import pytest
+from typer import testing
+
+import yamltable
+from yamltable import incremental
+import yamltable.__main__ as main
+from yamltable.typing import ExitCode, Row, Schema
+
+
+@pytest.fixture(autouse=True)
+def cache_home(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> pathlib.Path:
+    """Redirect fingerprint stores to a temporary cache directory."""
+
+    path = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(path))
+    return path
+
+
+def run(
+    file_path: pathlib.Path, rows: List[Row], schema: Schema
+) -> incremental.Result:
+    """Validate rows incrementally and save the store."""
+
+    store = incremental.Store.load(file_path, schema)
+    result = store.validate(rows, schema)
+    store.save()
+    return result
+
+
+@pytest.mark.integration
+def test_validate(tmp_path: pathlib.Path, schema: Schema) -> None:
+    """Check that only new and changed rows are validated."""
+
+    file_path = tmp_path / "file.yaml"
+    rows: List[Row] = [
+        {"mock_key_1": idx, "mock_key_2": 0} for idx in range(10)
+    ]
+
+    assert run(file_path, rows, schema) == (None, 10, 0)
+    assert run(file_path, rows, schema) == (None, 0, 10)
+
+    rows[3] = {"mock_key_1": 3.0, "mock_key_2": 0}
+    rows.append({"mock_key_1": 10, "mock_key_2": 0})
+    assert run(file_path, rows, schema) == (None, 2, 9)
+
+    changed = dict(schema, description="changed")
+    assert run(file_path, rows, changed) == (None, 11, 0)
+
+
+@pytest.mark.integration
+def test_validate_invalid(tmp_path: pathlib.Path, schema: Schema) -> None:
+    """Check that invalid rows are reported until they are fixed."""
+
+    file_path = tmp_path / "file.yaml"
+    rows: List[Row] = [
+        {"mock_key_1": idx, "mock_key_2": 0} for idx in range(5)
+    ]
+    run(file_path, rows, schema)
+
+    rows[2] = {"mock_key_1": "2", "mock_key_2": 0}
+    _, row, msg = yamltable.validate(rows, schema)
+    for _ in range(2):
+        result = run(file_path, rows, schema)
+        assert result.error == (row, msg)
+        assert result.skipped == 2
+
+    rows[2] = {"mock_key_1": 2, "mock_key_2": 0}
+    assert run(file_path, rows, schema) == (None, 0, 5)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("seed", range(5))
+def test_validate_differential(
+    tmp_path: pathlib.Path, schema: Schema, seed: int
+) -> None:
+    """Check that incremental runs give the same verdict as full runs."""
+
+    rng = random.Random(seed)
+    file_path = tmp_path / "file.yaml"
+    values = [0, 1, 1.5, "1", None, True]
+    rows: List[Row] = [
+        {"mock_key_1": idx, "mock_key_2": 0} for idx in range(20)
+    ]
+
+    for _ in range(20):
+        idx = rng.randrange(len(rows))
+        rows[idx] = {"mock_key_1": rng.choice(values), "mock_key_2": 0}
+
+        valid, row, msg = yamltable.validate(rows, schema)
+        result = run(file_path, rows, schema)
+        assert result.error == (None if valid else (row, msg))
+
+
+@pytest.mark.unit
+def test_store_corrupt(tmp_path: pathlib.Path, schema: Schema) -> None:
+    """Check that unreadable stores are treated as empty."""
+
+    file_path = tmp_path / "file.yaml"
+    store = incremental.Store.load(file_path, schema)
+    store.path.parent.mkdir(parents=True)
+    store.path.write_bytes(b"corrupt")
+
+    assert incremental.Store.load(file_path, schema).digests == set()
+
+
+@pytest.mark.functional
+def test_cli(tmp_path: pathlib.Path) -> None:
+    """Ensure validate command reports skipped rows and invalid rows."""
+
+    file_path = tmp_path / "path.yaml"
+    text = pathlib.Path("tests/data/path.yaml").read_text()
+    file_path.write_text(text)
+    rows, _ = yamltable.read(file_path)
+    arguments = ["validate", "--incremental", str(file_path)]
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, arguments)
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert f"Validated {len(rows)} rows and skipped 0" in result.output
+
+    result = runner.invoke(main.app, arguments)
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert f"Validated 0 rows and skipped {len(rows)}" in result.output
+
+    file_path.write_text(text.replace("name: bash-profile", "name: 1"))
+    result = runner.invoke(main.app, arguments)
+    assert result.exit_code == ExitCode.INVALID.value
+    assert "Invalid row 2" in result.output
+
+
+@pytest.mark.functional
+def test_cli_exclusive(tmp_yaml: pathlib.Path) -> None:
+    """Ensure incremental validation rejects the all errors report."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app,
+        ["validate", "--incremental", "--all-errors", str(tmp_yaml)],
+    )
+
+    assert result.exit_code == ExitCode.ERROR.value
@@ -0,0 +1,159 @@
+"""Tests for persistent secondary hash indexes."""
+
+
+import datetime
+import pathlib
+import pickle
+from typing import Any
+
+import pytest
+from pytest_mock import MockFixture
+from typer import testing
+
+import yamltable
+from yamltable import index
+import yamltable.__main__ as main
+from yamltable.typing import ExitCode
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "key,val",
+    [("name", "repo"), ("type", "file"), ("source", None), ("name", "bad")],
+)
+def test_search(tmp_yaml: pathlib.Path, key: str, val: str) -> None:
+    """Check that index searches match linear searches."""
+
+    index_ = yamltable.Index.build(tmp_yaml, key)
+    rows, _ = yamltable.read(tmp_yaml)
+
+    expected = yamltable.search(key, val, rows)
+    actual = index_.search(tmp_yaml, val)
+    assert actual == expected
+
+
+@pytest.mark.integration
+def test_load(tmp_yaml: pathlib.Path) -> None:
+    """Check that saved indexes load until the file changes."""
+
+    yamltable.Index.build(tmp_yaml, "name").save(tmp_yaml)
+
+    index_ = yamltable.Index.load(tmp_yaml, "name")
+    assert index_ is not None
+    assert len(index_.lookup("repo")) == 1
+    assert yamltable.Index.load(tmp_yaml, "type") is None
+
+    with tmp_yaml.open("a") as handle:
+        handle.write("  - name: extra\n")
+    assert yamltable.Index.load(tmp_yaml, "name") is None
+
+
+@pytest.mark.integration
+def test_load_values(tmp_path: pathlib.Path) -> None:
+    """Check that saved indexes keep the types of key values."""
+
+    file_path = tmp_path / "table.yaml"
+    values = [1, True, 1.5, None, "1", datetime.date(2020, 1, 2)]
+    yamltable.write(file_path, [{"key": value} for value in values])
+    yamltable.Index.build(file_path, "key").save(file_path)
+
+    index_ = yamltable.Index.load(file_path, "key")
+
+    assert index_ is not None
+    assert list(index_.spans) == [1, 1.5, None, "1", values[-1]]
+    assert type(list(index_.spans)[-1]) is datetime.date
+    assert len(index_.lookup(True)) == 2
+
+
+@pytest.mark.integration
+def test_load_untrusted(tmp_yaml: pathlib.Path) -> None:
+    """Check that sidecars in other formats are ignored without loading."""
+
+    marker = tmp_yaml.parent / "marker"
+
+    class Payload:
+        def __reduce__(self) -> Any:
+            return pathlib.Path.touch, (marker,)
+
+    sidecar = index.path(tmp_yaml, "name")
+    sidecar.write_bytes(pickle.dumps(Payload()))
+
+    assert yamltable.Index.load(tmp_yaml, "name") is None
+    assert not marker.exists()
+
+
+@pytest.mark.integration
+def test_save_atomic(tmp_yaml: pathlib.Path, mocker: MockFixture) -> None:
+    """Check that failed saves keep the previous sidecar."""
+
+    sidecar = yamltable.Index.build(tmp_yaml, "name").save(tmp_yaml)
+    text = sidecar.read_bytes()
+    mocker.patch.object(index.json, "dump", side_effect=OSError)
+
+    with pytest.raises(OSError):
+        yamltable.Index.build(tmp_yaml, "name").save(tmp_yaml)
+
+    assert sidecar.read_bytes() == text
+    assert sorted(tmp_yaml.parent.iterdir()) == sorted([tmp_yaml, sidecar])
+
+
+@pytest.mark.unit
+def test_path() -> None:
+    """Check that sidecar names escape key characters."""
+
+    expected = pathlib.Path("data/.file.yaml.a%2Fb.index")
+    actual = index.path(pathlib.Path("data/file.yaml"), "a/b")
+    assert actual == expected
+
+
+@pytest.mark.integration
+def test_unhashable(tmp_path: pathlib.Path) -> None:
+    """Check that rows with unhashable values are skipped."""
+
+    file_path = tmp_path / "file.yaml"
+    file_path.write_text("- key: [1]\n- key: 1\n- other: 1\n- plain\n")
+
+    index_ = yamltable.Index.build(file_path, "key")
+
+    assert list(index_.spans) == [1]
+    assert index_.search(file_path, 1) == [{"key": 1}]
+    assert index_.lookup([1]) == []
+
+
+@pytest.mark.functional
+def test_cli(tmp_yaml: pathlib.Path, mocker: MockFixture) -> None:
+    """Ensure search command uses an up to date index."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, ["index-build", "name", str(tmp_yaml)])
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert index.path(tmp_yaml, "name").exists()
+
+    spy = mocker.spy(yamltable.Index, "select")
+    result = runner.invoke(main.app, ["search", "name", "ssh", str(tmp_yaml)])
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert "'name': 'ssh'" in result.stdout
+    assert spy.call_count == 1
+
+    # Keys without an index fall back to scanning the file.
+    result = runner.invoke(main.app, ["search", "type", "file", str(tmp_yaml)])
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert result.stdout.count("'name'") == 4
+    assert spy.call_count == 1
+
+
+@pytest.mark.functional
+def test_cli_read_only(tmp_yaml: pathlib.Path, mocker: MockFixture) -> None:
+    """Ensure an error exit code if the index cannot be written."""
+
+    mocker.patch.object(
+        yamltable.Index, "save", side_effect=PermissionError(13, "denied")
+    )
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, ["index-build", "name", str(tmp_yaml)])
+
+    assert result.exit_code == ExitCode.ERROR.value
+    assert "Error: [Errno 13] denied" in result.output
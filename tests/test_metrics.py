@@ -0,0 +1,104 @@
+"""Tests for phase metrics of table operations."""
+
+
+import pathlib
+import time
+from typing import Iterator, List
+
+import pytest
+
+import yamltable
+from yamltable import metrics
+from yamltable.typing import Phase
+
+
+@pytest.fixture
+def received() -> Iterator[List[metrics.Metric]]:
+    """Metrics reported while the test runs."""
+
+    received_: List[metrics.Metric] = []
+    metrics.subscribe(received_.append)
+    yield received_
+    metrics.unsubscribe(received_.append)
+
+
+@pytest.mark.unit
+def test_inactive() -> None:
+    """Check that phases are not timed without callbacks."""
+
+    rows = iter([{"a": 1}])
+
+    with metrics.phase(Phase.READ) as counter:
+        assert counter.count(rows) is rows
+
+    assert not metrics.active()
+    assert metrics.timed(rows, Phase.READ) is rows
+
+
+@pytest.mark.unit
+def test_nested(received: List[metrics.Metric]) -> None:
+    """Check that time of nested phases only counts toward the inner phase."""
+
+    with metrics.phase(Phase.EMIT):
+        time.sleep(0.01)
+        with metrics.phase(Phase.TRANSFORM):
+            time.sleep(0.05)
+
+    transform, emit = received
+    assert transform.phase == Phase.TRANSFORM
+    assert transform.seconds >= 0.05
+    assert 0.01 <= emit.seconds < 0.05
+
+
+@pytest.mark.unit
+def test_timed(received: List[metrics.Metric]) -> None:
+    """Check that only time spent producing rows is counted."""
+
+    def rows() -> Iterator[int]:
+        for idx in range(3):
+            time.sleep(0.01)
+            yield idx
+
+    with metrics.phase(Phase.EMIT) as counter:
+        for _ in counter.count(metrics.timed(rows(), Phase.READ)):
+            time.sleep(0.02)
+
+    read, emit = received
+    assert (read.phase, read.rows, emit.rows) == (Phase.READ, 3, 3)
+    assert 0.03 <= read.seconds < 0.06
+    assert emit.seconds >= 0.06
+
+
+@pytest.mark.unit
+def test_error(received: List[metrics.Metric]) -> None:
+    """Check that phases are reported when they raise exceptions."""
+
+    with pytest.raises(TypeError):
+        yamltable.sort("a", [{"a": 1}, {"a": "b"}])
+
+    assert [metric.phase for metric in received] == [Phase.TRANSFORM]
+
+
+@pytest.mark.integration
+def test_library(
+    tmp_path: pathlib.Path, received: List[metrics.Metric]
+) -> None:
+    """Check that library functions report their phases."""
+
+    file_path = tmp_path / "table.yaml"
+    rows = [{"a": idx} for idx in range(10)]
+
+    yamltable.write(file_path, rows, {"type": "object"})
+    read_rows, schema = yamltable.read(file_path)
+    yamltable.validate(read_rows, schema)
+    yamltable.search("a", 1, read_rows)
+
+    size = file_path.stat().st_size
+    assert [tuple(metric)[::2] for metric in received] == [
+        (Phase.EMIT, 10),
+        (Phase.READ, 0),
+        (Phase.READ, 10),
+        (Phase.VALIDATE, 10),
+        (Phase.TRANSFORM, 10),
+    ]
+    assert [metric.bytes for metric in received[:2]] == [size, size]
@@ -0,0 +1,160 @@
+"""Tests for byte offset tables."""
+
+
+import pathlib
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_benchmark.fixture as bm
+from pytest_mock import MockFixture
+from typer import testing
+
+import yamltable
+from yamltable import offsets, stream
+import yamltable.__main__ as main
+from yamltable.typing import ExitCode
+
+
+@pytest.mark.integration
+def test_build(tmp_yaml: pathlib.Path) -> None:
+    """Check that offset tables hold the span of every row."""
+
+    rows, _ = stream.iter_spans(tmp_yaml)
+    expected = [span for _, span in rows]
+
+    table = offsets.Offsets.build(tmp_yaml)
+
+    assert len(table) == len(expected)
+    assert [table[idx] for idx in range(len(table))] == expected
+    assert table[-1] == expected[-1]
+    with pytest.raises(IndexError):
+        table[len(table)]
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("index", [0, 3, -1, -4])
+def test_span(tmp_yaml: pathlib.Path, index: int) -> None:
+    """Check that saved tables read single entries."""
+
+    table = offsets.Offsets.build(tmp_yaml)
+    table.save(tmp_yaml)
+    rows, _ = yamltable.read(tmp_yaml)
+
+    span = offsets.span(tmp_yaml, index)
+
+    assert span == table[index]
+    with tmp_yaml.open("rb") as handle:
+        assert stream.read_span(handle, span) == rows[index]
+
+
+@pytest.mark.integration
+def test_span_invalid(tmp_yaml: pathlib.Path) -> None:
+    """Check that missing, stale, and corrupt tables are not used."""
+
+    assert offsets.span(tmp_yaml, 0) is None
+
+    sidecar = offsets.Offsets.build(tmp_yaml).save(tmp_yaml)
+    with pytest.raises(IndexError):
+        offsets.span(tmp_yaml, 100)
+
+    sidecar.write_bytes(sidecar.read_bytes()[: offsets.HEADER.size + 4])
+    assert offsets.span(tmp_yaml, 0) is None
+
+    offsets.Offsets.build(tmp_yaml).save(tmp_yaml)
+    with tmp_yaml.open("a") as handle:
+        handle.write("  - name: extra\n")
+    assert offsets.span(tmp_yaml, 0) is None
+
+
+@pytest.mark.functional
+def test_cli(tmp_yaml: pathlib.Path, console: MagicMock) -> None:
+    """Ensure index command creates, uses, and rebuilds offset tables."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, ["index", "2", str(tmp_yaml)])
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert not offsets.path(tmp_yaml).exists()
+
+    result = runner.invoke(
+        main.app, ["index", "--offsets", "2", str(tmp_yaml)]
+    )
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert offsets.path(tmp_yaml).exists()
+    assert console.print.call_args_list[0] == console.print.call_args_list[1]
+
+    text = tmp_yaml.read_text().replace("bash-profile", "bash-login")
+    tmp_yaml.write_text(text)
+    result = runner.invoke(main.app, ["index", "2", str(tmp_yaml)])
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert "'name': 'bash-login'" in console.print.call_args[0][0]
+    assert offsets.span(tmp_yaml, 2) is not None
+
+    result = runner.invoke(main.app, ["index", "20", str(tmp_yaml)])
+    assert result.exit_code == ExitCode.ERROR.value
+
+
+@pytest.mark.functional
+def test_cli_fallback(tmp_path: pathlib.Path, console: MagicMock) -> None:
+    """Ensure rows with aliases to other rows are read by streaming."""
+
+    file_path = tmp_path / "file.yaml"
+    file_path.write_text("- &row {key: 1}\n- *row\n")
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["index", "--offsets", "1", str(file_path)]
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    console.print.assert_called_once_with("{'key': 1}")
+
+
+@pytest.mark.functional
+def test_cli_read_only(
+    tmp_yaml: pathlib.Path, console: MagicMock, mocker: MockFixture
+) -> None:
+    """Ensure rows are read with an unsaved table if saving fails."""
+
+    mocker.patch.object(
+        offsets.Offsets, "save", side_effect=PermissionError(13, "denied")
+    )
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["index", "--offsets", "1", str(tmp_yaml)]
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert "Warning: unable to write offset table" in result.output
+    assert not offsets.path(tmp_yaml).exists()
+    console.print.assert_called_once()
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(min_rounds=1, max_time=0, warmup=False)
+@pytest.mark.parametrize("method", ["offsets", "stream"])
+def test_index_benchmark(
+    tmp_path: pathlib.Path,
+    method: str,
+    benchmark: bm.BenchmarkFixture,
+) -> None:
+    """Compare random row access with offset tables and streaming."""
+
+    if benchmark.disabled:
+        pytest.skip("benchmarks are disabled")
+
+    file_path = tmp_path / "file.yaml"
+    yamltable.write(
+        file_path, ({"name": f"row{idx}", "id": idx} for idx in range(20000))
+    )
+    if method == "offsets":
+        offsets.Offsets.build(file_path).save(file_path)
+
+    def index() -> object:
+        row = main.offset_row(file_path, -1, False)
+        if row is None:
+            rows, _ = stream.iter_rows(file_path)
+            row = main.row_at(rows, -1)
+        return row
+
+    assert benchmark(index) == {"name": "row19999", "id": 19999}
@@ -0,0 +1,95 @@
+"""Tests for buffered command output."""
+
+
+import io
+import json
+from typing import Iterator, List
+
+import pytest
+import pytest_benchmark.fixture as bm
+from rich.console import Console
+
+from yamltable import output
+from yamltable.typing import Format, Row
+
+
+@pytest.mark.unit
+def test_write_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check that lines are written in chunks to the binary buffer."""
+
+    monkeypatch.setattr(output, "CHUNK_LINES", 2)
+    buffer = io.BytesIO()
+    writes: List[bytes] = []
+    monkeypatch.setattr(buffer, "write", writes.append)
+    stream = io.TextIOWrapper(buffer, encoding="utf-8")
+
+    output.write((f"{idx}\n" for idx in range(5)), stream)
+
+    assert writes == [b"0\n1\n", b"2\n3\n", b"4\n"]
+
+
+@pytest.mark.unit
+def test_write_error() -> None:
+    """Check that lines before an error are written to text streams."""
+
+    def lines() -> Iterator[str]:
+        yield "a\n"
+        raise KeyError("b")
+
+    stream = io.StringIO()
+    with pytest.raises(KeyError):
+        output.write(lines(), stream)
+
+    assert stream.getvalue() == "a\n"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("format_", list(Format))
+def test_format_rows_empty(format_: Format) -> None:
+    """Check that formats of no rows are empty or valid documents."""
+
+    text = "".join(output.format_rows([], format_))
+
+    if format_ == Format.JSON:
+        assert json.loads(text) == []
+    else:
+        assert text.strip() == ""
+
+
+@pytest.mark.unit
+def test_format_rows_delimited() -> None:
+    """Check that delimited cells are quoted and columns are aligned."""
+
+    rows: List[Row] = [{"a": "x,y", "b": [1]}, {"c": 'say "hi"', "a": None}]
+
+    text = "".join(output.format_rows(rows, Format.CSV))
+
+    assert text.splitlines() == [
+        "a,b,c",
+        '"x,y",[1],',
+        ',,"say ""hi"""',
+    ]
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(min_rounds=1, max_time=0, warmup=False)
+@pytest.mark.parametrize("rich", [False, True])
+def test_write_benchmark(rich: bool, benchmark: bm.BenchmarkFixture) -> None:
+    """Compare buffered plain output against printing with Rich."""
+
+    if benchmark.disabled:
+        pytest.skip("benchmarks are disabled")
+
+    values = [f"value-{idx}" for idx in range(20000)]
+
+    def write() -> None:
+        stream = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+        if rich:
+            console = Console(file=stream)
+            for value in values:
+                console.print(value)
+        else:
+            lines = output.format_values(values, Format.PLAIN, "key")
+            output.write(lines, stream)
+
+    benchmark(write)
@@ -0,0 +1,126 @@
+"""Tests for profilers of command line runs."""
+
+
+import io
+import json
+import pathlib
+import pstats
+import re
+import time
+
+import pytest
+from typer import testing
+
+from yamltable import metrics, profiling
+import yamltable.__main__ as main
+from yamltable.typing import ExitCode, Profile
+
+
+@pytest.mark.unit
+def test_sampler() -> None:
+    """Check that sampled stacks end in the running function."""
+
+    def busy() -> None:
+        end = time.perf_counter() + 0.1
+        while time.perf_counter() < end:
+            pass
+
+    sampler = profiling.Sampler()
+    sampler.start()
+    busy()
+    sampler.stop()
+
+    profile = sampler.speedscope("busy")
+    frames = profile["shared"]["frames"]
+    samples = profile["profiles"][0]["samples"]
+    assert samples
+    assert any(frames[stack[-1]]["name"].endswith("busy") for stack in samples)
+    assert len(samples) == len(profile["profiles"][0]["weights"])
+
+
+@pytest.mark.unit
+def test_timer_unsubscribes() -> None:
+    """Check that stopped timers no longer receive metrics."""
+
+    timer = profiling.Timer()
+    timer.start()
+    assert metrics.active()
+
+    report = timer.stop()
+
+    assert not metrics.active()
+    assert report.splitlines()[-1].startswith("Peak ")
+
+
+@pytest.mark.functional
+def test_time(tmp_yaml: pathlib.Path) -> None:
+    """Ensure time profiles print a row for every phase of the command."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["--profile", "time", "sort", "name", str(tmp_yaml)]
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    phases = re.findall(r"^(\w+) +\d+\.\d{3}", result.output, re.MULTILINE)
+    assert phases == ["read", "transform", "emit", "other", "total"]
+    assert "Peak RSS" in result.output
+
+
+@pytest.mark.functional
+def test_time_error(tmp_yaml: pathlib.Path) -> None:
+    """Ensure time profiles are printed when commands fail."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["--profile", "time", "list", "missing", str(tmp_yaml)]
+    )
+
+    assert result.exit_code == ExitCode.ERROR.value
+    assert re.search(r"^read +\d", result.output, re.MULTILINE)
+
+
+@pytest.mark.functional
+def test_cprofile(tmp_yaml: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    """Ensure cProfile statistics are written to the output path."""
+
+    output = tmp_path / "stats.prof"
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app,
+        [
+            "--profile",
+            "cprofile",
+            "--profile-output",
+            str(output),
+            "validate",
+            str(tmp_yaml),
+        ],
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert f"Wrote cProfile statistics to {output}." in result.output
+    text = io.StringIO()
+    pstats.Stats(str(output), stream=text).print_stats()
+    assert "(validate)" in text.getvalue()
+
+
+@pytest.mark.functional
+def test_speedscope(
+    tmp_yaml: pathlib.Path,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure speedscope profiles default to the working directory."""
+
+    monkeypatch.chdir(tmp_path)
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app,
+        ["--profile", Profile.SPEEDSCOPE.value, "index", "0", str(tmp_yaml)],
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    profile = json.loads((tmp_path / "yamltable.speedscope.json").read_text())
+    assert profile["$schema"] == profiling.SPEEDSCOPE_SCHEMA
+    assert profile["profiles"][0]["type"] == "sampled"
@@ -0,0 +1,262 @@
+"""Tests for query expressions."""
+
+
+import pathlib
+from typing import List
+
+import pytest
+import pytest_benchmark.fixture as bm
+from pytest_mock import MockFixture
+from typer import testing
+import yaml
+
+import yamltable
+from yamltable import stream
+import yamltable.__main__ as main
+from yamltable.typing import ExitCode, Row
+
+
+ROWS: List[Row] = [
+    {"name": "aws-east", "port": 80, "meta": {"owner": "ops"}},
+    {"name": "gcp", "port": "80", "tags": ["web"]},
+    {"name": "aws-west", "port": 8080, "meta": {"owner": None}},
+    {"name": "local"},
+]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("port == 80", [0]),
+        ("port = 80", [0]),
+        ("port == '80'", [1]),
+        ("port != 80", [1, 2, 3]),
+        ("port >= 80", [0, 2]),
+        ("port < 8080", [0]),
+        ("name ~ ^aws", [0, 2]),
+        ("name ~ 'st$'", [0, 2]),
+        ("name in [gcp, local]", [1, 3]),
+        ("port in [80, '80']", [0, 1]),
+        ("exists meta.owner", [0, 2]),
+        ("meta.owner == null", [2]),
+        ("not exists port", [3]),
+        ("port >= 80 and name ~ '^aws'", [0, 2]),
+        ("port == 80 or name == local and not exists port", [0, 3]),
+        ("(port == 80 or name == local) and exists meta", [0]),
+        ("not not name == gcp", [1]),
+    ],
+)
+def test_query(text: str, expected: List[int]) -> None:
+    """Check that queries select the expected rows."""
+
+    query_ = yamltable.Query(text)
+
+    actual = [idx for idx, row in enumerate(ROWS) if query_(row)]
+    assert actual == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "port",
+        "port 80",
+        "port >=",
+        "port == )",
+        "(port == 80",
+        "port == 80 extra",
+        "and == 1",
+        "a..b == 1",
+        "name ~ '('",
+        "port in [80",
+        "port ! 80",
+    ],
+)
+def test_query_invalid(text: str) -> None:
+    """Check that malformed queries raise value errors."""
+
+    with pytest.raises(ValueError):
+        yamltable.Query(text)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "text,keys,equality",
+    [
+        ("port == 80", ["port"], ("port", [80])),
+        ("(name in [a, 'b'])", ["name"], ("name", ["a", "b"])),
+        ("meta.owner == ops", ["meta"], None),
+        ("port == 80 or port == 81", ["port"], None),
+        ("not port == 80", ["port"], None),
+        ("port > 80 and exists meta.owner", ["meta", "port"], None),
+    ],
+)
+def test_query_keys(text: str, keys: List[str], equality: object) -> None:
+    """Check top-level keys and index eligibility of queries."""
+
+    query_ = yamltable.Query(text)
+
+    assert sorted(query_.keys) == keys
+    assert query_.equality == equality
+
+
+@pytest.mark.unit
+def test_match() -> None:
+    """Check that match queries treat dotted keys as one key."""
+
+    query_ = yamltable.Query.match("a.b", [1, "1"])
+
+    assert query_({"a.b": "1"})
+    assert not query_({"a": {"b": 1}})
+    assert query_.equality == ("a.b", [1, "1"])
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "text",
+    [
+        "port == 80",
+        "exists tags",
+        "name ~ ^aws or port > 100",
+        "not exists port",
+        "port != 80",
+    ],
+)
+@pytest.mark.parametrize("schema", [None, {"type": "object"}])
+def test_pushdown(text: str, schema: object) -> None:
+    """Check that filtered streaming matches filtering parsed rows."""
+
+    rows = ROWS + [["list"], "scalar", None]
+    data = rows if schema is None else {"rows": rows, "schema": schema}
+    query_ = yamltable.Query(text)
+
+    actual, _ = stream.iter_rows(yaml.safe_dump(data), where=query_)
+    assert list(actual) == [row for row in rows if query_(row)]
+
+
+@pytest.mark.integration
+def test_pushdown_yaml_features() -> None:
+    """Check filtering of rows with aliases, merge keys, and sets."""
+
+    text = (
+        "- &base {port: 80, name: a}\n"
+        "- {<<: *base, name: b}\n"
+        "- !!set {port: null}\n"
+        "- *base\n"
+        "- {port: 81, meta: &meta {owner: x}}\n"
+        "- {port: 80, meta: *meta}\n"
+    )
+    query_ = yamltable.Query("port == 80 or meta.owner == x")
+
+    actual, _ = stream.iter_rows(text, where=query_)
+    expected = [row for row in yaml.safe_load(text) if query_(row)]
+    assert list(actual) == expected
+    assert len(expected) == 5
+
+
+@pytest.mark.integration
+def test_pushdown_skips_rows(mocker: MockFixture) -> None:
+    """Check that non-matching rows are never fully constructed."""
+
+    query_ = yamltable.Query("id == 3")
+    text = yaml.safe_dump([{"id": idx, "data": [idx]} for idx in range(10)])
+    spy = mocker.spy(yaml.constructor.BaseConstructor, "construct_document")
+
+    rows, _ = stream.iter_rows(text, where=query_)
+
+    assert list(rows) == [{"id": 3, "data": [3]}]
+    assert spy.call_count == 1
+
+
+@pytest.mark.functional
+@pytest.mark.parametrize(
+    "arguments,names",
+    [
+        (["port", "80"], ["aws-east", "gcp"]),
+        (["port", "'80'"], ["gcp"]),
+        (["name", "gcp"], ["gcp"]),
+        (["--where", "port > 0 and name ~ ^aws"], ["aws-east", "aws-west"]),
+        (["--where", "meta.owner = ops"], ["aws-east"]),
+    ],
+)
+def test_cli(
+    tmp_path: pathlib.Path, arguments: List[str], names: List[str]
+) -> None:
+    """Ensure search command matches typed values and queries."""
+
+    file_path = tmp_path / "file.yaml"
+    yamltable.write(file_path, ROWS)
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, ["search", *arguments, str(file_path)])
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    for row in ROWS:
+        assert (f"'name': '{row['name']}'" in result.stdout) == (
+            row["name"] in names
+        )
+
+
+@pytest.mark.functional
+@pytest.mark.parametrize(
+    "arguments", [["--where", "port >"], ["name", "--where", "port == 80"]]
+)
+def test_cli_error(tmp_yaml: pathlib.Path, arguments: List[str]) -> None:
+    """Ensure search command rejects invalid queries and arguments."""
+
+    runner = testing.CliRunner()
+    result = runner.invoke(main.app, ["search", *arguments, str(tmp_yaml)])
+
+    assert result.exit_code == ExitCode.ERROR.value
+
+
+@pytest.mark.functional
+def test_cli_index(tmp_path: pathlib.Path, mocker: MockFixture) -> None:
+    """Ensure equality queries use an up to date index."""
+
+    file_path = tmp_path / "file.yaml"
+    yamltable.write(file_path, ROWS)
+    yamltable.Index.build(file_path, "port").save(file_path)
+    spy = mocker.spy(yamltable.Index, "select")
+
+    runner = testing.CliRunner()
+    result = runner.invoke(
+        main.app, ["search", "--where", "port in [80, 8080]", str(file_path)]
+    )
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert result.stdout.count("'name'") == 2
+    assert spy.call_count == 1
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(min_rounds=1, max_time=0, warmup=False)
+@pytest.mark.parametrize("pushdown", [False, True])
+def test_pushdown_benchmark(
+    tmp_path: pathlib.Path, pushdown: bool, benchmark: bm.BenchmarkFixture
+) -> None:
+    """Compare filtering rows while streaming against filtering afterwards."""
+
+    if benchmark.disabled:
+        pytest.skip("benchmarks are disabled")
+
+    file_path = tmp_path / "file.yaml"
+    yamltable.write(
+        file_path,
+        (
+            {"id": idx, "name": f"row{idx}", "tags": ["a", "b"], "size": 1.5}
+            for idx in range(20000)
+        ),
+    )
+    query_ = yamltable.Query("id >= 19990")
+
+    def search() -> List[Row]:
+        if pushdown:
+            rows, _ = stream.iter_rows(file_path, where=query_)
+            return list(rows)
+        rows, _ = stream.iter_rows(file_path)
+        return [row for row in rows if query_(row)]
+
+    assert len(benchmark(search)) == 10
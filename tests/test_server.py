@@ -0,0 +1,194 @@
+"""Tests for the resident command server."""
+
+
+import asyncio
+import contextlib
+import os
+import pathlib
+import socket
+import tempfile
+import threading
+import time
+from typing import Iterator, List
+
+import pytest
+from pytest_mock import MockFixture
+from rich.console import Console
+from typer import testing
+
+import yamltable
+from yamltable import server
+import yamltable.__main__ as main
+from yamltable.typing import ExitCode
+
+
+@pytest.fixture(autouse=True)
+def console(monkeypatch: pytest.MonkeyPatch) -> Console:
+    """Print command output with a Rich console instead of a mock."""
+
+    monkeypatch.setattr(main, "console", None)
+    console_: Console = main.get_console()
+    return console_
+
+
+@pytest.fixture
+def socket_path(tmp_yaml: pathlib.Path) -> Iterator[pathlib.Path]:
+    """Run server for the temporary YAML file in a background thread."""
+
+    # Unix socket paths are limited to about 100 characters.
+    directory = tempfile.mkdtemp()
+    path = pathlib.Path(directory) / "yamltable.sock"
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(main.server_task([tmp_yaml], path, 0.05))
+
+    def run() -> None:
+        with contextlib.suppress(asyncio.CancelledError):
+            loop.run_until_complete(task)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+
+    for _ in range(100):
+        if path.exists():
+            break
+        time.sleep(0.05)
+
+    yield path
+
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join()
+    loop.close()
+    main.state["loaded"].clear()
+    os.rmdir(directory)
+
+
+def invoke(socket_path: pathlib.Path, arguments: List[str]) -> testing.Result:
+    """Run command through the server."""
+
+    runner = testing.CliRunner()
+    return runner.invoke(
+        main.app, ["--socket", str(socket_path), *arguments]
+    )
+
+
+@pytest.mark.integration
+def test_watcher(tmp_path: pathlib.Path) -> None:
+    """Check that watchers reload changed and removed files."""
+
+    file_path = tmp_path / "file.yaml"
+    file_path.write_text("- a: 1\n")
+    loads: List[pathlib.Path] = []
+
+    watcher = server.Watcher([file_path], loads.append)
+    assert loads == [file_path]
+    assert watcher.poll() == []
+
+    file_path.write_text("- a: 10\n")
+    assert watcher.poll() == [file_path]
+    file_path.unlink()
+    assert watcher.poll() == [file_path]
+    assert watcher.poll() == []
+    assert len(loads) == 3
+
+
+@pytest.mark.functional
+def test_serve(
+    tmp_yaml: pathlib.Path, socket_path: pathlib.Path, mocker: MockFixture
+) -> None:
+    """Ensure clients run commands on the server's parsed copy."""
+
+    spy = mocker.spy(yamltable, "read")
+    rows, _ = yamltable.read(tmp_yaml)
+
+    result = invoke(socket_path, ["list", "name", str(tmp_yaml)])
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert result.stdout.splitlines() == [row["name"] for row in rows]
+
+    result = invoke(socket_path, ["search", "name", "ssh", str(tmp_yaml)])
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert "'name': 'ssh'" in result.stdout
+
+    result = invoke(socket_path, ["index", "--", "-99", str(tmp_yaml)])
+    assert result.exit_code == ExitCode.ERROR.value
+    assert spy.call_count == 1
+
+
+@pytest.mark.functional
+def test_serve_reload(
+    tmp_yaml: pathlib.Path, socket_path: pathlib.Path
+) -> None:
+    """Ensure servers reload files after they change."""
+
+    result = invoke(socket_path, ["sort", "name", str(tmp_yaml)])
+    assert result.exit_code == ExitCode.SUCCESS.value
+
+    rows, _ = yamltable.read(tmp_yaml)
+    result = invoke(socket_path, ["list", "name", str(tmp_yaml)])
+    assert result.stdout.splitlines() == sorted(row["name"] for row in rows)
+
+    text = tmp_yaml.read_text().replace("name: ssh", "name: secure-shell")
+    tmp_yaml.write_text(text)
+    result = invoke(socket_path, ["search", "name", "ssh", str(tmp_yaml)])
+    assert result.stdout.startswith("No rows found")
+
+
+@pytest.mark.functional
+def test_serve_relative(
+    tmp_yaml: pathlib.Path,
+    socket_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure relative paths resolve in the client's working directory."""
+
+    monkeypatch.chdir(tmp_yaml.parent)
+
+    result = invoke(socket_path, ["index", "0", tmp_yaml.name])
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+
+
+@pytest.mark.functional
+def test_client_fallback(
+    tmp_path: pathlib.Path, tmp_yaml: pathlib.Path
+) -> None:
+    """Ensure commands run locally without a listening server."""
+
+    result = invoke(tmp_path / "missing.sock", ["list", "name", str(tmp_yaml)])
+
+    assert result.exit_code == ExitCode.SUCCESS.value
+    assert "ssh" in result.stdout
+
+
+@pytest.mark.unit
+def test_request_invalid(socket_path: pathlib.Path) -> None:
+    """Check that servers reject malformed and unsupported requests."""
+
+    response = server.request(socket_path, [], ["cache", "clear"])
+
+    assert response is not None
+    assert response[0] == ExitCode.ERROR.value
+    assert "unsupported command" in response[2]
+
+
+@pytest.mark.functional
+def test_client_closed(tmp_yaml: pathlib.Path) -> None:
+    """Ensure an error if the server closes the connection without a reply."""
+
+    directory = tempfile.mkdtemp()
+    path = pathlib.Path(directory) / "yamltable.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(str(path))
+        listener.listen(1)
+
+        def close() -> None:
+            connection, _ = listener.accept()
+            with connection, connection.makefile("rb") as handle:
+                handle.readline()
+
+        thread = threading.Thread(target=close)
+        thread.start()
+        result = invoke(path, ["list", "name", str(tmp_yaml)])
+        thread.join()
+
+    assert result.exit_code == ExitCode.ERROR.value
+    assert "closed the connection without a response" in result.output
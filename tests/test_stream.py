@@ -0,0 +1,150 @@
+"""Tests for streaming YAML readers."""
+
+
+import io
+import pathlib
+from typing import Any, Optional
+
+import pytest
+import yaml
+
+from yamltable import stream
+from yamltable.typing import Schema
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "file_data",
+    [
+        "- foo: 1\n- foo: 2\n",
+        "schema:\n  type: object\nrows:\n- foo: 1\n- foo: 2\nextra: 3\n",
+        "rows:\n- foo: 1\n- foo: 2\nschema:\n  type: object\n",
+    ],
+)
+def test_iter_rows(file_data: str) -> None:
+    """Check that rows are read from every table organization."""
+
+    rows, _ = stream.iter_rows(file_data)
+
+    expected = [{"foo": 1}, {"foo": 2}]
+    actual = list(rows)
+    assert actual == expected
+
+
+@pytest.mark.unit
+def test_iter_rows_bad_document() -> None:
+    """Check that multiple documents are rejected while iterating."""
+
+    rows, _ = stream.iter_rows("- foo: 1\n---\n- foo: 2\n")
+
+    with pytest.raises(TypeError):
+        list(rows)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "file_data", ["", "false", "rows:\n- foo: 1\n", "mock_key: [1"]
+)
+def test_iter_rows_bad_header(file_data: str) -> None:
+    """Check that non tabular files are rejected before the first row."""
+
+    with pytest.raises(TypeError):
+        stream.iter_rows(file_data)
+
+
+@pytest.mark.unit
+def test_iter_rows_lazy() -> None:
+    """Check that rows are yielded before later rows are parsed."""
+
+    rows, _ = stream.iter_rows("- foo: 1\n- foo: [2\n")
+
+    assert next(rows) == {"foo": 1}
+    with pytest.raises(TypeError):
+        next(rows)
+
+
+@pytest.mark.integration
+def test_iter_rows_path(tmp_yaml: pathlib.Path) -> None:
+    """Check that schema is read before the rows of a file."""
+
+    rows, schema = stream.iter_rows(tmp_yaml)
+
+    assert schema is not None
+    assert schema["type"] == "object"
+    assert next(rows)["name"] == "repo"
+    assert len(list(rows)) == 8
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_iter_spans(tmp_path: pathlib.Path, newline: str) -> None:
+    """Check that byte spans parse back into rows for non ASCII files."""
+
+    lines = [
+        "schema: {}",
+        "rows:",
+        "  - name: café",
+        "    tags: [漢字,",
+        "      b]",
+        "  # comment",
+        "  - plain",
+        "  - {a: 1}",
+        "other: 3",
+    ]
+    file_path = tmp_path / "file.yaml"
+    file_path.write_bytes(newline.join(lines).encode("utf-8"))
+
+    rows, _ = stream.iter_spans(file_path)
+    with file_path.open("rb") as handle:
+        actual = [stream.read_span(handle, span) for _, span in rows]
+
+    expected = [{"name": "café", "tags": ["漢字", "b"]}, "plain", {"a": 1}]
+    assert actual == expected
+
+
+@pytest.mark.integration
+def test_read_span_alias(tmp_path: pathlib.Path) -> None:
+    """Check that rows with aliases to other rows cannot be read alone."""
+
+    file_path = tmp_path / "file.yaml"
+    file_path.write_text("- &name foo\n- *name\n")
+
+    rows, _ = stream.iter_spans(file_path)
+    spans = [span for _, span in rows]
+    with file_path.open("rb") as handle:
+        assert stream.read_span(handle, spans[0]) == "foo"
+        with pytest.raises(TypeError):
+            stream.read_span(handle, spans[1])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("schema", [None, {"type": "object"}])
+@pytest.mark.parametrize("sort_keys", [False, True])
+@pytest.mark.parametrize("count", [0, 1, 3])
+def test_dump_rows(
+    schema: Optional[Schema], sort_keys: bool, count: int
+) -> None:
+    """Row by row output matches dumping the whole table at once."""
+
+    rows = [{"b": idx, "a": ["ü", "x" * 100]} for idx in range(count)]
+    data: Any = rows if schema is None else {"schema": schema, "rows": rows}
+    handle = io.StringIO()
+
+    stream.dump_rows(handle, iter(rows), schema, sort_keys)
+
+    assert handle.getvalue() == yaml.dump(data, sort_keys=sort_keys)
+
+
+@pytest.mark.integration
+def test_atomic_open_new(tmp_path: pathlib.Path) -> None:
+    """New files get the default permissions for the current umask."""
+
+    file_path = tmp_path / "file.bin"
+    reference = tmp_path / "reference.bin"
+    reference.write_bytes(b"")
+
+    with stream.atomic_open(file_path, "wb") as handle:
+        handle.write(b"data")
+
+    assert file_path.read_bytes() == b"data"
+    assert file_path.stat().st_mode == reference.stat().st_mode
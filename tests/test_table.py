@@ -0,0 +1,183 @@
+"""Tests for columnar tables."""
+
+
+import pathlib
+from typing import Any, List
+
+import pytest
+import pytest_benchmark.fixture as bm
+
+import yamltable
+from yamltable.table import Table
+from yamltable.typing import Nulls, Row
+
+
+ROWS: List[Row] = [
+    {"name": "b", "id": 2, "ok": True, "size": 1.5},
+    {"id": 1, "name": "a", "ok": False, "tags": ["x"]},
+    {"name": "c", "id": None, "size": None},
+    {"name": "a", "id": 2 ** 70, "size": 2},
+    {"name": "b"},
+]
+
+
+@pytest.mark.unit
+def test_from_rows() -> None:
+    """Check that tables convert back into identical rows."""
+
+    table = Table.from_rows(ROWS)
+
+    assert len(table) == len(ROWS)
+    assert list(table) == ROWS
+    assert [list(row) for row in table] == [list(row) for row in ROWS]
+    assert table[-1] == ROWS[-1]
+    assert type(table[0]["ok"]) is bool
+    with pytest.raises(IndexError):
+        table[len(ROWS)]
+
+
+@pytest.mark.unit
+def test_kinds() -> None:
+    """Check inferred column types and fallback to object columns."""
+
+    table = Table.from_rows(ROWS)
+
+    kinds = {key: column.kind for key, column in table.columns.items()}
+    assert kinds == {
+        "name": "str",
+        "id": "object",
+        "ok": "bool",
+        "size": "object",
+        "tags": "object",
+    }
+    assert table.columns["name"].dictionary == ["b", "a", "c"]
+
+
+@pytest.mark.unit
+def test_schema_kinds() -> None:
+    """Check that schema property types are used as column types."""
+
+    schema = {
+        "properties": {
+            "id": {"type": "integer"},
+            "name": {"type": ["string", "null"]},
+            "size": {"type": "number"},
+        }
+    }
+
+    table = Table.from_rows([{"size": 1}], schema)
+    table.append({"id": "1", "name": None})
+
+    kinds = {key: column.kind for key, column in table.columns.items()}
+    assert kinds == {"size": "int", "id": "object", "name": "str"}
+    assert list(table) == [{"size": 1}, {"id": "1", "name": None}]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "key,val",
+    [
+        ("name", "a"),
+        ("name", "z"),
+        ("name", ["a"]),
+        ("id", 2),
+        ("id", 2.0),
+        ("id", None),
+        ("ok", 1),
+        ("size", 2),
+        ("tags", ["x"]),
+        ("missing", 1),
+    ],
+)
+def test_search(key: str, val: Any) -> None:
+    """Check that table search matches row search."""
+
+    table = Table.from_rows(ROWS)
+
+    actual = table.search(key, val)
+    assert list(actual) == yamltable.search(key, val, ROWS)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "keys", [["name"], ["-name", "ok"], ["ok", "-size"], ["missing"]]
+)
+@pytest.mark.parametrize("nulls", list(Nulls))
+def test_sort(keys: List[str], nulls: Nulls) -> None:
+    """Check that table sort matches row sort."""
+
+    table = Table.from_rows(ROWS)
+
+    actual = table.sort(keys, nulls)
+    assert list(actual) == yamltable.sort(keys, ROWS, nulls)
+
+
+@pytest.mark.unit
+def test_sort_error() -> None:
+    """Check that incomparable and missing sort keys raise errors."""
+
+    table = Table.from_rows([{"key": 1}, {"key": "a"}])
+
+    with pytest.raises(TypeError, match="int, str"):
+        table.sort("key")
+    with pytest.raises(ValueError):
+        table.sort([])
+
+
+@pytest.mark.unit
+def test_values() -> None:
+    """Check that column values are decoded and missing keys raise errors."""
+
+    table = Table.from_rows(ROWS)
+
+    assert table.values("name") == ["b", "a", "c", "a", "b"]
+    assert table.search("size", 1.5).values("ok") == [True]
+    assert Table().values("name") == []
+    with pytest.raises(KeyError, match="row 4"):
+        table.values("id")
+    with pytest.raises(KeyError, match="row 0"):
+        table.values("missing")
+
+
+@pytest.mark.unit
+def test_invalid_row() -> None:
+    """Check that rows must be dictionaries."""
+
+    rows: List[Any] = [{"a": 1}, ["a"]]
+
+    with pytest.raises(TypeError, match="table row 1"):
+        Table.from_rows(rows)
+
+
+@pytest.mark.integration
+def test_read(tmp_yaml: pathlib.Path) -> None:
+    """Check that tables stream rows and schemas from files."""
+
+    rows, schema = yamltable.read(tmp_yaml)
+
+    table = Table.read(tmp_yaml)
+
+    assert list(table) == rows
+    assert table.schema == schema
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(min_rounds=1, max_time=0, warmup=False)
+@pytest.mark.parametrize("columnar", [False, True])
+def test_sort_benchmark(columnar: bool, benchmark: bm.BenchmarkFixture) -> None:
+    """Compare sorting tables by string keys against sorting rows."""
+
+    if benchmark.disabled:
+        pytest.skip("benchmarks are disabled")
+
+    rows: List[Row] = [
+        {"id": idx, "name": f"row{idx % 1000}"} for idx in range(100000)
+    ]
+    table = Table.from_rows(rows)
+
+    def sort() -> object:
+        if columnar:
+            return table.sort(["name", "-id"])
+        return yamltable.sort(["name", "-id"], rows)
+
+    assert len(benchmark(sort)) == len(rows)